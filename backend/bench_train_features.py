@@ -0,0 +1,335 @@
+"""
+Paritate + benchmark pentru feature engineering-ul vectorizat din features.py.
+
+Implementarile de referinta (_ref_*) sunt buclele iterrows inlocuite — pastrate aici
+doar ca oracol (si pentru tests/test_train_features.py, paritatea pe un corpus
+sintetic). Ruleaza pe corpusul CSV real:
+
+    python bench_train_features.py            # tot corpusul
+    python bench_train_features.py 20000      # doar primele N meciuri
+
+Iese cu cod != 0 daca vreo coloana difera (comparatie exacta, nu cu toleranta).
+"""
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import features
+from features import ELO_K, ELO_HOME
+
+
+def _ref_elo_features(data):
+    """
+    Elo calculat SEPARAT per liga.
+    Echipele din ligi diferite nu se influenteaza reciproc.
+    Elo porneste de la 1500 la prima aparitie in fiecare liga.
+    """
+    print(">>> [ref] Calculez Elo per liga...")
+    ratings = {}  # (liga, echipa) -> elo
+
+    def get(league, team):
+        return ratings.get((league, team), 1500.0)
+
+    def expected(ra, rb):
+        return 1.0 / (1 + 10 ** ((rb - ra) / 400))
+
+    h_elo, a_elo, elo_diff, elo_prob_h, elo_prob_d = [], [], [], [], []
+
+    for _, row in data.iterrows():
+        league = row["Div"]
+        home, away, ftr = row["HomeTeam"], row["AwayTeam"], row["FTR"]
+
+        rh = get(league, home)
+        ra = get(league, away)
+        rh_adj = rh + ELO_HOME
+
+        ea = expected(rh_adj, ra)  # prob victorie gazda
+
+        h_elo.append(rh)
+        a_elo.append(ra)
+        elo_diff.append(rh_adj - ra)
+
+        # Prob estimate H/D/A din Elo
+        diff_abs = abs(rh_adj - ra)
+        dp = max(0.15, min(0.35, 0.27 * np.exp(-diff_abs / 500)))
+        elo_prob_h.append(ea * (1 - dp))
+        elo_prob_d.append(dp)
+
+        # Update dupa meci
+        sa, sb = {"H": (1, 0), "D": (0.5, 0.5), "A": (0, 1)}[ftr]
+        ratings[(league, home)] = rh + ELO_K * (sa - ea)
+        ratings[(league, away)] = ra + ELO_K * (sb - (1 - ea))
+
+    elo_ratings_flat = {f"{lg}|{tm}": v for (lg, tm), v in ratings.items()}
+
+    return pd.DataFrame({
+        "h_elo":      h_elo,
+        "a_elo":      a_elo,
+        "elo_diff":   elo_diff,
+        "elo_prob_h": elo_prob_h,
+        "elo_prob_d": elo_prob_d,
+    }, index=data.index), elo_ratings_flat
+
+
+def _ref_team_features(data, xg_lookup=None):
+    """
+    Pentru fiecare meci, calculam (fara leakage):
+    - rata de goluri / xG marcate/primite acasa si in deplasare
+    - forma recenta (win rate ultimele 5)
+    - streak
+    xg_lookup: dict (Div, date_str, home_lower, away_lower) -> (xg_h, xg_a)
+    """
+    print(">>> [ref] Calculez features atac/aparare per echipa...")
+    if xg_lookup:
+        print(f"    xG real disponibil pentru {len(xg_lookup):,} meciuri")
+
+    # Structuri de istoric per echipa
+    hist = {}  # team -> list de {gf, ga, xgf, xga, is_home, pts}
+
+    rows = []
+    xg_real_used = 0
+
+    for idx, row in data.iterrows():
+        home, away = row["HomeTeam"], row["AwayTeam"]
+        hg, ag = row["FTHG"], row["FTAG"]
+        ftr = row["FTR"]
+        div = str(row.get("Div", ""))
+        date_obj = row["Date"].date() if hasattr(row["Date"], "date") else None
+
+        # Cauta xG real pentru acest meci
+        real_xg_h = real_xg_a = None
+        if xg_lookup and date_obj:
+            key = (div, str(date_obj), home.strip().lower(), away.strip().lower())
+            real_xg = xg_lookup.get(key)
+            if real_xg:
+                real_xg_h, real_xg_a = real_xg
+                xg_real_used += 1
+
+        def get_stats(team, as_home):
+            records = hist.get(team, [])
+            all_r   = records
+            home_r  = [r for r in records if r["is_home"]]
+            away_r  = [r for r in records if not r["is_home"]]
+
+            def avg_gf(lst, n, default=1.3):
+                if not lst: return default
+                vals = [r["gf"] for r in lst[-n:]]
+                return sum(vals) / len(vals)
+
+            def avg_ga(lst, n, default=1.3):
+                if not lst: return default
+                vals = [r["ga"] for r in lst[-n:]]
+                return sum(vals) / len(vals)
+
+            def avg_xgf(lst, n, default=None):
+                sub = [r for r in lst[-n:] if r.get("xgf") is not None]
+                if not sub: return default
+                return sum(r["xgf"] for r in sub) / len(sub)
+
+            def avg_xga(lst, n, default=None):
+                sub = [r for r in lst[-n:] if r.get("xga") is not None]
+                if not sub: return default
+                return sum(r["xga"] for r in sub) / len(sub)
+
+            def win_rate(lst, n):
+                if not lst: return 0.40
+                sub = lst[-n:]
+                return sum(1 for r in sub if r["pts"] == 3) / len(sub)
+
+            def draw_rate(lst, n):
+                if not lst: return 0.26
+                sub = lst[-n:]
+                return sum(1 for r in sub if r["pts"] == 1) / len(sub)
+
+            def pts_rate(lst, n):
+                if not lst: return 1.2
+                sub = lst[-n:]
+                return sum(r["pts"] for r in sub) / (3 * len(sub))
+
+            def streak(lst):
+                if not lst: return 0
+                last = lst[-1]["pts"]
+                s = 0
+                for r in reversed(lst):
+                    if r["pts"] == last:
+                        s += 1
+                    else:
+                        break
+                return s if last == 3 else (-s if last == 0 else 0)
+
+            venue_r = home_r if as_home else away_r
+            gf_venue5 = avg_gf(venue_r, 5, 1.4 if as_home else 1.1)
+            ga_venue5 = avg_ga(venue_r, 5, 1.1 if as_home else 1.3)
+
+            # xG rolling: folosim real daca avem, altfel proxy din goluri
+            xgf5 = avg_xgf(all_r, 5)
+            xga5 = avg_xga(all_r, 5)
+            xgf_v5 = avg_xgf(venue_r, 5)
+            xga_v5 = avg_xga(venue_r, 5)
+
+            return {
+                "atk_all5":    avg_gf(all_r, 5),
+                "def_all5":    avg_ga(all_r, 5),
+                "atk_all10":   avg_gf(all_r, 10),
+                "def_all10":   avg_ga(all_r, 10),
+                "atk_venue5":  gf_venue5,
+                "def_venue5":  ga_venue5,
+                "win5":        win_rate(all_r, 5),
+                "win10":       win_rate(all_r, 10),
+                "draw5":       draw_rate(all_r, 5),
+                "pts5":        pts_rate(all_r, 5),
+                "pts10":       pts_rate(all_r, 10),
+                "win_venue5":  win_rate(venue_r, 5),
+                "pts_venue5":  pts_rate(venue_r, 5),
+                "btts5":       sum(1 for r in all_r[-5:] if r["gf"] > 0 and r["ga"] > 0) / max(len(all_r[-5:]), 1),
+                "over25_5":    sum(1 for r in all_r[-5:] if r["gf"] + r["ga"] > 2) / max(len(all_r[-5:]), 1),
+                "clean5":      sum(1 for r in all_r[-5:] if r["ga"] == 0) / max(len(all_r[-5:]), 1),
+                "streak":      streak(all_r),
+                "n_matches":   len(all_r),
+                # xG rolling real (None daca nu avem date)
+                "_xgf5":       xgf5,
+                "_xga5":       xga5,
+                "_xgf_v5":     xgf_v5,
+                "_xga_v5":     xga_v5,
+                "_gf_v5":      gf_venue5,
+                "_ga_v5":      ga_venue5,
+            }
+
+        h_stats = get_stats(home, as_home=True)
+        a_stats = get_stats(away, as_home=False)
+
+        # xG pentru feature-uri predictive (INAINTE de meci — rolling history)
+        # Folosim xG real rolling daca avem, altfel proxy din goluri
+        def pick_xg(xgf5, xga5, xgf_v5, xga_v5, gf_v5, ga_v5):
+            if xgf_v5 is not None and xga_v5 is not None:
+                return xgf_v5, xga_v5  # xG real venue-specific
+            elif xgf5 is not None and xga5 is not None:
+                return xgf5, xga5  # xG real general
+            else:
+                return gf_v5, ga_v5  # proxy din goluri
+
+        h_xgf, h_xga = pick_xg(h_stats["_xgf5"], h_stats["_xga5"],
+                                h_stats["_xgf_v5"], h_stats["_xga_v5"],
+                                h_stats["_gf_v5"], h_stats["_ga_v5"])
+        a_xgf, a_xga = pick_xg(a_stats["_xgf5"], a_stats["_xga5"],
+                                a_stats["_xgf_v5"], a_stats["_xga_v5"],
+                                a_stats["_gf_v5"], a_stats["_ga_v5"])
+
+        xg_h = (h_xgf + a_xga) / 2
+        xg_a = (a_xgf + h_xga) / 2
+
+        # Curata cheile interne
+        for k in ["_xgf5", "_xga5", "_xgf_v5", "_xga_v5", "_gf_v5", "_ga_v5"]:
+            h_stats.pop(k, None)
+            a_stats.pop(k, None)
+
+        row_feat = {"match_idx": idx}
+        for k, v in h_stats.items():
+            row_feat[f"h_{k}"] = v
+        for k, v in a_stats.items():
+            row_feat[f"a_{k}"] = v
+        row_feat["xg_h"] = xg_h
+        row_feat["xg_a"] = xg_a
+        row_feat["xg_diff"] = xg_h - xg_a
+
+        rows.append(row_feat)
+
+        # Update istoric (cu xG real daca avem)
+        h_pts = {"H": 3, "D": 1, "A": 0}[ftr]
+        a_pts = {"H": 0, "D": 1, "A": 3}[ftr]
+        hist.setdefault(home, []).append({
+            "gf": hg, "ga": ag, "is_home": True, "pts": h_pts,
+            "xgf": real_xg_h, "xga": real_xg_a,
+        })
+        hist.setdefault(away, []).append({
+            "gf": ag, "ga": hg, "is_home": False, "pts": a_pts,
+            "xgf": real_xg_a, "xga": real_xg_h,
+        })
+
+    print(f"    xG real folosit: {xg_real_used:,} meciuri ({xg_real_used/max(len(rows),1)*100:.1f}%)")
+    return pd.DataFrame(rows).set_index("match_idx"), hist
+
+
+def _ref_h2h_features(data):
+    print(">>> [ref] Calculez H2H...")
+    rows = []
+    history = {}
+
+    for idx, row in data.iterrows():
+        home, away = row["HomeTeam"], row["AwayTeam"]
+        ftr = row["FTR"]
+        hg, ag = row["FTHG"], row["FTAG"]
+        key = tuple(sorted([home, away]))
+        recent = history.get(key, [])[-6:]
+
+        if not recent:
+            rows.append({"match_idx": idx,
+                         "h2h_hw": 0.45, "h2h_dr": 0.25,
+                         "h2h_gd": 0.0,  "h2h_n": 0})
+        else:
+            hw = dr = 0
+            gd_sum = 0.0
+            for r in recent:
+                if r["home"] == home:
+                    hw += int(r["ftr"] == "H")
+                    dr += int(r["ftr"] == "D")
+                    gd_sum += r["hg"] - r["ag"]
+                else:
+                    hw += int(r["ftr"] == "A")
+                    dr += int(r["ftr"] == "D")
+                    gd_sum += r["ag"] - r["hg"]
+            n = len(recent)
+            rows.append({"match_idx": idx,
+                         "h2h_hw": hw / n, "h2h_dr": dr / n,
+                         "h2h_gd": gd_sum / n, "h2h_n": n})
+
+        history.setdefault(key, []).append(
+            {"home": home, "away": away, "ftr": ftr, "hg": hg, "ag": ag})
+
+    return pd.DataFrame(rows).set_index("match_idx"), history
+
+
+def _timed(fn, *args, **kwargs):
+    t = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - t
+
+
+def main(limit: int = None):
+    data = features.preprocess(features.load_data())
+    if limit:
+        data = data.iloc[:limit]
+    xg_lookup = features.load_xg_data()
+    print(f">>> {len(data):,} meciuri, {len(xg_lookup):,} cu xG real")
+
+    checks = [
+        ("elo",  _ref_elo_features,  features.build_elo_features,  (data,), {}),
+        ("team", _ref_team_features, features.build_team_features, (data,), {"xg_lookup": xg_lookup}),
+        ("h2h",  _ref_h2h_features,  features.build_h2h_features,  (data,), {}),
+    ]
+    ok = True
+    rows = []
+    for name, ref_fn, new_fn, args, kwargs in checks:
+        (ref_df, ref_extra), t_ref = _timed(ref_fn, *args, **kwargs)
+        (new_df, new_extra), t_new = _timed(new_fn, *args, **kwargs)
+        try:
+            pd.testing.assert_frame_equal(new_df, ref_df, check_exact=True)
+            assert list(new_extra) == list(ref_extra), "ordinea cheilor difera"
+            assert new_extra == ref_extra, "istoricul / rating-urile difera"
+            status = "OK"
+        except AssertionError as e:
+            ok = False
+            status = f"DIFERA: {str(e)[:300]}"
+        rows.append((name, t_ref, t_new, status))
+
+    print()
+    print(f"{'features':8} {'iterrows':>10} {'vectorizat':>11} {'speedup':>8}  paritate")
+    for name, t_ref, t_new, status in rows:
+        print(f"{name:8} {t_ref:9.2f}s {t_new:10.2f}s {t_ref / t_new:7.1f}x  {status}")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main(int(sys.argv[1]) if len(sys.argv) > 1 else None) else 1)
@@ -16,13 +16,16 @@ import os
 import sys
 import math
 import json
-import pickle
 import datetime
-import requests
 import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
 from calibrator import CalibratedXGB  # noqa: F401 — necesar pentru deserializare pkl
+from elo_index import build_team_elo_index, DEFAULT_ELO
+import elo_engine
+import rate_limiter
+import odds_history
+import odds_planner
 
 load_dotenv()
 
@@ -54,30 +57,13 @@ LEAGUE_NAMES = {
     "DED": "Eredivisie", "CL": "Champions League", "EL": "Europa League",
 }
 
-# Mapare nume echipe Odds-API → format intern model
-# (importata din fixtures.py — sursa unica de adevar)
-from fixtures import FDORG_TO_MODEL as _TEAM_MAP
+# Mapare nume echipe Odds-API → format intern model (sursa unica: team_names.py)
+import team_names
 
 
 def _normalize_team(raw: str, known_teams: list) -> str:
     """Normalizeaza numele echipei din Odds API catre formatul intern."""
-    from difflib import get_close_matches
-    if raw in _TEAM_MAP:
-        return _TEAM_MAP[raw]
-    cleaned = raw
-    for suffix in [" FC", " AFC", " CF", " SC", " AC"]:
-        if cleaned.endswith(suffix):
-            cleaned = cleaned[:-len(suffix)].strip()
-            break
-    if cleaned in known_teams:
-        return cleaned
-    matches = get_close_matches(cleaned, known_teams, n=1, cutoff=0.70)
-    if matches:
-        return matches[0]
-    matches2 = get_close_matches(raw, known_teams, n=1, cutoff=0.65)
-    if matches2:
-        return matches2[0]
-    return raw
+    return team_names.resolve(raw, known_teams)
 
 
 # ─── Stare globala modele ─────────────────────────────────────────────────────
@@ -92,10 +78,14 @@ _known_teams: list = []
 
 
 def _load_pkl(path: str) -> dict:
-    if not os.path.exists(path):
-        raise FileNotFoundError(path)
-    with open(path, "rb") as f:
-        return pickle.load(f)
+    # Artefact split (mmap) daca exista, altfel pickle-ul
+    import model_store
+    return model_store.load(path)
+
+
+def _model_exists(path: str) -> bool:
+    import model_store
+    return os.path.exists(path) or os.path.isdir(model_store.split_dir(path))
 
 
 def load_models():
@@ -106,14 +96,14 @@ def load_models():
     global _known_teams
 
     # model_no_odds.pkl TREBUIE sa existe — fara fallback silentios
-    if not os.path.exists(MODEL_NO_ODDS_PATH):
+    if not _model_exists(MODEL_NO_ODDS_PATH):
         msg = "model_no_odds.pkl lipsa. Rulează mai întâi: python train_no_odds.py"
         if __name__ == "__main__":
             print(f"EROARE: {msg}")
             sys.exit(1)
         raise RuntimeError(msg)
 
-    if not os.path.exists(MODEL_ODDS_PATH):
+    if not _model_exists(MODEL_ODDS_PATH):
         msg = "model.pkl lipsa. Rulează mai întâi: python train.py"
         if __name__ == "__main__":
             print(f"EROARE: {msg}")
@@ -125,7 +115,7 @@ def load_models():
     _odds_features = d["features"]
     _odds_le       = d["label_encoder"]
     _odds_stats    = d.get("team_stats", {})
-    _odds_elo      = d.get("elo_ratings", {})
+    _odds_elo      = build_team_elo_index(d.get("elo_ratings", {}))
     _odds_means    = d.get("feature_means", {})
     _odds_h2h      = d.get("h2h_history", {})
 
@@ -134,7 +124,7 @@ def load_models():
     _no_odds_features = d2["features"]
     _no_odds_le       = d2["label_encoder"]
     _no_odds_stats    = d2.get("team_stats", {})
-    _no_odds_elo      = d2.get("elo_ratings", {})
+    _no_odds_elo      = build_team_elo_index(d2.get("elo_ratings", {}))
     _no_odds_means    = d2.get("feature_means", {})
     _no_odds_h2h      = d2.get("h2h_history", {})
 
@@ -148,9 +138,9 @@ def load_models():
 
 # ─── Helpers feature building ─────────────────────────────────────────────────
 
-def _team_elo_from(team: str, elo_ratings: dict) -> float:
-    vals = [v for k, v in elo_ratings.items() if k.split("|", 1)[-1] == team]
-    return max(vals) if vals else 1500.0
+def _team_elo_from(team: str, elo_index: dict) -> float:
+    """elo_index: echipa -> max Elo (build_team_elo_index la load_models)."""
+    return elo_index.get(team, DEFAULT_ELO)
 
 
 def _get_stats(team: str, as_home: bool, stats_dict: dict) -> dict:
@@ -209,7 +199,7 @@ def _h2h_feat(home: str, away: str, h2h_history: dict) -> dict:
 
 
 def _base_features(home: str, away: str, stats_dict: dict,
-                   elo_ratings: dict, h2h_history: dict,
+                   elo_index: dict, h2h_history: dict,
                    league_id: int = 0, month: int = None) -> dict:
     if month is None:
         month = datetime.date.today().month
@@ -217,13 +207,12 @@ def _base_features(home: str, away: str, stats_dict: dict,
     h = _get_stats(home, as_home=True,  stats_dict=stats_dict)
     a = _get_stats(away, as_home=False, stats_dict=stats_dict)
 
-    h_elo        = _team_elo_from(home, elo_ratings)
-    a_elo        = _team_elo_from(away, elo_ratings)
+    h_elo        = _team_elo_from(home, elo_index)
+    a_elo        = _team_elo_from(away, elo_index)
     elo_diff     = h_elo - a_elo
     elo_diff_adj = elo_diff + 50
-    elo_prob_h   = 1 / (1 + 10 ** (-elo_diff_adj / 400))
-    diff_abs     = abs(elo_diff_adj)
-    elo_prob_d   = max(0.05, min(0.32, 0.28 * (1 - diff_abs / 1000)))
+    elo_prob_h   = elo_engine.win_prob(elo_diff_adj)
+    elo_prob_d   = elo_engine.draw_prob_linear(elo_diff_adj)
 
     xg_h    = (h["atk_venue5"] + a["def_venue5"]) / 2
     xg_a    = (a["atk_venue5"] + h["def_venue5"]) / 2
@@ -348,11 +337,12 @@ def _predict_odds_model(home: str, away: str, odds: dict,
         feat["value_zone_h"] = float(1.60 <= ref_h <= 2.10) if ref_h else 0.0
         feat["value_zone_a"] = float(1.60 <= ref_a <= 2.10) if ref_a else 0.0
 
-        for col in ["ps_move_h","ps_move_a","ps_move_d",
-                    "home_steamed","away_steamed","home_drifted","away_drifted",
-                    "clv_h","clv_a","reverse_line_h","reverse_line_a",
-                    "drift_in_value_h","steam_in_value_a","trap_game_h"]:
-            feat[col] = 0.0
+        # Miscarea liniei: deschiderea din odds_history vs cota curenta (0 fara istoric)
+        feat.update(odds_history.line_movement(odds))
+        feat["drift_in_value_h"] = feat["home_drifted"] * feat["value_zone_h"]
+        feat["steam_in_value_a"] = feat["away_steamed"] * feat["value_zone_a"]
+        feat["trap_game_h"] = float(feat["value_zone_h"] == 1 and feat["home_drifted"] == 1
+                                    and feat["sharp_soft_div_h"] > 0.05)
     else:
         feat["has_odds"] = 0.0
         for col in _odds_features:
@@ -471,35 +461,21 @@ def fetch_odds_live() -> list[dict]:
 
     matches = []
 
-    for sport, league_code in ODDS_SPORT_MAP.items():
-        try:
-            resp = requests.get(
-                f"{ODDS_API_URL}/sports/{sport}/odds/",
-                params={
-                    "apiKey":           ODDS_API_KEY,
-                    "regions":          "eu",
-                    "markets":          "h2h",
-                    "oddsFormat":       "decimal",
-                    "dateFormat":       "iso",
-                    "commenceTimeFrom": t_from,
-                    "commenceTimeTo":   t_to,
-                },
-                timeout=10,
-            )
-        except requests.RequestException as e:
-            print(f"  [{league_code}] Eroare retea: {e}")
-            continue
+    # Pull-urile vin din odds_planner — cache partajat cu picks (fixtures/ingest)
+    pulls, status = odds_planner.get_events(list(ODDS_SPORT_MAP), ODDS_API_URL, ODDS_API_KEY)
+    if status == "auth":
+        print("EROARE: ODDS_API_KEY invalid.")
+    elif status == "quota":
+        print("  Quota Odds API epuizata — folosesc doar cotele din cache.")
 
-        if resp.status_code == 401:
-            print("EROARE: ODDS_API_KEY invalid.")
-            break
-        if resp.status_code == 429:
-            print(f"  [{league_code}] Quota Odds API epuizata — opresc fetch.")
-            break
-        if resp.status_code != 200:
+    for sport, league_code in ODDS_SPORT_MAP.items():
+        pull = pulls.get(sport)
+        if not pull:
             continue
 
-        events = resp.json()
+        # Pull-ul acopera toate meciurile viitoare; aici doar fereastra de 72h
+        events = [ev for ev in pull["events"] if t_from <= ev.get("commence_time", "") <= t_to]
+        snapshots = []
 
         for ev in events:
             home_raw = ev.get("home_team", "")
@@ -575,6 +551,15 @@ def fetch_odds_live() -> list[dict]:
                 "odds":        odds,
                 "odds_event_id": ev.get("id", ""),
             })
+            snapshots.append((home, away, odds_history.match_date(commence), odds))
+
+        try:
+            if pull.get("fresh"):
+                odds_history.record(snapshots)
+            else:
+                odds_history.attach_open(snapshots)
+        except Exception as e:
+            print(f"  [{league_code}] odds_history: {e}")
 
     print(f"  Meciuri gasite in urmatoarele 72h: {len(matches)}")
     return matches
@@ -752,7 +737,8 @@ def update_results():
     if ODDS_API_KEY:
         for sport in ODDS_SPORT_MAP:
             try:
-                resp_s = requests.get(
+                resp_s = rate_limiter.get(
+                    "the-odds-api",
                     f"{ODDS_API_URL}/sports/{sport}/scores/",
                     params={
                         "apiKey":   ODDS_API_KEY,
@@ -779,6 +765,7 @@ def update_results():
 
     print(f"Scoruri disponibile in Odds API: {len(scores_map)}")
 
+    import track_stats
     updated_w = updated_l = updated_p = 0
 
     for row in pending:
@@ -826,6 +813,7 @@ def update_results():
                 "result":      new_result,
                 "profit_loss": profit,
             }).eq("id", row["id"]).execute()
+            track_stats.mark_signal(new_result, profit, odds_val)
         except Exception as e:
             print(f"  Update eroare [{row.get('id')}]: {e}")
 
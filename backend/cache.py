@@ -1,26 +1,124 @@
 """
-Cache layer — Upstash Redis (REST API) cu fallback la dict in memorie.
+Cache layer — Upstash Redis (REST API) cu L1 in proces in fata.
+
+L1: LRU thread-safe per worker, marginit la numar de intrari si bytes, care respecta
+TTL-ul din Redis. Invalidarea intre workeri merge printr-o cheie de versiune per
+namespace (flopi:ver:<ns>), incrementata la orice set/delete si recitita din Redis
+cel mult o data la CACHE_L1_VERSION_CHECK secunde. Fara Redis, L1 e singurul nivel.
+L1 tine JSON-ul brut si il decodeaza la fiecare hit: fiecare apelant primeste
+obiectul lui si il poate modifica fara sa atinga cache-ul.
+
+Un singur Session HTTP keep-alive (pool de conexiuni) pentru toate comenzile;
+operatiile pe mai multe chei merg intr-un singur round trip (MGET/DEL multi-cheie
+sau endpoint-ul /pipeline al Upstash).
 """
 import os
 import json
 import time
 import logging
 import hashlib
+import threading
+from collections import OrderedDict
 
 import requests as req
+from requests.adapters import HTTPAdapter
 
 logger = logging.getLogger(__name__)
 
 _REDIS_URL   = None
 _REDIS_TOKEN = None
-_mem_cache: dict = {}   # fallback daca Redis nu e configurat
+_session     = None    # requests.Session keep-alive, partajat intre thread-uri
+
+_TIMEOUT = 3
+
+L1_MAX_ENTRIES   = int(os.getenv("CACHE_L1_MAX_ENTRIES", "512"))
+L1_MAX_BYTES     = int(os.getenv("CACHE_L1_MAX_BYTES", str(32 * 1024 * 1024)))
+L1_VERSION_CHECK = float(os.getenv("CACHE_L1_VERSION_CHECK", "2"))   # secunde
+
+
+class _LRU:
+    """LRU thread-safe marginit la numar de intrari si bytes, cu expirare per intrare."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self._data: OrderedDict = OrderedDict()   # key -> (json brut, exp, size, version)
+        self._lock  = threading.Lock()
+        self._bytes = 0
+        self.max_entries = max_entries
+        self.max_bytes   = max_bytes
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def _drop(self, key):
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[2]
+
+    def get(self, key, version=None):
+        """(value, exp) sau None. Cu version: intrarea trebuie sa fie din aceeasi versiune."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, exp, _, ver = entry
+            if time.time() >= exp or (version is not None and ver != version):
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value, exp
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def put(self, key, value, exp: float, size: int, version=None):
+        with self._lock:
+            self._drop(key)
+            if size > self.max_bytes:
+                return
+            self._data[key] = (value, exp, size, version)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, _, old_size, _) = self._data.popitem(last=False)
+                self._bytes -= old_size
+                self.evictions += 1
+
+    def pop(self, key):
+        with self._lock:
+            self._drop(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries":     len(self._data),
+                "bytes":       self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes":   self.max_bytes,
+                "hits":        self.hits,
+                "misses":      self.misses,
+                "hit_rate":    round(self.hits / total, 3) if total else 0.0,
+                "evictions":   self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+_l1 = _LRU(L1_MAX_ENTRIES, L1_MAX_BYTES)
+_ns_versions: dict = {}   # namespace -> (versiune, momentul ultimei citiri din Redis)
 
 
 def _init():
-    global _REDIS_URL, _REDIS_TOKEN
+    global _REDIS_URL, _REDIS_TOKEN, _session
     _REDIS_URL   = os.getenv("UPSTASH_REDIS_REST_URL", "").rstrip("/")
     _REDIS_TOKEN = os.getenv("UPSTASH_REDIS_REST_TOKEN", "")
     if _REDIS_URL and _REDIS_TOKEN:
+        _session = req.Session()
+        # pool_maxsize acopera threadpool-ul FastAPI + thread-urile din background
+        _session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=32))
+        _session.mount("http://",  HTTPAdapter(pool_connections=1, pool_maxsize=32))
+        _session.headers["Authorization"] = f"Bearer {_REDIS_TOKEN}"
         logger.info("Redis cache activ: %s", _REDIS_URL)
     else:
         logger.warning("Redis neconfigurat - folosesc cache in memorie")
@@ -31,11 +129,8 @@ def _redis(command: list):
     if not _REDIS_URL:
         return None
     try:
-        r = req.post(
-            f"{_REDIS_URL}/{'/'.join(str(c) for c in command)}",
-            headers={"Authorization": f"Bearer {_REDIS_TOKEN}"},
-            timeout=3,
-        )
+        # Comanda in body JSON — valorile nu mai trec prin URL (lungime, caractere speciale)
+        r = _session.post(_REDIS_URL, json=[str(c) for c in command], timeout=_TIMEOUT)
         if r.status_code == 200:
             return r.json().get("result")
     except Exception as e:
@@ -43,61 +138,188 @@ def _redis(command: list):
     return None
 
 
+def _pipeline(commands: list) -> list:
+    """
+    Executa mai multe comenzi intr-un singur round trip (Upstash /pipeline).
+    Returneaza lista de rezultate in aceeasi ordine; None pentru comenzile esuate.
+    """
+    if not _REDIS_URL or not commands:
+        return [None] * len(commands)
+    try:
+        r = _session.post(
+            f"{_REDIS_URL}/pipeline",
+            json=[[str(c) for c in cmd] for cmd in commands],
+            timeout=_TIMEOUT,
+        )
+        if r.status_code == 200:
+            return [item.get("result") if isinstance(item, dict) else None for item in r.json()]
+    except Exception as e:
+        logger.warning("Redis pipeline error: %s", e)
+    return [None] * len(commands)
+
+
+def _loads(raw):
+    if raw is None:
+        return None
+    try:
+        return json.loads(raw)
+    except Exception:
+        return None
+
+
 def _make_key(namespace: str, key: str) -> str:
     h = hashlib.md5(key.encode()).hexdigest()[:8]
     return f"flopi:{namespace}:{h}"
 
 
+def _ver_key(namespace: str) -> str:
+    return f"flopi:ver:{namespace}"
+
+
+def _remember_version(namespace: str, version) -> str:
+    version = "0" if version is None else str(version)
+    _ns_versions[namespace] = (version, time.time())
+    return version
+
+
+def _current_version(namespace: str) -> str:
+    """Versiunea namespace-ului; recitita din Redis cel mult o data la L1_VERSION_CHECK secunde."""
+    known = _ns_versions.get(namespace)
+    if known and time.time() - known[1] < L1_VERSION_CHECK:
+        return known[0]
+    return _remember_version(namespace, _redis(["GET", _ver_key(namespace)]))
+
+
+def _remaining(exp: float) -> int:
+    return max(0, int(exp - time.time()))
+
+
 def get(namespace: str, key: str):
     """Returnează valoarea din cache sau None dacă lipsește/expirat."""
-    if not _REDIS_URL:
-        entry = _mem_cache.get(f"{namespace}:{key}")
-        if entry and time.time() < entry["exp"]:
-            return entry["data"]
-        return None
+    return get_with_ttl(namespace, key)[0]
+
 
+def get_with_ttl(namespace: str, key: str) -> tuple:
+    """(valoare, ttl ramas) — din L1 sau dintr-un singur round trip Redis. (None, -2) daca lipseste."""
     rkey = _make_key(namespace, key)
-    raw  = _redis(["GET", rkey])
-    if raw is None:
-        return None
-    try:
-        return json.loads(raw)
-    except Exception:
-        return None
+    if not _REDIS_URL:
+        hit = _l1.get(rkey)
+        return (_loads(hit[0]), _remaining(hit[1])) if hit else (None, -2)
+
+    # Versiunea se verifica doar daca L1 are intrarea — un miss rece e un singur round trip
+    if rkey in _l1:
+        hit = _l1.get(rkey, _current_version(namespace))
+        if hit:
+            return _loads(hit[0]), _remaining(hit[1])
+
+    raw, remaining, version = _pipeline([["GET", rkey], ["TTL", rkey], ["GET", _ver_key(namespace)]])
+    value = _loads(raw)
+    if value is None:
+        return None, -2
+    remaining = int(remaining) if remaining is not None else -2
+    version = _remember_version(namespace, version)
+    if remaining > 0:
+        _l1.put(rkey, raw, time.time() + remaining, len(raw), version)
+    return value, remaining
+
+
+def get_many(namespace: str, keys: list) -> dict:
+    """Citeste mai multe chei (L1, apoi un singur round trip pentru rest). {key: valoare} doar hit-uri."""
+    keys = list(keys)
+    if not keys:
+        return {}
+    if not _REDIS_URL:
+        found = {}
+        for k in keys:
+            hit = _l1.get(_make_key(namespace, k))
+            if hit:
+                found[k] = _loads(hit[0])
+        return found
+
+    version = _current_version(namespace) if any(_make_key(namespace, k) in _l1 for k in keys) else None
+    found, missing = {}, []
+    for k in keys:
+        hit = _l1.get(_make_key(namespace, k), version) if version is not None else None
+        if hit:
+            found[k] = _loads(hit[0])
+        else:
+            missing.append(k)
+    if not missing:
+        return found
+
+    rkeys = [_make_key(namespace, k) for k in missing]
+    results = _pipeline([["MGET", *rkeys]] + [["TTL", rk] for rk in rkeys] + [["GET", _ver_key(namespace)]])
+    raws, ttls, version = results[0] or [None] * len(rkeys), results[1:-1], results[-1]
+    version = _remember_version(namespace, version)
+    now = time.time()
+    for k, rk, raw, remaining in zip(missing, rkeys, raws, ttls):
+        value = _loads(raw)
+        if value is None:
+            continue
+        found[k] = value
+        if remaining is not None and int(remaining) > 0:
+            _l1.put(rk, raw, now + int(remaining), len(raw), version)
+    return found
 
 
 def set(namespace: str, key: str, value, ttl: int = 600):
     """Salvează valoarea în cache cu TTL în secunde."""
+    set_many(namespace, {key: value}, ttl=ttl)
+
+
+def set_many(namespace: str, items: dict, ttl: int = 600):
+    """Salveaza mai multe chei cu acelasi TTL intr-un singur round trip + bump versiune namespace."""
+    if not items:
+        return
+    serialized = {k: json.dumps(v, default=str) for k, v in items.items()}
+    exp = time.time() + ttl
     if not _REDIS_URL:
-        _mem_cache[f"{namespace}:{key}"] = {
-            "data": value,
-            "exp":  time.time() + ttl,
-        }
+        for k, raw in serialized.items():
+            _l1.put(_make_key(namespace, k), raw, exp, len(raw))
         return
 
-    rkey = _make_key(namespace, key)
-    serialized = json.dumps(value, default=str)
-    _redis(["SET", rkey, serialized, "EX", ttl])
+    results = _pipeline(
+        [["SET", _make_key(namespace, k), raw, "EX", ttl] for k, raw in serialized.items()]
+        + [["INCR", _ver_key(namespace)]]
+    )
+    if results[-1] is None:
+        return
+    version = _remember_version(namespace, results[-1])
+    for k, raw in serialized.items():
+        _l1.put(_make_key(namespace, k), raw, exp, len(raw), version)
 
 
 def delete(namespace: str, key: str):
     """Șterge o cheie din cache."""
+    delete_many(namespace, [key])
+
+
+def delete_many(namespace: str, keys: list):
+    """
+    Sterge mai multe chei dintr-un namespace (un DEL multi-cheie) si incrementeaza
+    versiunea namespace-ului, ca L1-ul celorlalti workeri sa nu mai serveasca valorile vechi.
+    """
+    keys = list(keys)
+    if not keys:
+        return
+    rkeys = [_make_key(namespace, k) for k in keys]
+    for rk in rkeys:
+        _l1.pop(rk)
     if not _REDIS_URL:
-        _mem_cache.pop(f"{namespace}:{key}", None)
         return
-    _redis(["DEL", _make_key(namespace, key)])
+    _, version = _pipeline([["DEL", *rkeys], ["INCR", _ver_key(namespace)]])
+    if version is not None:
+        _remember_version(namespace, version)
 
 
 def ttl(namespace: str, key: str) -> int:
     """Returneaza TTL-ul ramas in secunde. -2 daca lipseste, -1 daca nu are expirare."""
-    if not _REDIS_URL:
-        entry = _mem_cache.get(f"{namespace}:{key}")
-        if not entry:
-            return -2
-        return max(0, int(entry["exp"] - time.time()))
-    rkey = _make_key(namespace, key)
-    result = _redis(["TTL", rkey])
-    return int(result) if result is not None else -2
+    return get_with_ttl(namespace, key)[1]
+
+
+def stats() -> dict:
+    """Contoare L1 (hit/miss/evictions) pentru worker-ul curent."""
+    return {"backend": "redis" if _REDIS_URL else "memory", "l1": _l1.stats()}
 
 
 # Init la import
@@ -24,3 +24,29 @@ class CalibratedXGB:
     @property
     def feature_importances_(self):
         return self.model.feature_importances_
+
+
+class IsotonicTable:
+    """
+    Calibrator isotonic redus la tabelul (x, y) — echivalent cu
+    IsotonicRegression(out_of_bounds="clip").predict, fara dependinta de sklearn
+    la incarcare (folosit de artefactul split din model_store).
+    """
+    def __init__(self, x, y):
+        self.x = np.asarray(x)
+        self.y = np.asarray(y)
+
+    @classmethod
+    def from_isotonic(cls, ir):
+        return cls(ir.X_thresholds_, ir.y_thresholds_)
+
+    def predict(self, T):
+        x, y = self.x, self.y
+        T = np.clip(np.asarray(T, dtype=x.dtype), x[0], x[-1])
+        if len(x) == 1:
+            return np.full(T.shape, y[0], dtype=T.dtype)
+        # Interpolare liniara identica cu scipy interp1d (aceeasi ordine a operatiilor)
+        hi = np.clip(np.searchsorted(x, T), 1, len(x) - 1)
+        lo = hi - 1
+        slope = (y[hi] - y[lo]) / (x[hi] - x[lo])
+        return (slope * (T - x[lo]) + y[lo]).astype(T.dtype)
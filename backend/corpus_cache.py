@@ -0,0 +1,238 @@
+"""
+Cache Parquet al corpusului CSV (data/csv/club) — comun pentru train.py si train_no_odds.py.
+
+load_data() citea la fiecare antrenare ~700 de CSV-uri (pana la 3 separatori per
+fisier, low_memory=False), iar preprocess() reparsa datele si coerceea numerele.
+Aici fiecare CSV se ingereaza o singura data intr-un dataset Parquet tipizat:
+
+  data/parquet/club/Div=<liga>/season=<an>/<fisier>.parquet
+  data/parquet/manifest.json     fisier sursa -> mtime, size, sha1, fragmente
+
+  - Date e datetime64, scorurile si cotele float64, HomeTeam / AwayTeam / FTR
+    dictionary-encoded (categorical in pandas), Div si season sunt partitii;
+  - la fiecare load se reingereaza doar fisierele cu mtime/size schimbat si hash
+    diferit (download_data.py rescrie doar sezonul curent);
+  - se citesc doar coloanele cerute de trainer.
+
+Randurile se filtreaza la ingestie cu aceleasi reguli ca preprocess(), iar data se
+parseaza cu formatul pe care il deducea pandas pe corpusul concatenat (DATE_FORMAT) —
+antrenarea vede exact aceleasi meciuri, in aceeasi ordine (_file, _row).
+
+Fara pyarrow: available() e False si trainerele citesc CSV-urile ca inainte.
+
+Ingestie manuala / benchmark:  python corpus_cache.py [--rebuild]
+"""
+import os
+import glob
+import json
+import shutil
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+BASE_DIR    = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR  = os.path.join(BASE_DIR, "data", "csv", "club")
+CACHE_DIR   = os.path.join(BASE_DIR, "data", "parquet", "club")
+MANIFEST    = os.path.join(BASE_DIR, "data", "parquet", "manifest.json")
+CACHE_VERSION = 1
+
+# Formatul dedus de pd.to_datetime(dayfirst=True) pe corpusul concatenat (primul rand
+# e dd/mm/yyyy); randurile dd/mm/yy ies NaT si erau eliminate si inainte
+DATE_FORMAT = "%d/%m/%Y"
+
+BASE_COLS = ["Date", "HomeTeam", "AwayTeam", "FTHG", "FTAG", "FTR"]
+ODDS_COLS = ["PSH", "PSD", "PSA", "B365H", "B365D", "B365A", "AvgH", "AvgD", "AvgA",
+             "MaxH", "MaxD", "MaxA", "PSCH", "PSCD", "PSCA",
+             "BbAvH", "BbAvD", "BbAvA", "BbMxH", "BbMxD", "BbMxA"]
+_CATEGORICAL = ["HomeTeam", "AwayTeam", "FTR"]
+
+
+def available() -> bool:
+    return pa is not None
+
+
+def source_files(source_dir: str = SOURCE_DIR) -> list:
+    """Aceeasi lista (si ordine) ca glob-ul din load_data."""
+    return glob.glob(os.path.join(source_dir, "**", "*.csv"), recursive=True)
+
+
+def _read_csv(path: str):
+    for sep in ["\t", ",", ";"]:
+        try:
+            df = pd.read_csv(path, sep=sep, encoding="utf-8-sig",
+                             on_bad_lines="skip", low_memory=False)
+            if len(df.columns) >= 6:
+                return df
+        except Exception:
+            continue
+    return None
+
+
+def _clean(df: pd.DataFrame, rel: str) -> pd.DataFrame | None:
+    """Regulile de rand din preprocess(), aplicate pe un singur fisier."""
+    if any(c not in df.columns for c in BASE_COLS):
+        return None
+    keep = BASE_COLS + ["Div"] + [c for c in ODDS_COLS if c in df.columns]
+    df = df[[c for c in keep if c in df.columns]].copy()
+    df["_row"] = np.arange(len(df), dtype=np.int32)
+    df["FTHG"] = pd.to_numeric(df["FTHG"], errors="coerce").astype(np.float64)
+    df["FTAG"] = pd.to_numeric(df["FTAG"], errors="coerce").astype(np.float64)
+    df["FTR"]  = df["FTR"].astype(str).str.strip()
+    df = df.dropna(subset=["FTHG", "FTAG", "FTR", "HomeTeam", "AwayTeam"])
+    df = df[df["FTR"].isin(["H", "D", "A"])]
+    df["Date"] = pd.to_datetime(df["Date"], format=DATE_FORMAT, errors="coerce")
+    df = df.dropna(subset=["Date"])
+    df["Div"] = df["Div"].astype(str).str.strip() if "Div" in df.columns else "UNK"
+    for c in ODDS_COLS:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype(np.float64)
+    df["HomeTeam"] = df["HomeTeam"].astype(str)
+    df["AwayTeam"] = df["AwayTeam"].astype(str)
+    # Sezonul incepe in iulie: 2023-08-12 -> 2023, 2024-03-02 -> 2023
+    df["season"] = (df["Date"].dt.year - (df["Date"].dt.month < 7)).astype(np.int32)
+    df["_file"] = rel
+    return df
+
+
+def _sha1(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _load_manifest() -> dict:
+    try:
+        with open(MANIFEST) as f:
+            m = json.load(f)
+        if m.get("version") == CACHE_VERSION:
+            return m
+    except (OSError, ValueError):
+        pass
+    return {"version": CACHE_VERSION, "files": {}}
+
+
+def _drop_fragments(entry: dict):
+    for frag in entry.get("fragments", []):
+        try:
+            os.remove(os.path.join(CACHE_DIR, frag))
+        except FileNotFoundError:
+            pass
+
+
+def _write_fragments(df: pd.DataFrame, rel: str) -> list:
+    name = hashlib.sha1(rel.encode()).hexdigest()[:16]
+    frags = []
+    for (div, season), part in df.groupby(["Div", "season"], sort=True):
+        sub = os.path.join(f"Div={div}", f"season={season}")
+        os.makedirs(os.path.join(CACHE_DIR, sub), exist_ok=True)
+        frag = os.path.join(sub, f"{name}.parquet")
+        table = pa.Table.from_pandas(part.drop(columns=["Div", "season"]), preserve_index=False)
+        for c in _CATEGORICAL + ["_file"]:
+            i = table.schema.get_field_index(c)
+            table = table.set_column(i, c, table.column(c).dictionary_encode())
+        pq.write_table(table, os.path.join(CACHE_DIR, frag))
+        frags.append(frag)
+    return frags
+
+
+def sync(source_dir: str = SOURCE_DIR, rebuild: bool = False) -> dict:
+    """Ingereaza fisierele noi / modificate si sterge fragmentele fisierelor disparute."""
+    if rebuild:
+        shutil.rmtree(CACHE_DIR, ignore_errors=True)
+    manifest = _load_manifest() if not rebuild else {"version": CACHE_VERSION, "files": {}}
+    entries  = manifest["files"]
+    files    = source_files(source_dir)
+    seen     = set()
+    ingested = 0
+
+    for path in files:
+        rel = os.path.relpath(path, source_dir)
+        seen.add(rel)
+        st = os.stat(path)
+        entry = entries.get(rel)
+        if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            continue
+        digest = _sha1(path)
+        if entry and entry["sha1"] == digest:
+            entry["mtime_ns"], entry["size"] = st.st_mtime_ns, st.st_size
+            continue
+
+        if entry:
+            _drop_fragments(entry)
+        raw = _read_csv(path)
+        df  = _clean(raw, rel) if raw is not None else None
+        frags = _write_fragments(df, rel) if df is not None and len(df) else []
+        entries[rel] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size, "sha1": digest,
+                        "rows": 0 if df is None else len(df), "fragments": frags}
+        ingested += 1
+
+    removed = [rel for rel in entries if rel not in seen]
+    for rel in removed:
+        _drop_fragments(entries.pop(rel))
+
+    if ingested or removed or rebuild:
+        os.makedirs(os.path.dirname(MANIFEST), exist_ok=True)
+        with open(MANIFEST + ".tmp", "w") as f:
+            json.dump(manifest, f)
+        os.replace(MANIFEST + ".tmp", MANIFEST)
+    if ingested or removed:
+        print(f"[corpus_cache] {ingested} fisiere (re)ingerate, {len(removed)} sterse")
+    return {"files": len(files), "ingested": ingested, "removed": len(removed)}
+
+
+def load(columns: list = None, source_dir: str = SOURCE_DIR) -> pd.DataFrame:
+    """
+    Meciurile valide din cache (dupa sync), in ordinea in care le-ar fi concatenat
+    load_data() din CSV-uri. columns: coloanele dorite (None = toate); Div e mereu inclus.
+    """
+    sync(source_dir)
+    files = source_files(source_dir)
+    if not os.path.isdir(CACHE_DIR) or not os.listdir(CACHE_DIR):
+        return pd.DataFrame(columns=BASE_COLS + ["Div"])
+
+    # Fisierele au seturi diferite de coloane de cote — schema = reuniunea lor
+    part = ds.partitioning(pa.schema([("Div", pa.string()), ("season", pa.int32())]), flavor="hive")
+    paths = ds.dataset(CACHE_DIR, format="parquet", partitioning=part).files
+    schema = pa.unify_schemas([pq.read_schema(p) for p in paths] + [part.schema])
+    dataset = ds.dataset(paths, schema=schema, format="parquet", partitioning=part,
+                         partition_base_dir=CACHE_DIR)
+    names = dataset.schema.names
+    cols = names if columns is None else [c for c in dict.fromkeys(list(columns) + ["Div"]) if c in names]
+    cols = [c for c in cols if c not in ("_file", "_row", "season")] + ["_file", "_row"]
+    data = dataset.to_table(columns=cols).to_pandas()
+
+    # Ordinea originala: pozitia fisierului in glob, apoi randul din fisier
+    rank = {os.path.relpath(p, source_dir): i for i, p in enumerate(files)}
+    data["_rank"] = data["_file"].astype(str).map(rank)
+    data = data.dropna(subset=["_rank"]).sort_values(["_rank", "_row"], kind="stable")
+    data = data.drop(columns=["_file", "_row", "_rank"]).reset_index(drop=True)
+
+    # Restul pipeline-ului lucreaza cu nume str (chei de dict, comparatii lexicografice)
+    for c in ["HomeTeam", "AwayTeam", "FTR", "Div"]:
+        if c in data.columns:
+            data[c] = data[c].astype(str)
+    return data
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    if not available():
+        sys.exit("pyarrow lipsa — pip install pyarrow")
+    t = time.perf_counter()
+    res = sync(rebuild="--rebuild" in sys.argv)
+    print(f"[corpus_cache] sync: {res} in {time.perf_counter() - t:.2f}s")
+    t = time.perf_counter()
+    df = load()
+    print(f"[corpus_cache] load: {len(df):,} meciuri, {df.shape[1]} coloane in {time.perf_counter() - t:.2f}s")
@@ -0,0 +1,136 @@
+"""
+Raspunsul /api/daily pre-serializat — bytes gata de trimis, per tier, cu ETag.
+
+Pana acum fiecare request construia dict-ul zilei, aplica _mask_vip_picks si il
+trecea prin encoder-ul JSON din FastAPI (validare + json.dumps) — desi payload-ul
+era deja serializat o data in Redis (cache.set) si in Supabase. Endpoint-ul cel
+mai accesat platea serializarea la fiecare request.
+
+Acum:
+  - intrarea canonica din cache (_canonical_daily) are `_rev`, hash-ul continutului
+    — acelasi in toate procesele, deci ETag-ul e puternic si stabil intre workeri;
+  - un render = vederea pentru un prefix de k pick-uri (min_confidence), mascata
+    pentru un tier (free: VIP mascat + primele 3; analyst: VIP mascat; full:
+    pro/vip/admin), serializata cu orjson, plus varianta gzip (si brotli daca
+    pachetul e instalat);
+  - render-urile se tin in proces (LRU MAX_RENDERS) pe cheia (data, _rev, tier, k):
+    cele trei tier-uri pentru pragul implicit se pregatesc cand se construieste
+    intrarea canonica (o data per calcul / per umplere a cache-ului), restul la
+    primul request;
+  - If-None-Match egal cu ETag-ul -> 304 fara body.
+
+Fara orjson: acelasi strat cu json din stdlib (doar serializarea e mai lenta).
+"""
+import gzip
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+TIERS       = ("free", "analyst", "full")
+MAX_RENDERS = 64
+COMPRESS_MIN = 1024     # sub atatia bytes nu merita comprimat
+
+# Useri reprezentativi per tier — ce vede _mask_vip_picks
+TIER_USERS = {
+    "free":    {"tier": "free"},
+    "analyst": {"tier": "analyst"},
+    "full":    {"tier": "vip"},
+}
+
+_renders: OrderedDict = OrderedDict()
+_lock = threading.Lock()
+
+
+def dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS, default=str)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str).encode()
+
+
+def revision(data: dict) -> str:
+    """Hash-ul continutului (fara cheile interne `_*`) — baza ETag-ului."""
+    public = {k: v for k, v in data.items() if not k.startswith("_")}
+    return hashlib.sha1(dumps(public)).hexdigest()[:16]
+
+
+def tier(user) -> str:
+    """Tier-ul de randare, cu aceleasi reguli ca _mask_vip_picks."""
+    t    = (user or {}).get("tier", "free")
+    role = (user or {}).get("role", "user")
+    if t in ("pro", "vip", "owner") or role in ("owner", "admin"):
+        return "full"
+    return "analyst" if t == "analyst" else "free"
+
+
+def get(date: str, canon: dict, k: int, tier_name: str, build) -> dict:
+    """
+    Render-ul (data, tier, k); build(tier_name) -> payload dict, apelat doar la miss.
+    Returneaza {"etag", "identity", "gzip", "br"} (variantele comprimate pot fi None).
+    """
+    rev = canon.get("_rev") or revision(canon)
+    key = (date, rev, tier_name, k)
+    with _lock:
+        hit = _renders.get(key)
+        if hit is not None:
+            _renders.move_to_end(key)
+            return hit
+
+    body = dumps(build(tier_name))
+    big  = len(body) >= COMPRESS_MIN
+    render = {
+        "etag":     f"{rev}-{tier_name}-{k}",
+        "identity": body,
+        "gzip":     gzip.compress(body, 6) if big else None,
+        "br":       brotli.compress(body, quality=5) if big and brotli is not None else None,
+    }
+    with _lock:
+        _renders[key] = render
+        while len(_renders) > MAX_RENDERS:
+            _renders.popitem(last=False)
+    return render
+
+
+def prerender(date: str, canon: dict, k: int, build):
+    """Toate tier-urile pentru un prag — la construirea intrarii canonice."""
+    for t in TIERS:
+        get(date, canon, k, t, build)
+
+
+def _encoding(accept: str, render: dict) -> str:
+    accepted = {part.split(";")[0].strip().lower() for part in (accept or "").split(",")}
+    if render["br"] is not None and "br" in accepted:
+        return "br"
+    if render["gzip"] is not None and "gzip" in accepted:
+        return "gzip"
+    return "identity"
+
+
+def respond(request, render: dict):
+    """Response cu bytes-ii pre-calculati; 304 daca clientul are deja varianta."""
+    from fastapi.responses import Response
+
+    enc  = _encoding(request.headers.get("accept-encoding", ""), render)
+    # ETag puternic per reprezentare — variantele comprimate au alt ETag
+    etag = f'"{render["etag"]}"' if enc == "identity" else f'"{render["etag"]}-{enc}"'
+    headers = {
+        "ETag":          etag,
+        "Vary":          "Accept-Encoding, Authorization",
+        "Cache-Control": "private, no-cache",
+    }
+    inm = request.headers.get("if-none-match", "")
+    if inm and (inm.strip() == "*" or etag in {t.strip().removeprefix("W/") for t in inm.split(",")}):
+        return Response(status_code=304, headers=headers)
+    if enc != "identity":
+        headers["Content-Encoding"] = enc
+    return Response(content=render[enc], media_type="application/json", headers=headers)
@@ -11,6 +11,7 @@ import logging
 from datetime import datetime, timedelta
 from typing import Optional
 from data.leagues import FOOTBALL_DATA_COMPETITION_MAP
+import rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -98,12 +99,16 @@ class DataFetcher:
         self._request_count += 1
         logger.info(f"FD request #{self._request_count}: {endpoint}")
         try:
+            # Buget football-data partajat cu compute-ul zilnic (care are prioritate)
+            await rate_limiter.acquire_async("football-data", rate_limiter.PRIORITY_STANDINGS)
             session = await self._get_session()
             url = f"{FD_BASE}/{endpoint}"
             async with session.get(url, params=params) as resp:
+                await asyncio.to_thread(rate_limiter.observe, "football-data", resp.headers)
                 if resp.status == 429:
-                    logger.warning("Rate limit — aștept 60s")
-                    await asyncio.sleep(60)
+                    wait = rate_limiter.retry_after("football-data", resp.headers)
+                    logger.warning(f"Rate limit — pauza {wait:.0f}s pentru toate procesele")
+                    await asyncio.to_thread(rate_limiter.penalize, "football-data", wait)
                     return {}
                 if resp.status in (400, 403, 404):
                     logger.warning(f"FD {resp.status} pentru {endpoint}")
@@ -59,3 +59,8 @@ if __name__ == "__main__":
         if download_league(league):
             ok += 1
     print(f"\nComplet: {ok}/{len(LEAGUES)} ligi actualizate.")
+
+    # Reingereaza in cache-ul Parquet doar fisierele rescrise acum
+    import corpus_cache
+    if corpus_cache.available():
+        print(f"Cache Parquet: {corpus_cache.sync()}")
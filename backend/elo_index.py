@@ -0,0 +1,67 @@
+"""
+Index echipa -> Elo intern.
+elo_ratings din model.pkl are chei "liga|echipa" (o echipa poate aparea in mai multe
+ligi dupa promovare/retrogradare). Lookup-ul ia cel mai mare Elo al echipei;
+indexul se construieste o singura data la load, apoi lookup-ul e un dict hit.
+
+Micro-benchmark: python elo_index.py [model.pkl]
+"""
+import pickle
+import random
+import timeit
+
+DEFAULT_ELO = 1500.0
+
+
+def build_team_elo_index(elo_ratings: dict) -> dict:
+    """{"liga|echipa": elo} -> {echipa: max(elo)}."""
+    index: dict = {}
+    for key, elo in (elo_ratings or {}).items():
+        team = key.split("|", 1)[-1]
+        prev = index.get(team)
+        if prev is None or elo > prev:
+            index[team] = elo
+    return index
+
+
+def _bench(elo_ratings: dict, n_lookups: int = 2000):
+    """Compara scanarea liniara (implementarea veche) cu lookup-ul in index."""
+    teams = list({k.split("|", 1)[-1] for k in elo_ratings}) + ["__necunoscuta__"]
+    sample = [random.choice(teams) for _ in range(n_lookups)]
+
+    def scan():
+        for team in sample:
+            vals = [v for k, v in elo_ratings.items() if k.split("|", 1)[-1] == team]
+            max(vals) if vals else DEFAULT_ELO
+
+    index = build_team_elo_index(elo_ratings)
+
+    def lookup():
+        for team in sample:
+            index.get(team, DEFAULT_ELO)
+
+    for team in sample:
+        vals = [v for k, v in elo_ratings.items() if k.split("|", 1)[-1] == team]
+        assert index.get(team, DEFAULT_ELO) == (max(vals) if vals else DEFAULT_ELO), team
+
+    t_build = timeit.timeit(lambda: build_team_elo_index(elo_ratings), number=10) / 10
+    t_scan  = timeit.timeit(scan, number=1) / n_lookups
+    t_index = timeit.timeit(lookup, number=20) / (20 * n_lookups)
+    print(f"[elo_index] {len(elo_ratings)} chei, {len(index)} echipe")
+    print(f"  build index : {t_build * 1e3:8.3f} ms (o data la load)")
+    print(f"  scan        : {t_scan * 1e6:8.2f} us / lookup")
+    print(f"  index       : {t_index * 1e6:8.3f} us / lookup  (x{t_scan / t_index:,.0f})")
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1:
+        with open(sys.argv[1], "rb") as f:
+            ratings = pickle.load(f).get("elo_ratings", {})
+    else:
+        # Tabel sintetic de marimea celui real: ~40 ligi x ~20 echipe, cu echipe in 2 ligi
+        ratings = {}
+        for lg in range(40):
+            for tm in range(20):
+                ratings[f"L{lg}|T{lg * 15 + tm}"] = random.uniform(1200, 2000)
+    _bench(ratings)
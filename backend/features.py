@@ -0,0 +1,725 @@
+"""
+Feature engineering comun pentru train.py si train_no_odds.py (si train_all.py).
+
+Incarcare + curatare corpus, Elo per liga, forma / atac / aparare, H2H, cote si
+market data, asamblarea matricei si team_stats pentru predictor. build_base()
+calculeaza o singura data partea comuna (Elo, echipe, H2H); modelul cu cote
+adauga doar coloanele de piata peste matricea de baza (with_market).
+"""
+import os
+import glob
+import warnings
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import LabelEncoder
+from elo_index import build_team_elo_index, DEFAULT_ELO
+from elo_engine import replay_frame, draw_prob
+import corpus_cache
+import model_store
+from team_names import UNDERSTAT_TO_CSV
+from state_refresh import save_state, team_window, stats_from_window
+
+warnings.filterwarnings("ignore")
+
+BASE_DIR    = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR    = os.path.join(BASE_DIR, "data", "csv", "club")
+XG_PATH     = os.path.join(BASE_DIR, "data", "csv", "fbref_xg.csv")
+MIN_MATCHES = 6
+WINDOWS     = [3, 5, 10]
+ELO_K       = 32
+ELO_HOME    = 50
+
+
+# ─────────────────────────────────────────────────────────
+# 1. INCARCARE DATE
+# ─────────────────────────────────────────────────────────
+def load_data(with_odds: bool = True):
+    # Cache Parquet comun (reingereaza doar CSV-urile modificate); fara pyarrow — CSV-urile
+    if corpus_cache.available():
+        print(">>> Incarc meciurile din cache-ul Parquet...")
+        cols = corpus_cache.BASE_COLS + ["Div"] + (corpus_cache.ODDS_COLS if with_odds else [])
+        data = corpus_cache.load(cols)
+        print(f"    Total randuri (deja filtrate): {len(data)}")
+        return data
+    print(">>> Incarc CSV-uri...")
+    files = glob.glob(os.path.join(DATA_DIR, "**", "*.csv"), recursive=True)
+    print(f"    Gasit {len(files)} fisiere.")
+    dfs = []
+    for f in files:
+        for sep in ["\t", ",", ";"]:
+            try:
+                df = pd.read_csv(f, sep=sep, encoding="utf-8-sig",
+                                 on_bad_lines="skip", low_memory=False)
+                if len(df.columns) >= 6:
+                    dfs.append(df)
+                    break
+            except Exception:
+                continue
+    data = pd.concat(dfs, ignore_index=True)
+    print(f"    Total randuri brute: {len(data)}")
+    return data
+
+
+# ─────────────────────────────────────────────────────────
+# 1b. INCARCARE xG REAL (Understat)
+# ─────────────────────────────────────────────────────────
+def load_xg_data():
+    """
+    Incarca xG real din fbref_xg.csv (scrapat din Understat).
+    Returneaza un dict: (Div, date_str, home_lower, away_lower) -> (xg_h, xg_a)
+    Aplica mapare de nume Understat -> CSV pentru a creste rata de match.
+    """
+    if not os.path.exists(XG_PATH):
+        print("    xG file lipsa — se foloseste proxy din goluri")
+        return {}
+
+    xg_df = pd.read_csv(XG_PATH)
+    xg_df["Date"] = pd.to_datetime(xg_df["Date"], errors="coerce").dt.date
+    xg_df = xg_df.dropna(subset=["Date", "HomeTeam", "AwayTeam", "xg_h", "xg_a"])
+
+    def normalize(name):
+        n = str(name).strip().lower()
+        return UNDERSTAT_TO_CSV.get(n, n)
+
+    xg_df["_h"] = xg_df["HomeTeam"].apply(normalize)
+    xg_df["_a"] = xg_df["AwayTeam"].apply(normalize)
+
+    lookup = {}
+    for _, row in xg_df.iterrows():
+        key = (str(row["Div"]), str(row["Date"]), row["_h"], row["_a"])
+        lookup[key] = (float(row["xg_h"]), float(row["xg_a"]))
+
+    print(f"    xG real incarcat: {len(lookup):,} meciuri ({xg_df['Div'].nunique()} ligi)")
+    return lookup
+
+
+# ─────────────────────────────────────────────────────────
+# 2. CURATARE DATE
+# ─────────────────────────────────────────────────────────
+def preprocess(data, with_odds: bool = True):
+    cols = ["Date", "HomeTeam", "AwayTeam", "FTHG", "FTAG", "FTR"]
+    missing = [c for c in cols if c not in data.columns]
+    if missing:
+        raise RuntimeError(f"Coloane lipsa: {missing}")
+
+    # Pastram si coloanele de cote daca exista (PS*, B365*, Avg*, Max* + variantele vechi Bb*)
+    odds_cols = corpus_cache.ODDS_COLS if with_odds else []
+    extra = ["Div"] + [c for c in odds_cols if c in data.columns]
+    keep = cols + extra
+    keep = list(dict.fromkeys(keep))  # deduplicare
+    data = data[keep].copy()
+    data["FTHG"] = pd.to_numeric(data["FTHG"], errors="coerce")
+    data["FTAG"] = pd.to_numeric(data["FTAG"], errors="coerce")
+    data["FTR"]  = data["FTR"].astype(str).str.strip()
+    data = data.dropna(subset=["FTHG", "FTAG", "FTR", "HomeTeam", "AwayTeam"])
+    data = data[data["FTR"].isin(["H", "D", "A"])]
+    data["Date"] = pd.to_datetime(data["Date"], dayfirst=True, errors="coerce")
+    data = data.dropna(subset=["Date"])
+
+    # Liga — folosim Div ca identificator de liga
+    if "Div" in data.columns:
+        data["Div"] = data["Div"].astype(str).str.strip()
+    else:
+        data["Div"] = "UNK"
+
+    data = data.sort_values("Date").reset_index(drop=True)
+    print(f"    Meciuri valide: {len(data)}")
+    return data
+
+
+# ─────────────────────────────────────────────────────────
+# 3. MARKET DATA — cote → probabilitati implicite
+# ─────────────────────────────────────────────────────────
+def build_market_features(data):
+    """
+    Market Intelligence features — COV, CLV, steam/drift, sharp-soft divergence.
+
+    Surse de date necesare (football-data.co.uk):
+      PSH/PSD/PSA   = Pinnacle opening (pre-match)
+      PSCH/PSCD/PSCA = Pinnacle closing (la startul meciului) ← cel mai sharp bookmaker
+      MaxH/MaxD/MaxA = Maximum la close (toate casele)
+      AvgH/AvgD/AvgA = Media la close
+      B365H/B365D/B365A = Bet365 (soft book, reflecta opinia publicului)
+    """
+    print(">>> Calculez Market Intelligence features (COV/CLV/Steam/Sharp)...")
+    result = pd.DataFrame(index=data.index)
+
+    has_ps_open  = all(c in data.columns for c in ["PSH",  "PSD",  "PSA"])
+    has_ps_close = all(c in data.columns for c in ["PSCH", "PSCD", "PSCA"])
+    has_avg      = all(c in data.columns for c in ["AvgH", "AvgD", "AvgA"])
+    has_max      = all(c in data.columns for c in ["MaxH", "MaxD", "MaxA"])
+    has_b365     = all(c in data.columns for c in ["B365H","B365D","B365A"])
+
+    def safe_num(col):
+        return pd.to_numeric(data[col], errors="coerce").where(lambda x: x > 1.01) if col in data.columns else pd.Series(np.nan, index=data.index)
+
+    # ── 1. Pinnacle line movement: opening → closing ───────────────────────
+    if has_ps_open and has_ps_close:
+        psh, psd, psa   = safe_num("PSH"),  safe_num("PSD"),  safe_num("PSA")
+        psch, pscd, psca = safe_num("PSCH"), safe_num("PSCD"), safe_num("PSCA")
+
+        # Miscarea relativa: >0 = cota crescut (drift), <0 = cota scazut (steam = bani intrați)
+        result["ps_move_h"] = ((psch / psh) - 1).clip(-0.40, 0.40)
+        result["ps_move_a"] = ((psca / psa) - 1).clip(-0.40, 0.40)
+        result["ps_move_d"] = ((pscd / psd) - 1).clip(-0.40, 0.40)
+
+        # Directie binara
+        result["home_steamed"] = (psch < psh * 0.98).astype(float)   # bani pe gazda
+        result["away_steamed"] = (psca < psa * 0.98).astype(float)   # bani pe oaspete
+        result["home_drifted"] = (psch > psh * 1.03).astype(float)   # piata fuge de gazda
+        result["away_drifted"] = (psca > psa * 1.03).astype(float)
+
+        # Closing Line Value (CLV): prob implicita la close vs open
+        vig_o = (1/psh + 1/psd + 1/psa).clip(lower=0.9)
+        vig_c = (1/psch + 1/pscd + 1/psca).clip(lower=0.9)
+        result["clv_h"] = ((1/psch)/vig_c - (1/psh)/vig_o).clip(-0.15, 0.15)
+        result["clv_a"] = ((1/psca)/vig_c - (1/psa)/vig_o).clip(-0.15, 0.15)
+
+        # Reverse line movement: cota a scazut DAR linia implicitly se misca invers
+        # → public pariaza pe favorit, dar sharp money e pe cealalta parte
+        result["reverse_line_h"] = ((result["home_steamed"] == 1) & (result["clv_h"] < -0.02)).astype(float)
+        result["reverse_line_a"] = ((result["away_steamed"] == 1) & (result["clv_a"] < -0.02)).astype(float)
+
+        print(f"    Pinnacle movement data: {(psch.notna()).sum():,} meciuri cu PS closing")
+    else:
+        for col in ["ps_move_h","ps_move_a","ps_move_d",
+                    "home_steamed","away_steamed","home_drifted","away_drifted",
+                    "clv_h","clv_a","reverse_line_h","reverse_line_a"]:
+            result[col] = 0.0
+        print("    ATENTIE: PSH/PSCH lipsa — features de miscare setate la 0")
+
+    # ── 2. Sharp vs Soft divergence ────────────────────────────────────────
+    # Pinnacle (sharp) vs Bet365 (soft/public sentiment)
+    ps_close_h = safe_num("PSCH") if has_ps_close else safe_num("PSH")
+    ps_close_a = safe_num("PSCA") if has_ps_close else safe_num("PSA")
+
+    if has_b365:
+        b365h, b365a = safe_num("B365H"), safe_num("B365A")
+        result["sharp_soft_div_h"] = (ps_close_h - b365h).clip(-1.0, 1.0)
+        result["sharp_soft_div_a"] = (ps_close_a - b365a).clip(-1.0, 1.0)
+        # >0 = Pinnacle mai mare = piata sharp nu favorizeaza echipa → public o supraevalueaza
+        result["public_fav_h"] = (result["sharp_soft_div_h"] > 0.08).astype(float)
+        result["public_fav_a"] = (result["sharp_soft_div_a"] > 0.08).astype(float)
+    elif has_avg:
+        avgh, avga = safe_num("AvgH"), safe_num("AvgA")
+        result["sharp_soft_div_h"] = (ps_close_h - avgh).clip(-1.0, 1.0)
+        result["sharp_soft_div_a"] = (ps_close_a - avga).clip(-1.0, 1.0)
+        result["public_fav_h"] = (result["sharp_soft_div_h"] > 0.08).astype(float)
+        result["public_fav_a"] = (result["sharp_soft_div_a"] > 0.08).astype(float)
+    else:
+        for col in ["sharp_soft_div_h","sharp_soft_div_a","public_fav_h","public_fav_a"]:
+            result[col] = 0.0
+
+    # ── 3. Closing Odds Variance (dezacord între bookmakers la close) ───────
+    close_cols_h = [c for c in ["PSCH","MaxH","AvgH","B365H"] if c in data.columns]
+    close_cols_a = [c for c in ["PSCA","MaxA","AvgA","B365A"] if c in data.columns]
+
+    if len(close_cols_h) >= 2:
+        close_mat_h = pd.concat([safe_num(c) for c in close_cols_h], axis=1)
+        close_mat_a = pd.concat([safe_num(c) for c in close_cols_a], axis=1)
+        result["close_var_h"] = close_mat_h.std(axis=1).fillna(0).clip(0, 1.0)
+        result["close_var_a"] = close_mat_a.std(axis=1).fillna(0).clip(0, 1.0)
+        # COV ridicat = piata nesigura = informatie valoroasa
+        result["high_cov_h"] = (result["close_var_h"] > 0.10).astype(float)
+        result["high_cov_a"] = (result["close_var_a"] > 0.10).astype(float)
+    else:
+        for col in ["close_var_h","close_var_a","high_cov_h","high_cov_a"]:
+            result[col] = 0.0
+
+    # ── 4. Market efficiency (vig) ─────────────────────────────────────────
+    if has_max:
+        maxh, maxd, maxa = safe_num("MaxH"), safe_num("MaxD"), safe_num("MaxA")
+        result["market_vig"] = (1/maxh + 1/maxd + 1/maxa - 1).clip(0, 0.25)
+        result["low_vig"]    = (result["market_vig"] < 0.04).astype(float)
+    else:
+        result["market_vig"] = 0.05
+        result["low_vig"]    = 0.0
+
+    # ── 5. Value zone 1.60–2.10 + interactiuni ────────────────────────────
+    ref_h = safe_num("PSCH") if has_ps_close else (safe_num("MaxH") if has_max else safe_num("PSH"))
+    ref_a = safe_num("PSCA") if has_ps_close else (safe_num("MaxA") if has_max else safe_num("PSA"))
+
+    result["value_zone_h"] = ((ref_h >= 1.60) & (ref_h <= 2.10)).astype(float)
+    result["value_zone_a"] = ((ref_a >= 1.60) & (ref_a <= 2.10)).astype(float)
+
+    # Interactiuni: drift/steam IN zona de valoare → semnalul cel mai puternic pentru surprize
+    result["drift_in_value_h"] = result.get("home_drifted", pd.Series(0.0, index=data.index)) \
+                                  * result["value_zone_h"]
+    result["steam_in_value_a"] = result.get("away_steamed", pd.Series(0.0, index=data.index)) \
+                                  * result["value_zone_a"]
+    result["trap_game_h"] = (
+        (result["value_zone_h"] == 1) &
+        (result.get("home_drifted", pd.Series(0.0, index=data.index)) == 1) &
+        (result.get("sharp_soft_div_h", pd.Series(0.0, index=data.index)) > 0.05)
+    ).astype(float)
+
+    result = result.fillna(0.0)
+
+    n_cols    = len(result.columns)
+    n_nonzero = (result != 0).any(axis=1).sum()
+    print(f"    Market Intelligence: {n_cols} features, {n_nonzero:,}/{len(data):,} meciuri cu date ({n_nonzero/len(data)*100:.1f}%)")
+    return result
+
+
+def build_odds_features(data):
+    """
+    Converteste cotele bookmakerilor in probabilitati normalizate.
+    Pinnacle (PS) este cel mai sharp bookmaker — cel mai valoros feature.
+    Meciurile fara cote primesc valori medii (has_odds=0).
+    """
+    print(">>> Procesez cote bookmakers...")
+    result = pd.DataFrame(index=data.index)
+
+    sources = [
+        ("ps",   "PSH",   "PSD",   "PSA"),    # Pinnacle — cel mai sharp
+        ("avg",  "AvgH",  "AvgD",  "AvgA"),   # Media pietei
+        ("b365", "B365H", "B365D", "B365A"),  # Bet365
+        ("max",  "MaxH",  "MaxD",  "MaxA"),   # Maximul pietei
+    ]
+
+    any_odds = pd.Series(False, index=data.index)
+
+    for name, ch, cd, ca in sources:
+        if not all(c in data.columns for c in [ch, cd, ca]):
+            continue
+        h = pd.to_numeric(data[ch], errors="coerce").where(lambda x: x > 1.01)
+        d = pd.to_numeric(data[cd], errors="coerce").where(lambda x: x > 1.01)
+        a = pd.to_numeric(data[ca], errors="coerce").where(lambda x: x > 1.01)
+
+        raw_h = 1.0 / h
+        raw_d = 1.0 / d
+        raw_a = 1.0 / a
+        margin = raw_h + raw_d + raw_a  # overround (1.05-1.08 tipic)
+
+        # Probabilitati normalizate (suma = 1.0)
+        result[f"mkt_ph_{name}"] = raw_h / margin
+        result[f"mkt_pd_{name}"] = raw_d / margin
+        result[f"mkt_pa_{name}"] = raw_a / margin
+        result[f"mkt_margin_{name}"] = margin
+
+        valid = (raw_h.notna() & raw_d.notna() & raw_a.notna())
+        any_odds = any_odds | valid
+
+    result["has_odds"] = any_odds.astype(float)
+
+    # Inlocuieste NaN cu media datelor (meciuri fara cote = "meci mediu")
+    for col in result.columns:
+        if col != "has_odds":
+            mean_val = result.loc[any_odds, col].mean()
+            if pd.notna(mean_val):
+                result[col] = result[col].fillna(mean_val)
+
+    n_with = any_odds.sum()
+    print(f"    Meciuri cu cote: {n_with:,} / {len(data):,} ({n_with/len(data)*100:.1f}%)")
+    return result
+
+
+# ─────────────────────────────────────────────────────────
+# 4. ELO PER LIGA (fix principal — nu global!)
+# ─────────────────────────────────────────────────────────
+def build_elo_features(data):
+    """
+    Elo calculat SEPARAT per liga.
+    Echipele din ligi diferite nu se influenteaza reciproc.
+    Elo porneste de la 1500 la prima aparitie in fiecare liga.
+    Recurenta ruleaza in elo_engine (kernel comun cu servirea).
+    """
+    print(">>> Calculez Elo per liga...")
+    h_elo, a_elo, ea, elo_ratings_flat = replay_frame(data, k=ELO_K, home_adv=ELO_HOME)
+    elo_diff = (h_elo + ELO_HOME) - a_elo
+    # Prob estimate H/D/A din Elo
+    dp = draw_prob(elo_diff)
+
+    return pd.DataFrame({
+        "h_elo":      h_elo,
+        "a_elo":      a_elo,
+        "elo_diff":   elo_diff,
+        "elo_prob_h": ea * (1 - dp),
+        "elo_prob_d": dp,
+    }, index=data.index), elo_ratings_flat
+
+
+# ─────────────────────────────────────────────────────────
+# Ferestre rolling "fara leakage" pe intrari grupate
+# ─────────────────────────────────────────────────────────
+def _group_positions(group_sorted):
+    """Pozitia fiecarei intrari in grupul ei (0 = prima aparitie); intrarile sortate pe grup."""
+    n = len(group_sorted)
+    starts = np.r_[True, group_sorted[1:] != group_sorted[:-1]] if n else np.zeros(0, bool)
+    first = np.maximum.accumulate(np.where(starts, np.arange(n), 0)) if n else np.zeros(0, int)
+    return np.arange(n) - first
+
+
+def _window(vals, pos, n, present=None):
+    """
+    Suma si numarul valorilor din ultimele n intrari ANTERIOARE ale aceluiasi grup
+    (intrarea curenta exclusa — echivalentul shift(1) + rolling(n)).
+    Suma merge de la cea mai veche la cea mai noua valoare — acelasi rezultat ca
+    sum(lista) din implementarea cu iterrows, bit cu bit.
+    present: masca valorilor disponibile (xG lipseste pentru unele meciuri).
+    """
+    acc = np.zeros(len(vals))
+    cnt = np.zeros(len(vals), dtype=np.int64)
+    for k in range(n, 0, -1):
+        ok = pos >= k
+        if present is not None:
+            ok[k:] &= present[:-k]
+        prev = np.zeros(len(vals))
+        prev[k:] = vals[:-k]
+        acc += np.where(ok, prev, 0.0)
+        cnt += ok
+    return acc, cnt
+
+
+def _mean(acc, cnt, default):
+    return np.where(cnt > 0, acc / np.maximum(cnt, 1), default)
+
+
+def _streaks(pts_sorted, pos):
+    """Streak-ul inainte de fiecare intrare: +n victorii / -n infrangeri la rand, 0 la egal."""
+    n = len(pts_sorted)
+    idx = np.arange(n)
+    run_start = (pos == 0) | np.r_[True, pts_sorted[1:] != pts_sorted[:-1]]
+    run_len = idx - np.maximum.accumulate(np.where(run_start, idx, 0)) + 1
+    streak = np.zeros(n, dtype=np.int64)
+    has_prev = pos > 0
+    prev_pts = np.r_[0, pts_sorted[:-1]]
+    prev_len = np.r_[0, run_len[:-1]]
+    streak[has_prev & (prev_pts == 3)] = prev_len[has_prev & (prev_pts == 3)]
+    streak[has_prev & (prev_pts == 0)] = -prev_len[has_prev & (prev_pts == 0)]
+    return streak
+
+
+def _xg_columns(data, xg_lookup):
+    """xG real per meci (NaN daca lipseste din lookup)."""
+    n = len(data)
+    xg_h = np.full(n, np.nan)
+    xg_a = np.full(n, np.nan)
+    if not xg_lookup:
+        return xg_h, xg_a
+    keys = zip(data["Div"].astype(str).tolist(),
+               data["Date"].dt.date.astype(str).tolist(),
+               data["HomeTeam"].str.strip().str.lower().tolist(),
+               data["AwayTeam"].str.strip().str.lower().tolist())
+    for i, key in enumerate(keys):
+        real_xg = xg_lookup.get(key)
+        if real_xg:
+            xg_h[i], xg_a[i] = real_xg
+    return xg_h, xg_a
+
+
+def _interleave(h, a):
+    out = np.empty(2 * len(h), dtype=np.result_type(h, a))
+    out[0::2] = h
+    out[1::2] = a
+    return out
+
+
+# ─────────────────────────────────────────────────────────
+# 4. FEATURES ATAC / APARARE + FORMA
+# ─────────────────────────────────────────────────────────
+_TEAM_FEATURES = ["atk_all5", "def_all5", "atk_all10", "def_all10", "atk_venue5", "def_venue5",
+                  "win5", "win10", "draw5", "pts5", "pts10", "win_venue5", "pts_venue5",
+                  "btts5", "over25_5", "clean5", "streak", "n_matches"]
+
+
+def build_team_features(data, xg_lookup=None):
+    """
+    Pentru fiecare meci, calculam (fara leakage):
+    - rata de goluri / xG marcate/primite acasa si in deplasare
+    - forma recenta (win rate ultimele 5)
+    - streak
+    xg_lookup: dict (Div, date_str, home_lower, away_lower) -> (xg_h, xg_a)
+
+    Vectorizat: fiecare meci da doua intrari (gazda, oaspete) sortate pe echipa
+    (si pe echipa+teren pentru features de venue); ferestrele se iau din intrarile
+    anterioare ale aceluiasi grup.
+    """
+    print(">>> Calculez features atac/aparare per echipa...")
+    if xg_lookup:
+        print(f"    xG real disponibil pentru {len(xg_lookup):,} meciuri")
+
+    n = len(data)
+    hg = data["FTHG"].to_numpy(dtype=float)
+    ag = data["FTAG"].to_numpy(dtype=float)
+    ftr = data["FTR"].to_numpy()
+    h_pts = np.select([ftr == "H", ftr == "D"], [3, 1], 0)
+    a_pts = np.select([ftr == "A", ftr == "D"], [3, 1], 0)
+    real_xg_h, real_xg_a = _xg_columns(data, xg_lookup)
+    xg_real_used = int((~np.isnan(real_xg_h)).sum())
+
+    # Intrari: 2*i = gazda meciului i, 2*i+1 = oaspetele
+    team    = _interleave(data["HomeTeam"].to_numpy(dtype=object), data["AwayTeam"].to_numpy(dtype=object))
+    is_home = np.tile([True, False], n)
+    gf  = _interleave(hg, ag)
+    ga  = _interleave(ag, hg)
+    pts = _interleave(h_pts, a_pts)
+    xgf = _interleave(real_xg_h, real_xg_a)
+    xga = _interleave(real_xg_a, real_xg_h)
+    team_code, team_names = pd.factorize(team)
+
+    entry = np.arange(2 * n)
+    feats = {}
+
+    # ── Toate meciurile echipei ─────────────────────────
+    order = np.lexsort((entry, team_code))
+    pos   = _group_positions(team_code[order])
+    gf_s, ga_s, pts_s = gf[order], ga[order], pts[order]
+    s, c5 = _window(gf_s, pos, 5)
+    feats["atk_all5"] = _mean(s, c5, 1.3)
+    feats["def_all5"] = _mean(_window(ga_s, pos, 5)[0], c5, 1.3)
+    s, c10 = _window(gf_s, pos, 10)
+    feats["atk_all10"] = _mean(s, c10, 1.3)
+    feats["def_all10"] = _mean(_window(ga_s, pos, 10)[0], c10, 1.3)
+    win_s, draw_s = (pts_s == 3).astype(float), (pts_s == 1).astype(float)
+    feats["win5"]  = _mean(_window(win_s, pos, 5)[0], c5, 0.40)
+    feats["win10"] = _mean(_window(win_s, pos, 10)[0], c10, 0.40)
+    feats["draw5"] = _mean(_window(draw_s, pos, 5)[0], c5, 0.26)
+    feats["pts5"]  = _mean(_window(pts_s.astype(float), pos, 5)[0], 3 * c5, 1.2)
+    feats["pts10"] = _mean(_window(pts_s.astype(float), pos, 10)[0], 3 * c10, 1.2)
+    feats["btts5"]    = _window(((gf_s > 0) & (ga_s > 0)).astype(float), pos, 5)[0] / np.maximum(c5, 1)
+    feats["over25_5"] = _window((gf_s + ga_s > 2).astype(float), pos, 5)[0] / np.maximum(c5, 1)
+    feats["clean5"]   = _window((ga_s == 0).astype(float), pos, 5)[0] / np.maximum(c5, 1)
+    feats["streak"]    = _streaks(pts_s, pos)
+    feats["n_matches"] = pos.astype(np.int64)
+    xgf_s, xga_s = xgf[order], xga[order]
+    s, c = _window(xgf_s, pos, 5, present=~np.isnan(xgf_s))
+    xgf5 = _mean(s, c, np.nan)
+    s, c = _window(xga_s, pos, 5, present=~np.isnan(xga_s))
+    xga5 = _mean(s, c, np.nan)
+    all_cols = {k: v for k, v in feats.items()}
+    all_cols["_xgf5"], all_cols["_xga5"] = xgf5, xga5
+
+    # ── Doar meciurile de pe acelasi teren (acasa / deplasare) ─
+    venue_code = team_code * 2 + (~is_home)
+    v_order = np.lexsort((entry, venue_code))
+    v_pos   = _group_positions(venue_code[v_order])
+    v_home  = is_home[v_order]
+    gf_v, ga_v, pts_v = gf[v_order], ga[v_order], pts[v_order]
+    s, cv = _window(gf_v, v_pos, 5)
+    venue = {
+        "atk_venue5": _mean(s, cv, np.where(v_home, 1.4, 1.1)),
+        "def_venue5": _mean(_window(ga_v, v_pos, 5)[0], cv, np.where(v_home, 1.1, 1.3)),
+        "win_venue5": _mean(_window((pts_v == 3).astype(float), v_pos, 5)[0], cv, 0.40),
+        "pts_venue5": _mean(_window(pts_v.astype(float), v_pos, 5)[0], 3 * cv, 1.2),
+    }
+    xgf_v, xga_v = xgf[v_order], xga[v_order]
+    s, c = _window(xgf_v, v_pos, 5, present=~np.isnan(xgf_v))
+    venue["_xgf_v5"] = _mean(s, c, np.nan)
+    s, c = _window(xga_v, v_pos, 5, present=~np.isnan(xga_v))
+    venue["_xga_v5"] = _mean(s, c, np.nan)
+
+    # Inapoi in ordinea intrarilor (2*i, 2*i+1)
+    cols = {}
+    for k, v in all_cols.items():
+        out = np.empty_like(v)
+        out[order] = v
+        cols[k] = out
+    for k, v in venue.items():
+        out = np.empty_like(v)
+        out[v_order] = v
+        cols[k] = out
+
+    # xG pentru feature-uri predictive (INAINTE de meci — rolling history):
+    # xG real venue-specific, altfel xG real general, altfel proxy din goluri
+    has_v   = ~np.isnan(cols["_xgf_v5"]) & ~np.isnan(cols["_xga_v5"])
+    has_all = ~np.isnan(cols["_xgf5"]) & ~np.isnan(cols["_xga5"])
+    e_xgf = np.where(has_v, cols["_xgf_v5"], np.where(has_all, cols["_xgf5"], cols["atk_venue5"]))
+    e_xga = np.where(has_v, cols["_xga_v5"], np.where(has_all, cols["_xga5"], cols["def_venue5"]))
+    xg_h = (e_xgf[0::2] + e_xga[1::2]) / 2
+    xg_a = (e_xgf[1::2] + e_xga[0::2]) / 2
+
+    out = {}
+    for side, sl in (("h", slice(0, None, 2)), ("a", slice(1, None, 2))):
+        for k in _TEAM_FEATURES:
+            out[f"{side}_{k}"] = cols[k][sl] if k in cols else feats[k][sl]
+    out["xg_h"] = xg_h
+    out["xg_a"] = xg_a
+    out["xg_diff"] = xg_h - xg_a
+    team_df = pd.DataFrame(out, index=data.index.rename("match_idx"))
+
+    # Istoric per echipa (pentru build_team_stats), in ordinea primei aparitii
+    recs = [{"gf": a, "ga": b, "is_home": c, "pts": d,
+             "xgf": None if e != e else e, "xga": None if f != f else f}
+            for a, b, c, d, e, f in zip(gf_s.tolist(), ga_s.tolist(), is_home[order].tolist(),
+                                        pts_s.tolist(), xgf_s.tolist(), xga_s.tolist())]
+    bounds = np.flatnonzero(pos == 0).tolist() + [len(recs)]
+    codes_sorted = team_code[order]
+    hist = {team_names[codes_sorted[lo]]: recs[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])}
+
+    print(f"    xG real folosit: {xg_real_used:,} meciuri ({xg_real_used/max(n,1)*100:.1f}%)")
+    return team_df, hist
+
+
+# ─────────────────────────────────────────────────────────
+# 5. H2H FEATURES
+# ─────────────────────────────────────────────────────────
+def build_h2h_features(data):
+    """
+    Ultimele 6 intalniri directe, din perspectiva gazdei curente.
+    Vectorizat pe perechi (echipaA, echipaB) sortate alfabetic.
+    """
+    print(">>> Calculez H2H...")
+    home = data["HomeTeam"].to_numpy(dtype=object)
+    away = data["AwayTeam"].to_numpy(dtype=object)
+    ftr  = data["FTR"].to_numpy()
+    hg   = data["FTHG"].to_numpy(dtype=float)
+    ag   = data["FTAG"].to_numpy(dtype=float)
+    n    = len(data)
+
+    first = np.where(home <= away, home, away)     # key[0] din tuple(sorted(...))
+    second = np.where(home <= away, away, home)
+    pair_code, _ = pd.factorize(pd.MultiIndex.from_arrays([first, second]))
+    home_is_first = home == first
+
+    # Rezultatul fiecarui meci din perspectiva lui key[0]
+    first_won  = np.where(home_is_first, ftr == "H", ftr == "A").astype(float)
+    second_won = np.where(home_is_first, ftr == "A", ftr == "H").astype(float)
+    drawn      = (ftr == "D").astype(float)
+    first_gd   = np.where(home_is_first, hg - ag, ag - hg)
+
+    order = np.lexsort((np.arange(n), pair_code))
+    pos   = _group_positions(pair_code[order])
+    w1, cnt = _window(first_won[order], pos, 6)
+    w2, _   = _window(second_won[order], pos, 6)
+    dr, _   = _window(drawn[order], pos, 6)
+    gd, _   = _window(first_gd[order], pos, 6)
+
+    def unsort(v):
+        out = np.empty_like(v)
+        out[order] = v
+        return out
+
+    cnt, w1, w2, dr, gd = unsort(cnt), unsort(w1), unsort(w2), unsort(dr), unsort(gd)
+    hw   = np.where(home_is_first, w1, w2)
+    gd_h = np.where(home_is_first, gd, -gd) + 0.0      # fara -0.0
+    has  = cnt > 0
+    div  = np.maximum(cnt, 1)
+    h2h_df = pd.DataFrame({
+        "h2h_hw": np.where(has, hw / div, 0.45),
+        "h2h_dr": np.where(has, dr / div, 0.25),
+        "h2h_gd": np.where(has, gd_h / div, 0.0),
+        "h2h_n":  cnt,
+    }, index=data.index.rename("match_idx"))
+
+    history = {}
+    for key, h, a, r, x, y in zip(zip(first.tolist(), second.tolist()), home.tolist(), away.tolist(),
+                                  ftr.tolist(), hg.tolist(), ag.tolist()):
+        history.setdefault(key, []).append({"home": h, "away": a, "ftr": r, "hg": x, "ag": y})
+
+    return h2h_df, history
+
+
+# ─────────────────────────────────────────────────────────
+# 6. ASAMBLARE
+# ─────────────────────────────────────────────────────────
+def assemble_base(data, team_df, h2h_df, elo_df):
+    """Matricea comuna ambelor modele, inainte de filtrul cold-start."""
+    print(">>> Asamblam feature matrix...")
+
+    le_div = LabelEncoder()
+    league_id = le_div.fit_transform(data["Div"])
+
+    X = pd.concat([team_df, h2h_df, elo_df], axis=1)
+
+    # Diferentiale
+    for col in ["atk_all5", "def_all5", "atk_all10", "def_all10",
+                "atk_venue5", "def_venue5", "win5", "win10",
+                "pts5", "pts10", "win_venue5", "pts_venue5"]:
+        if f"h_{col}" in X.columns and f"a_{col}" in X.columns:
+            X[f"diff_{col}"] = X[f"h_{col}"] - X[f"a_{col}"]
+
+    X["league_id"]       = league_id
+    X["month"]           = data["Date"].dt.month.values
+    X["season_progress"] = ((data["Date"].dt.month - 8) % 12) / 11.0
+
+    # Features specifice pentru egaluri
+    # Egal mai probabil cand: echipe egale, joc defensiv, elo_diff mic
+    X["balanced"]    = np.exp(-np.abs(X["elo_diff"]) / 150)   # 1.0 cand elo_diff=0
+    X["low_scoring"] = 1.0 / (X["xg_h"] + X["xg_a"] + 0.5)  # creste cand xg mic
+    X["xg_sim"]      = np.exp(-np.abs(X["xg_diff"]) * 2)     # 1.0 cand xg_h≈xg_a
+    # Poisson draw proxy: P(draw) ≈ exp(-(lam+mu)) * I0(2*sqrt(lam*mu))
+    lam = X["xg_h"].clip(0.1, 6)
+    mu  = X["xg_a"].clip(0.1, 6)
+    X["poisson_draw"] = np.exp(-(lam + mu)) * np.exp(2 * np.sqrt(lam * mu) - lam - mu + (lam + mu))
+    X.attrs["n_raw"] = len(team_df.columns) + len(h2h_df.columns) + len(elo_df.columns)
+    return X
+
+
+def with_market(X_base, odds_df, market_df):
+    """
+    Matricea modelului cu cote: coloanele de piata intre features brute si cele
+    derivate (aceeasi ordine a coloanelor ca inainte de separarea pe module).
+    """
+    n_raw = X_base.attrs["n_raw"]
+    return pd.concat([X_base.iloc[:, :n_raw], odds_df, market_df, X_base.iloc[:, n_raw:]], axis=1)
+
+
+def filter_cold_start(data, X):
+    """Doar meciurile in care ambele echipe au cel putin MIN_MATCHES meciuri anterioare."""
+    valid = (X["h_n_matches"] >= MIN_MATCHES) & (X["a_n_matches"] >= MIN_MATCHES)
+    X = X[valid].fillna(0)
+    y = data.loc[valid, "FTR"]
+    print(f"    Meciuri cu istoric: {len(X)}")
+    return X, y
+
+
+def assemble(data, team_df, h2h_df, elo_df, odds_df=None, market_df=None):
+    """(X, y) pentru un singur model; fara odds_df / market_df = modelul fara cote."""
+    X = assemble_base(data, team_df, h2h_df, elo_df)
+    if odds_df is not None:
+        X = with_market(X, odds_df, market_df)
+    return filter_cold_start(data, X)
+
+
+def build_base(data, xg_lookup=None) -> dict:
+    """Partea scumpa, comuna ambelor modele: Elo, forma per echipa, H2H, matricea de baza."""
+    elo_df, elo_ratings = build_elo_features(data)
+    team_df, hist       = build_team_features(data, xg_lookup=xg_lookup)
+    h2h_df, h2h_history = build_h2h_features(data)
+    return {
+        "X_base":      assemble_base(data, team_df, h2h_df, elo_df),
+        "elo_ratings": elo_ratings,
+        "hist":        hist,
+        "h2h_history": h2h_history,
+    }
+
+
+# ─────────────────────────────────────────────────────────
+# 8. TEAM STATS PENTRU PREDICTOR
+# ─────────────────────────────────────────────────────────
+def build_team_stats(hist, elo_ratings):
+    # Aceleasi ferestre pe care state_refresh le actualizeaza zilnic, fara retrain
+    # Elo: index echipa -> cea mai mare valoare din cheile "liga|echipa"
+    elo_idx = build_team_elo_index(elo_ratings)
+    return {
+        team: stats_from_window(team_window(records), elo_idx.get(team, DEFAULT_ELO))
+        for team, records in hist.items() if records
+    }
+
+
+# ─────────────────────────────────────────────────────────
+# 9. SALVARE ARTEFACT
+# ─────────────────────────────────────────────────────────
+def save_model(model_path, model, le, feature_means, features, base, data):
+    """Pickle + artefact split + starea pentru refresh-ul zilnic, pentru un model antrenat."""
+    team_stats = build_team_stats(base["hist"], base["elo_ratings"])
+
+    # Trim h2h_history la ultimele 6 per pereche — suficient pentru inference, economiseste memorie
+    h2h_history_trimmed = {k: v[-6:] for k, v in base["h2h_history"].items()}
+
+    print(f">>> Salvez modelul ({os.path.basename(model_path)})...")
+    artifact = {
+        "model":          model,
+        "features":       list(features),
+        "team_stats":     team_stats,
+        "label_encoder":  le,
+        "elo_ratings":    base["elo_ratings"],
+        "feature_means":  feature_means,
+        "h2h_history":    h2h_history_trimmed,
+    }
+    # Artefact split (booster UBJ + tabele npy mmap) + pickle, in ordinea asta
+    model_store.save(model_path, artifact)
+    # Ferestrele per echipa pentru refresh-ul zilnic incremental (state_refresh.py)
+    save_state(model_path, base["hist"], data["Date"].max(), ELO_K, ELO_HOME)
+    print(f">>> Model salvat: {model_path}")
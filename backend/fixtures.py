@@ -5,13 +5,12 @@ returneaza o lista gata de predictat.
 """
 
 import os
-import requests
 import datetime
 import logging
-from difflib import get_close_matches
 from typing import Optional
 from zoneinfo import ZoneInfo
 
+import rate_limiter
 from circuit_breaker import cb
 
 logger = logging.getLogger(__name__)
@@ -81,366 +80,17 @@ COMPETITIONS = {
     "CLI": {"name": "Copa Libertadores", "flag": "🌎",        "div": "CL"},
 }
 
-# Normalizare: football-data.org team name → model team name
-# Formatul football-data.org: "Arsenal FC", "Manchester City FC", etc.
-FDORG_TO_MODEL = {
-    # Premier League
-    "Arsenal FC":                "Arsenal",
-    "Chelsea FC":                "Chelsea",
-    "Liverpool FC":              "Liverpool",
-    "Manchester City FC":        "Man City",
-    "Manchester United FC":      "Man United",
-    "Tottenham Hotspur FC":      "Tottenham",
-    "Newcastle United FC":       "Newcastle",
-    "Aston Villa FC":            "Aston Villa",
-    "West Ham United FC":        "West Ham",
-    "Brighton & Hove Albion FC": "Brighton",
-    "Brentford FC":              "Brentford",
-    "Fulham FC":                 "Fulham",
-    "Crystal Palace FC":         "Crystal Palace",
-    "Wolverhampton Wanderers FC":"Wolves",
-    "Everton FC":                "Everton",
-    "Nottingham Forest FC":      "Nott'm Forest",
-    "AFC Bournemouth":           "Bournemouth",
-    "Leicester City FC":         "Leicester",
-    "Southampton FC":            "Southampton",
-    "Ipswich Town FC":           "Ipswich",
-    "Leeds United FC":           "Leeds",
-    "Sheffield United FC":       "Sheffield Utd",
-    "Burnley FC":                "Burnley",
-    "Luton Town FC":             "Luton",
-    "Watford FC":                "Watford",
-    "Norwich City FC":           "Norwich",
-    "Sunderland AFC":            "Sunderland",
-    "Swansea City AFC":          "Swansea",
-    "Stoke City FC":             "Stoke",
-    "Queens Park Rangers FC":    "QPR",
-    "West Bromwich Albion FC":   "West Brom",
-    "Middlesbrough FC":          "Middlesbrough",
-    "Huddersfield Town AFC":     "Huddersfield",
-    "Cardiff City FC":           "Cardiff",
-    # Bundesliga
-    "FC Bayern München":         "Bayern Munich",
-    "Borussia Dortmund":         "Dortmund",
-    "Bayer 04 Leverkusen":       "Leverkusen",
-    "RB Leipzig":                "RB Leipzig",
-    "VfB Stuttgart":             "Stuttgart",
-    "Borussia Mönchengladbach":  "M'gladbach",
-    "Eintracht Frankfurt":       "Ein Frankfurt",
-    "TSG 1899 Hoffenheim":       "Hoffenheim",
-    "SC Freiburg":               "Freiburg",
-    "VfL Wolfsburg":             "Wolfsburg",
-    "1. FC Union Berlin":        "Union Berlin",
-    "1. FSV Mainz 05":           "Mainz",
-    "FC Augsburg":               "Augsburg",
-    "FC Köln":                   "FC Koln",
-    "Hertha BSC":                "Hertha",
-    "VfL Bochum 1848":           "Bochum",
-    "Werder Bremen":             "Werder Bremen",
-    "SV Darmstadt 98":           "Darmstadt",
-    "1. FC Heidenheim 1846":     "Heidenheim",
-    "Holstein Kiel":             "Holstein Kiel",
-    "FC St. Pauli 1910":         "St. Pauli",
-    "Hannover 96":               "Hannover",
-    "Fortuna Düsseldorf":        "Dusseldorf",
-    "Hamburger SV":              "Hamburger SV",
-    "Schalke 04":                "Schalke 04",
-    "Arminia Bielefeld":         "Bielefeld",
-    # Serie A
-    "Juventus FC":               "Juventus",
-    "AC Milan":                  "Milan",
-    "FC Internazionale Milano":  "Inter",
-    "SSC Napoli":                "Napoli",
-    "AS Roma":                   "Roma",
-    "SS Lazio":                  "Lazio",
-    "Atalanta BC":               "Atalanta",
-    "ACF Fiorentina":            "Fiorentina",
-    "Torino FC":                 "Torino",
-    "Bologna FC 1909":           "Bologna",
-    "Genoa CFC":                 "Genoa",
-    "UC Sampdoria":              "Sampdoria",
-    "Udinese Calcio":            "Udinese",
-    "Cagliari Calcio":           "Cagliari",
-    "Hellas Verona FC":          "Verona",
-    "Parma Calcio 1913":         "Parma",
-    "US Sassuolo Calcio":        "Sassuolo",
-    "Venezia FC":                "Venezia",
-    "Spezia Calcio":             "Spezia",
-    "US Salernitana 1919":       "Salernitana",
-    "US Lecce":                  "Lecce",
-    "Empoli FC":                 "Empoli",
-    "Frosinone Calcio":          "Frosinone",
-    "Como 1907":                 "Como",
-    "Monza":                     "Monza",
-    # La Liga
-    "Real Madrid CF":            "Real Madrid",
-    "FC Barcelona":              "Barcelona",
-    "Atlético de Madrid":        "Ath Madrid",
-    "Sevilla FC":                "Sevilla",
-    "Valencia CF":               "Valencia",
-    "Villarreal CF":             "Villarreal",
-    "Real Betis Balompié":       "Betis",
-    "Real Sociedad de Fútbol":   "Sociedad",
-    "Athletic Club":             "Ath Bilbao",
-    "Rayo Vallecano de Madrid":  "Rayo Vallecano",
-    "RCD Espanyol de Barcelona": "Espanol",
-    "Getafe CF":                 "Getafe",
-    "RC Celta de Vigo":          "Celta",
-    "Deportivo Alavés":          "Alaves",
-    "Granada CF":                "Granada",
-    "Girona FC":                 "Girona",
-    "UD Las Palmas":             "Las Palmas",
-    "CA Osasuna":                "Osasuna",
-    "Real Valladolid CF":        "Valladolid",
-    "Cádiz CF":                  "Cadiz",
-    "RCD Mallorca":              "Mallorca",
-    "Almería":                   "Almeria",
-    "UD Almería":                "Almeria",
-    "Deportivo La Coruña":       "Deportivo",
-    "Leganés":                   "Leganes",
-    # The-Odds-API La Liga (fara accente / forme scurte)
-    "Deportivo Alaves":          "Alaves",
-    "Alaves":                    "Alaves",
-    "Atletico Madrid":           "Ath Madrid",
-    "Club Atletico de Madrid":   "Ath Madrid",
-    "Athletic Bilbao":           "Ath Bilbao",
-    "Celta Vigo":                "Celta",
-    "Real Betis":                "Betis",
-    "Real Sociedad":             "Sociedad",
-    "Espanyol":                  "Espanol",
-    "Espanol":                   "Espanol",
-    "Cadiz":                     "Cadiz",
-    "Leganes":                   "Leganes",
-    "Las Palmas":                "Las Palmas",
-    # The-Odds-API Premier League
-    "Manchester City":           "Man City",
-    "Manchester United":         "Man United",
-    "Tottenham Hotspur":         "Tottenham",
-    "Nottingham Forest":         "Nott'm Forest",
-    "West Ham United":           "West Ham",
-    "Newcastle United":          "Newcastle",
-    "Brighton and Hove Albion":  "Brighton",
-    "Brighton & Hove Albion":    "Brighton",
-    "Wolverhampton Wanderers":   "Wolverhampton",
-    "Sheffield United":          "Sheffield Utd",
-    "Leicester City":            "Leicester",
-    "Luton Town":                "Luton",
-    "Ipswich Town":              "Ipswich",
-    "Leeds United":              "Leeds",
-    # The-Odds-API Bundesliga
-    "Borussia Dortmund":         "Dortmund",
-    "Bayer Leverkusen":          "Leverkusen",
-    "Eintracht Frankfurt":       "Ein Frankfurt",
-    "Mainz 05":                  "Mainz",
-    "Cologne":                   "FC Koln",
-    "VfL Bochum":                "Bochum",
-    "Monchengladbach":           "M'gladbach",
-    "Borussia Monchengladbach":  "M'gladbach",
-    # The-Odds-API Serie A
-    "AC Milan":                  "Milan",
-    "Inter Milan":               "Inter",
-    "Internazionale":            "Inter",
-    "AS Roma":                   "Roma",
-    "SS Lazio":                  "Lazio",
-    "Hellas Verona":             "Verona",
-    # The-Odds-API Ligue 1
-    "Paris Saint Germain":       "Paris SG",
-    "PSG":                       "Paris SG",
-    "Olympique Marseille":       "Marseille",
-    "Olympique Lyonnais":        "Lyon",
-    "Stade Brestois":            "Brest",
-    "Lens":                      "Lens",
-    "Le Havre":                  "Le Havre",
-    # The-Odds-API Primeira Liga
-    "Sporting CP":               "Sporting CP",
-    "SL Benfica":                "Benfica",
-    "Benfica":                   "Benfica",
-    "Sporting Braga":            "Sp Braga",
-    "SC Braga":                  "Sp Braga",
-    "Vitoria Guimaraes":         "Vitoria Guimaraes",
-    "Vitoria SC":                "Vitoria SC",
-    "Gil Vicente":               "Gil Vicente",
-    # Champions League / Europa
-    "Real Madrid":               "Real Madrid",
-    "FC Barcelona":              "Barcelona",
-    "Barcelona":                 "Barcelona",
-    # Ligue 1
-    "Paris Saint-Germain FC":    "Paris SG",
-    "Olympique de Marseille":    "Marseille",
-    "Olympique Lyonnais":        "Lyon",
-    "AS Monaco FC":              "Monaco",
-    "LOSC Lille":                "Lille",
-    "Stade Rennais FC 1901":     "Rennes",
-    "OGC Nice":                  "Nice",
-    "RC Lens":                   "Lens",
-    "RC Strasbourg Alsace":      "Strasbourg",
-    "Montpellier HSC":           "Montpellier",
-    "Stade de Reims":            "Reims",
-    "FC Nantes":                 "Nantes",
-    "Toulouse FC":               "Toulouse",
-    "Angers SCO":                "Angers",
-    "FC Metz":                   "Metz",
-    "Stade Brestois 29":         "Brest",
-    "Le Havre AC":               "Le Havre",
-    "AJ Auxerre":                "Auxerre",
-    "AS Saint-Étienne":          "St Etienne",
-    "Girondins de Bordeaux":     "Bordeaux",
-    # Championship (E1)
-    "Sheffield Wednesday FC":    "Sheffield Weds",
-    "Millwall FC":               "Millwall",
-    "Bristol City FC":           "Bristol City",
-    "Hull City AFC":             "Hull",
-    "Preston North End FC":      "Preston",
-    "Rotherham United FC":       "Rotherham",
-    "Wigan Athletic FC":         "Wigan",
-    "Derby County FC":           "Derby",
-    "Bolton Wanderers FC":       "Bolton",
-    "Reading FC":                "Reading",
-    "Birmingham City FC":        "Birmingham",
-    "Blackburn Rovers FC":       "Blackburn",
-    "Blackpool FC":              "Blackpool",
-    "Coventry City FC":          "Coventry",
-    "Oxford United FC":          "Oxford",
-    "Portsmouth FC":             "Portsmouth",
-    "Plymouth Argyle FC":        "Plymouth",
-    "Middlesbrough FC":          "Middlesbrough",
-    "Cardiff City FC":           "Cardiff",
-    "Swansea City AFC":          "Swansea",
-    "Bristol Rovers FC":         "Bristol Rovers",
-    "Charlton Athletic FC":      "Charlton",
-    "Barnsley FC":               "Barnsley",
-    "Peterborough United FC":    "Peterborough",
-    "Exeter City FC":            "Exeter",
-    "Shrewsbury Town FC":        "Shrewsbury",
-    # 2. Bundesliga (D2)
-    "Hamburger SV":              "Hamburg",
-    "FC Schalke 04":             "Schalke 04",
-    "1. FC Nürnberg":            "Nurnberg",
-    "SpVgg Greuther Fürth":      "Greuther Furth",
-    "SSV Jahn Regensburg":       "Regensburg",
-    "1. FC Magdeburg":           "Magdeburg",
-    "SC Paderborn 07":           "Paderborn",
-    "SV Sandhausen":             "Sandhausen",
-    "FC Ingolstadt 04":          "Ingolstadt",
-    "Dynamo Dresden":            "Dresden",
-    "Erzgebirge Aue":            "Erzgebirge Aue",
-    "MSV Duisburg":              "Duisburg",
-    "Karlsruher SC":             "Karlsruhe",
-    "SV Waldhof Mannheim":       "Mannheim",
-    "Preußen Münster":           "Munster",
-    "Eintracht Braunschweig":    "Braunschweig",
-    "Hertha BSC":                "Hertha",
-    # Serie B (I2)
-    "Palermo FC":                "Palermo",
-    "Brescia Calcio":            "Brescia",
-    "US Ascoli":                 "Ascoli",
-    "Benevento Calcio":          "Benevento",
-    "US Cremonese":              "Cremonese",
-    "AC Perugia Calcio":         "Perugia",
-    "Pisa SC":                   "Pisa",
-    "Pisa Sporting Club":        "Pisa",
-    "Reggiana":                  "Reggiana",
-    "Modena FC":                 "Modena",
-    "Cittadella":                "Cittadella",
-    "FC Südtirol":               "Sudtirol",
-    "Cosenza Calcio":            "Cosenza",
-    "Carrarese Calcio":          "Carrarese",
-    "Mantova 1911":              "Mantova",
-    "SS Juve Stabia":            "Juve Stabia",
-    "Cesena FC":                 "Cesena",
-    "SSC Bari":                  "Bari",
-    "Catanzaro":                 "Catanzaro",
-    "Frosinone Calcio":          "Frosinone",
-    "Sampdoria":                 "Sampdoria",
-    # Ligue 2 (F2)
-    "FC Lorient":                "Lorient",
-    "FC Troyes AC":              "Troyes",
-    "ES Troyes AC":              "Troyes",
-    "Paris FC":                  "Paris FC",
-    "Valenciennes FC":           "Valenciennes",
-    "Grenoble Foot 38":          "Grenoble",
-    "Clermont Foot 63":          "Clermont",
-    "SO Cholet":                 "Cholet",
-    "USL Dunkerque":             "Dunkerque",
-    "SM Caen":                   "Caen",
-    "Amiens SC":                 "Amiens",
-    "FC Sochaux-Montbéliard":    "Sochaux",
-    "Dijon FCO":                 "Dijon",
-    "Laval":                     "Laval",
-    "Niort":                     "Niort",
-    "Red Star FC":               "Red Star",
-    "AS Nancy-Lorraine":         "Nancy",
-    "US Concarneau":             "Concarneau",
-    "Pau FC":                    "Pau",
-    "Rodez AF":                  "Rodez",
-    "Quevilly-Rouen Métropole":  "Quevilly Rouen",
-    "Saint-Brieuc":              "Saint-Brieuc",
-    "AC Ajaccio":                "Ajaccio",
-    "Gazelec Ajaccio":           "Ajaccio GFCO",
-    "Stade Lavallois":           "Laval",
-    "Bastia":                    "Bastia",
-    # La Liga 2 / Segunda División (SP2)
-    "Real Zaragoza":             "Zaragoza",
-    "Levante UD":                "Levante",
-    "Real Oviedo":               "Oviedo",
-    "Elche CF":                  "Elche",
-    "Málaga CF":                 "Malaga",
-    "Sporting de Gijón":         "Sp Gijon",
-    "CD Tenerife":               "Tenerife",
-    "FC Cartagena":              "Cartagena",
-    "SD Huesca":                 "Huesca",
-    "RC Deportivo de La Coruña": "La Coruna",
-    "Deportivo de La Coruña":    "La Coruna",
-    "CD Castellón":              "Castellon",
-    "SD Eibar":                  "Eibar",
-    "AD Alcorcón":               "Alcorcon",
-    "CD Eldense":                "Eldense",
-    "Racing de Santander":       "Santander",
-    "CD Mirandés":               "Mirandes",
-    "UD Ibiza":                  "Ibiza",
-    "Albacete Balompié":         "Albacete",
-    "Gimnàstic de Tarragona":    "Gimnastic",
-    "CF Extremadura":            "Extremadura UD",
-    "Burgos CF":                 "Burgos",
-    "Real Murcia CF":            "Murcia",
-    "CD Lugo":                   "Lugo",
-    "UD Almería":                "Almeria",
-    "Cádiz CF":                  "Cadiz",
-}
+# Normalizare: football-data.org / The-Odds-API → nume model (mapari + resolver in team_names.py)
+import team_names
 
 
 def _normalize_name(raw: str, known_teams: list) -> str:
     """
-    Incearca sa normalizeze numele echipei din football-data.org
-    catre formatul din modelul nostru.
-    1. Lookup direct in FDORG_TO_MODEL
-    2. Fuzzy match contra known_teams
+    Normalizeaza numele echipei din football-data.org catre formatul din modelul nostru:
+    mapari explicite, potrivire exacta / fara sufixe, apoi fuzzy pe indexul de trigrame
+    (team_names.TeamResolver, memo in Redis). Returneaza originalul daca nu gasim.
     """
-    # Lookup direct
-    if raw in FDORG_TO_MODEL:
-        return FDORG_TO_MODEL[raw]
-
-    # Curata sufixe comune
-    cleaned = raw
-    for suffix in [" FC", " AFC", " CF", " SC", " AC", " United", " City"]:
-        if cleaned.endswith(suffix):
-            cleaned = cleaned[: -len(suffix)].strip()
-            break
-
-    if cleaned in known_teams:
-        return cleaned
-
-    # Fuzzy match (cutoff 0.7)
-    matches = get_close_matches(cleaned, known_teams, n=1, cutoff=0.70)
-    if matches:
-        return matches[0]
-
-    # Fuzzy match pe raw
-    matches2 = get_close_matches(raw, known_teams, n=1, cutoff=0.65)
-    if matches2:
-        return matches2[0]
-
-    return raw  # Returnam originalul daca nu gasim
+    return team_names.resolve(raw, known_teams)
 
 
 def _parse_matches(data: dict, known_teams: list, default_date: str = "") -> list:
@@ -507,13 +157,16 @@ def _parse_matches(data: dict, known_teams: list, default_date: str = "") -> lis
     return fixtures
 
 
+# Competitiile disponibile pe football-data.org TIER_ONE (free)
+TIER_ONE_CODES = ["PL", "BL1", "SA", "PD", "FL1", "DED", "PPL", "CL", "ELC", "BL2"]
+
+
 def _fetch_fixtures_per_competition(date_str: str, known_teams: list) -> list:
     """
     Fetch fixtures din football-data.org per competitie (TIER_ONE compatible).
     Endpoint: /competitions/{code}/matches?dateFrom=...&dateTo=...
-    Delay 6s intre request-uri pentru a respecta limita de 10 req/min.
+    Limita de 10 req/min e respectata de rate_limiter (buget partajat intre procese).
     """
-    import time
     if not API_KEY:
         return []
     if cb.is_open("football-data"):
@@ -521,12 +174,10 @@ def _fetch_fixtures_per_competition(date_str: str, known_teams: list) -> list:
         return []
     headers = {"X-Auth-Token": API_KEY}
     fixtures = []
-    TIER_ONE_CODES = ["PL", "BL1", "SA", "PD", "FL1", "DED", "PPL", "CL", "ELC", "BL2"]
-    for i, code in enumerate(TIER_ONE_CODES):
-        if i > 0:
-            time.sleep(6)
+    for code in TIER_ONE_CODES:
         try:
-            resp = requests.get(
+            resp = rate_limiter.get(
+                "football-data",
                 f"{BASE_URL}/competitions/{code}/matches",
                 headers=headers,
                 params={"dateFrom": date_str, "dateTo": date_str, "status": "TIMED,SCHEDULED"},
@@ -535,10 +186,11 @@ def _fetch_fixtures_per_competition(date_str: str, known_teams: list) -> list:
             if resp.status_code == 403:
                 continue
             if resp.status_code == 429:
+                # rate_limiter a amanat deja urmatorul request cu Retry-After
                 cb.record_failure("football-data")
                 logger.warning("[fixtures] football-data: rate limit 429 la %s", code)
-                time.sleep(30)
-                resp = requests.get(
+                resp = rate_limiter.get(
+                    "football-data",
                     f"{BASE_URL}/competitions/{code}/matches",
                     headers=headers,
                     params={"dateFrom": date_str, "dateTo": date_str, "status": "TIMED,SCHEDULED"},
@@ -576,7 +228,8 @@ def _fetch_fixtures_api_football(date_str: str, known_teams: list) -> list:
     fixtures = []
     for league_id, comp_code in AF_LEAGUE_MAP.items():
         try:
-            resp = requests.get(
+            resp = rate_limiter.get(
+                "api-football",
                 f"{AF_BASE_URL}/fixtures",
                 headers=headers,
                 params={"date": date_str, "league": league_id, "season": season},
@@ -647,8 +300,8 @@ def fetch_competition_fixtures(code: str, date_from: str, date_to: str,
     headers = {"X-Auth-Token": API_KEY}
     params  = {"dateFrom": date_from, "dateTo": date_to, "status": "TIMED,SCHEDULED"}
     try:
-        resp = requests.get(
-            f"{BASE_URL}/competitions/{code}/matches",
+        resp = rate_limiter.get(
+            "football-data", f"{BASE_URL}/competitions/{code}/matches",
             headers=headers, params=params, timeout=20
         )
         if _debug is not None:
@@ -685,7 +338,8 @@ def _fetch_fixtures_for_range(date_from: str, date_to: str, known_teams: list,
     headers = {"X-Auth-Token": API_KEY}
     params  = {"dateFrom": date_from, "dateTo": date_to}
     try:
-        resp = requests.get(f"{BASE_URL}/matches", headers=headers, params=params, timeout=20)
+        resp = rate_limiter.get("football-data", f"{BASE_URL}/matches",
+                                headers=headers, params=params, timeout=20)
         if _debug is not None:
             _debug["http_status"] = resp.status_code
             if resp.status_code != 200:
@@ -737,7 +391,8 @@ def _fetch_af_missing_leagues(date_str: str, known_teams: list, existing: list)
     headers = {"x-apisports-key": AF_KEY}
     for league_id, comp_code in to_fetch.items():
         try:
-            resp = requests.get(
+            resp = rate_limiter.get(
+                "api-football",
                 f"{AF_BASE_URL}/fixtures",
                 headers=headers,
                 params={"date": date_str, "league": league_id, "season": season},
@@ -824,7 +479,8 @@ def _fetch_european_cups(date_str: str, known_teams: list) -> list:
     results = []
     for code in ("CL",):
         try:
-            resp = requests.get(
+            resp = rate_limiter.get(
+                "football-data",
                 f"{BASE_URL}/competitions/{code}/matches",
                 headers=headers,
                 params={"dateFrom": date_str, "dateTo": date_str, "status": "TIMED,SCHEDULED"},
@@ -842,6 +498,31 @@ def _fetch_european_cups(date_str: str, known_teams: list) -> list:
 _INJURY_LEAGUE_IDS = [39, 78, 135, 140, 61]  # EPL, Bundesliga, Serie A, La Liga, Ligue 1
 
 
+def _injury_season() -> int:
+    today = datetime.date.today()
+    return today.year - 1 if today.month < 7 else today.year
+
+
+def _count_injuries(items: list, known: list, today_ts, window_ts, result: dict):
+    """Aduna absentele 'Missing Fixture' din fereastra [today_ts, window_ts] in result."""
+    for item in items:
+        if item.get("player", {}).get("type") != "Missing Fixture":
+            continue
+        fix_date_str = item.get("fixture", {}).get("date", "")
+        try:
+            fix_dt = datetime.datetime.fromisoformat(fix_date_str.replace("Z", "+00:00")).replace(tzinfo=None)
+            if not (today_ts <= fix_dt <= window_ts):
+                continue
+        except Exception:
+            continue
+        team_name = item.get("team", {}).get("name", "")
+        if not team_name:
+            continue
+        norm = _normalize_name(team_name, known) if known else team_name.lower()
+        if norm:
+            result[norm] = result.get(norm, 0) + 1
+
+
 def get_injuries_today(known_teams: list = None) -> dict:
     """
     Fetch absente confirmate ('Missing Fixture') pentru cele 5 ligi majore.
@@ -860,9 +541,7 @@ def get_injuries_today(known_teams: list = None) -> dict:
     except Exception:
         pass
 
-    season = _dt.date.today().year
-    if _dt.date.today().month < 7:
-        season -= 1
+    season = _injury_season()
 
     today_ts  = _dt.datetime.utcnow()
     window_ts = today_ts + _dt.timedelta(days=5)
@@ -872,7 +551,8 @@ def get_injuries_today(known_teams: list = None) -> dict:
 
     for league_id in _INJURY_LEAGUE_IDS:
         try:
-            r = requests.get(
+            r = rate_limiter.get(
+                "api-football",
                 f"{AF_BASE_URL}/injuries",
                 headers=headers,
                 params={"league": league_id, "season": season},
@@ -880,22 +560,7 @@ def get_injuries_today(known_teams: list = None) -> dict:
             )
             if r.status_code != 200:
                 continue
-            for item in r.json().get("response", []):
-                if item.get("player", {}).get("type") != "Missing Fixture":
-                    continue
-                fix_date_str = item.get("fixture", {}).get("date", "")
-                try:
-                    fix_dt = _dt.datetime.fromisoformat(fix_date_str.replace("Z", "+00:00")).replace(tzinfo=None)
-                    if not (today_ts <= fix_dt <= window_ts):
-                        continue
-                except Exception:
-                    continue
-                team_name = item.get("team", {}).get("name", "")
-                if not team_name:
-                    continue
-                norm = _normalize_name(team_name, known) if known else team_name.lower()
-                if norm:
-                    result[norm] = result.get(norm, 0) + 1
+            _count_injuries(r.json().get("response", []), known, today_ts, window_ts, result)
         except Exception:
             continue
 
@@ -912,31 +577,46 @@ def get_injuries_today(known_teams: list = None) -> dict:
 
 def get_today_odds(known_teams: list = None, active_comp_codes: list = None) -> dict:
     """
-    Descarca cotele de azi din The-Odds-API (gratis: 500 req/luna).
-    Optimizare: fetch doar pentru ligile cu meciuri azi (active_comp_codes).
+    Cotele din The-Odds-API (gratis: 500 req/luna) pentru ligile cu meciuri azi
+    (active_comp_codes). Pull-urile vin din odds_planner — cache partajat cu
+    bet_signal, reimprospatat dupa apropierea kickoff-ului si quota ramasa.
     Backup: daca quota e epuizata, returneaza cotele din ziua anterioara.
     Returneaza un dict: (home_normalized, away_normalized) -> {B365H, B365D, B365A, ...}
     """
+    import odds_planner
+
     if not ODDS_API_KEY:
         return {}
     if cb.is_open("the-odds-api"):
         logger.warning("[fixtures] the-odds-api: circuit deschis, skip fetch")
         return {}
 
-    import datetime as _dt
-    today = _dt.date.today().isoformat()
-    yesterday = (_dt.date.today() - _dt.timedelta(days=1)).isoformat()
+    backup = _odds_backup()
+    if backup is not None:
+        return backup
 
-    # Verifica cache Redis — daca avem cote pt azi, nu mai facem API calls
-    try:
-        import cache as redis_cache
-        cached = redis_cache.get("odds_daily", today)
-        if cached is not None:
-            return {tuple(k.split("|")): v for k, v in cached.items()} if isinstance(cached, dict) else {}
-    except Exception:
-        pass
+    pulls, status = odds_planner.get_events(list(_odds_sport_map(active_comp_codes)),
+                                            ODDS_API_URL, ODDS_API_KEY)
+    odds_map = {}
+    for pull in pulls.values():
+        odds_map.update(_parse_odds_events(pull["events"], known_teams, record=pull.get("fresh", False)))
 
-    # Verifica daca quota e epuizata — returneaza backup din ziua anterioara
+    if status == "quota":
+        # Backup-ul de ieri completeaza ce avem deja (cache / inainte de 429)
+        return {**_odds_quota_exhausted(), **odds_map}
+    # Salveaza in Redis cu TTL 48h — backup pentru ziua urmatoare daca quota se epuizeaza
+    if odds_map:
+        _store_odds(odds_map)
+    return odds_map
+
+
+def _odds_backup() -> Optional[dict]:
+    """
+    Backup-ul de ieri daca quota e epuizata azi.
+    None = cotele se iau prin odds_planner (cache partajat sau fetch).
+    """
+    today = datetime.date.today().isoformat()
+    yesterday = (datetime.date.today() - datetime.timedelta(days=1)).isoformat()
     try:
         import cache as redis_cache
         if redis_cache.get("odds_quota_exhausted", today):
@@ -946,109 +626,111 @@ def get_today_odds(known_teams: list = None, active_comp_codes: list = None) ->
             return {}
     except Exception:
         pass
+    return None
 
-    # Filtreaza doar ligile cu meciuri azi — reduce request-urile de la 9 la 2-3
+
+def _odds_quota_exhausted() -> dict:
+    """Marcheaza quota epuizata pentru azi si returneaza backup-ul de ieri (sau {})."""
+    today = datetime.date.today().isoformat()
+    yesterday = (datetime.date.today() - datetime.timedelta(days=1)).isoformat()
+    cb.record_failure("the-odds-api")
+    logger.warning("[fixtures] the-odds-api: quota epuizata (429)")
+    try:
+        import cache as redis_cache
+        redis_cache.set("odds_quota_exhausted", today, True, ttl=86400)
+        yesterday_cache = redis_cache.get("odds_daily", yesterday)
+        if yesterday_cache and isinstance(yesterday_cache, dict):
+            return {tuple(k.split("|")): v for k, v in yesterday_cache.items()}
+    except Exception:
+        pass
+    return {}
+
+
+def _store_odds(odds_map: dict):
+    cb.record_success("the-odds-api")
+    try:
+        import cache as redis_cache
+        serializable = {f"{k[0]}|{k[1]}": v for k, v in odds_map.items()}
+        redis_cache.set("odds_daily", datetime.date.today().isoformat(), serializable, ttl=172800)
+    except Exception:
+        pass
+
+
+def _odds_sport_map(active_comp_codes: list = None) -> dict:
+    """Filtreaza doar ligile cu meciuri azi — reduce request-urile de la 9 la 2-3."""
     sport_map = ODDS_SPORT_MAP
     if active_comp_codes:
         comp_to_sport = {v: k for k, v in ODDS_SPORT_MAP.items()}
         filtered = {comp_to_sport[c]: c for c in active_comp_codes if c in comp_to_sport}
         if filtered:
             sport_map = filtered
+    return sport_map
 
-    odds_map = {}
-    quota_exhausted = False
 
-    for sport, comp_code in sport_map.items():
-        if quota_exhausted:
-            break
-        try:
-            url = f"{ODDS_API_URL}/sports/{sport}/odds/"
-            params = {
-                "apiKey":      ODDS_API_KEY,
-                "regions":     "eu",
-                "markets":     "h2h",
-                "oddsFormat":  "decimal",
-                "dateFormat":  "iso",
-            }
-            resp = requests.get(url, params=params, timeout=10)
-            if resp.status_code == 401:
-                break
-            if resp.status_code == 429:
-                quota_exhausted = True
-                cb.record_failure("the-odds-api")
-                logger.warning("[fixtures] the-odds-api: quota epuizata (429)")
-                try:
-                    import cache as redis_cache
-                    redis_cache.set("odds_quota_exhausted", today, True, ttl=86400)
-                    yesterday_cache = redis_cache.get("odds_daily", yesterday)
-                    if yesterday_cache and isinstance(yesterday_cache, dict):
-                        odds_map.update({tuple(k.split("|")): v for k, v in yesterday_cache.items()})
-                except Exception:
-                    pass
-                break
-            if resp.status_code == 422:
-                continue
-            if resp.status_code != 200:
-                continue
-            events = resp.json()
-        except Exception:
-            continue
+def _parse_odds_events(events: list, known_teams: list, record: bool = True) -> dict:
+    """
+    Evenimentele The-Odds-API -> {(home_lower, away_lower): {B365H, ..., MaxA, open}}.
+    record: pull nou -> se adauga in odds_history; `open` = prima cota vazuta pentru meci.
+    Un pull din cache doar primeste `open` din istoricul existent.
+    """
+    import odds_history
 
-        for ev in events:
-            home_raw = ev.get("home_team", "")
-            away_raw = ev.get("away_team", "")
-            home = _normalize_name(home_raw, known_teams or [])
-            away = _normalize_name(away_raw, known_teams or [])
-
-            # Aduna cotele de la toti bookmakers disponibili
-            all_h, all_d, all_a = [], [], []
-            b365_h = b365_d = b365_a = None
-
-            for bk in ev.get("bookmakers", []):
-                for mkt in bk.get("markets", []):
-                    if mkt.get("key") != "h2h":
-                        continue
-                    outcomes = {o["name"]: o["price"] for o in mkt.get("outcomes", [])}
-                    oh = outcomes.get(ev["home_team"])
-                    od = outcomes.get("Draw")
-                    oa = outcomes.get(ev["away_team"])
-                    if oh and od and oa:
-                        all_h.append(oh); all_d.append(od); all_a.append(oa)
-                        if bk["key"] in ("bet365", "betway"):
-                            b365_h, b365_d, b365_a = oh, od, oa
-
-            if not all_h:
-                continue
+    odds_map = {}
+    snapshots = []
+    for ev in events:
+        home_raw = ev.get("home_team", "")
+        away_raw = ev.get("away_team", "")
+        home = _normalize_name(home_raw, known_teams or [])
+        away = _normalize_name(away_raw, known_teams or [])
 
-            avg_h = sum(all_h) / len(all_h)
-            avg_d = sum(all_d) / len(all_d)
-            avg_a = sum(all_a) / len(all_a)
-
-            odds_map[(home.lower(), away.lower())] = {
-                "B365H": b365_h or avg_h,
-                "B365D": b365_d or avg_d,
-                "B365A": b365_a or avg_a,
-                "AvgH":  avg_h,
-                "AvgD":  avg_d,
-                "AvgA":  avg_a,
-                "MaxH":  max(all_h),
-                "MaxD":  max(all_d),
-                "MaxA":  max(all_a),
-                "PSH":   b365_h or avg_h,
-                "PSD":   b365_d or avg_d,
-                "PSA":   b365_a or avg_a,
-            }
+        # Aduna cotele de la toti bookmakers disponibili
+        all_h, all_d, all_a = [], [], []
+        b365_h = b365_d = b365_a = None
 
-    # Salveaza in Redis cu TTL 48h — backup pentru ziua urmatoare daca quota se epuizeaza
-    if odds_map and not quota_exhausted:
-        cb.record_success("the-odds-api")
-        try:
-            import cache as redis_cache
-            serializable = {f"{k[0]}|{k[1]}": v for k, v in odds_map.items()}
-            redis_cache.set("odds_daily", today, serializable, ttl=172800)
-        except Exception:
-            pass
+        for bk in ev.get("bookmakers", []):
+            for mkt in bk.get("markets", []):
+                if mkt.get("key") != "h2h":
+                    continue
+                outcomes = {o["name"]: o["price"] for o in mkt.get("outcomes", [])}
+                oh = outcomes.get(ev["home_team"])
+                od = outcomes.get("Draw")
+                oa = outcomes.get(ev["away_team"])
+                if oh and od and oa:
+                    all_h.append(oh); all_d.append(od); all_a.append(oa)
+                    if bk["key"] in ("bet365", "betway"):
+                        b365_h, b365_d, b365_a = oh, od, oa
+
+        if not all_h:
+            continue
+
+        avg_h = sum(all_h) / len(all_h)
+        avg_d = sum(all_d) / len(all_d)
+        avg_a = sum(all_a) / len(all_a)
+
+        odds_map[(home.lower(), away.lower())] = {
+            "B365H": b365_h or avg_h,
+            "B365D": b365_d or avg_d,
+            "B365A": b365_a or avg_a,
+            "AvgH":  avg_h,
+            "AvgD":  avg_d,
+            "AvgA":  avg_a,
+            "MaxH":  max(all_h),
+            "MaxD":  max(all_d),
+            "MaxA":  max(all_a),
+            "PSH":   b365_h or avg_h,
+            "PSD":   b365_d or avg_d,
+            "PSA":   b365_a or avg_a,
+        }
+        snapshots.append((home, away, odds_history.match_date(ev.get("commence_time", "")),
+                          odds_map[(home.lower(), away.lower())]))
 
+    try:
+        if record:
+            odds_history.record(snapshots)
+        else:
+            odds_history.attach_open(snapshots)
+    except Exception as e:
+        logger.warning("[fixtures] odds_history: %s", e)
     return odds_map
 
 
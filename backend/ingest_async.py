@@ -0,0 +1,257 @@
+"""
+Ingestie async — fixtures (football-data.org), cote (The-Odds-API) si absente
+(api-football) descarcate concurent cu aiohttp.
+
+Fiecare provider are un token bucket (rate_limiter, partajat intre procese) in loc
+de time.sleep fix intre request-uri: request-urile pleaca imediat cat timp exista
+buget si asteapta doar cand bucket-ul e gol. Un 429 goleste bucket-ul pentru
+Retry-After secunde si se inregistreaza in circuit_breaker.cb, la fel ca in
+varianta sincrona.
+
+Parsarea, normalizarea si cache-ul Redis sunt cele din fixtures.py — modulul asta
+schimba doar transportul.
+
+Intrare sincrona (scheduler / endpoint-uri):
+    fetch_ingestion_inputs(target, known, lookahead=True) -> (fixtures, date, odds, injuries)
+    fetch_refresh_inputs(known, active_comp_codes) -> (odds, injuries)
+    fetch_finished_matches(date) -> meciurile FINISHED brute din football-data.org
+"""
+import asyncio
+import datetime
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+
+import fixtures as fx
+import rate_limiter
+from circuit_breaker import cb
+
+logger = logging.getLogger(__name__)
+
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=20)
+LOOKAHEAD_DAYS = 4
+
+
+async def _get_json(session: aiohttp.ClientSession, provider: str, url: str,
+                    params: dict = None, headers: dict = None, retry_429: bool = True,
+                    priority: int = rate_limiter.PRIORITY_FIXTURES, response_headers: dict = None):
+    """
+    GET prin bucket-ul providerului. Returneaza (status, json); status None = exceptie
+    sau buget epuizat. La 429 reincearca o singura data dupa Retry-After (daca retry_429).
+    response_headers: dict completat cu header-ele raspunsului 200 (chei lowercase).
+    """
+    for attempt in range(2):
+        try:
+            await rate_limiter.acquire_async(provider, priority)
+        except rate_limiter.Throttled as e:
+            logger.warning("[ingest] %s", e)
+            return None, None
+        try:
+            async with session.get(url, params=params, headers=headers) as resp:
+                await asyncio.to_thread(rate_limiter.observe, provider, resp.headers)
+                if resp.status == 429:
+                    cb.record_failure(provider)
+                    wait = rate_limiter.retry_after(provider, resp.headers)
+                    await asyncio.to_thread(rate_limiter.penalize, provider, wait)
+                    logger.warning("[ingest] %s: rate limit 429 (%s), pauza %.0fs", provider, url, wait)
+                    if retry_429 and attempt == 0:
+                        continue
+                    return 429, None
+                if resp.status != 200:
+                    return resp.status, None
+                if response_headers is not None:
+                    response_headers.update((k.lower(), v) for k, v in resp.headers.items())
+                return 200, await resp.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            cb.record_failure(provider)
+            logger.warning("[ingest] %s: exceptie la %s: %s", provider, url, e)
+            return None, None
+    return 429, None
+
+
+# ─── Surse ──────────────────────────────────────────────────────────────────
+
+async def _fd_matches(session, codes: list, date_from: str, date_to: str, status: str) -> list:
+    """Raspunsurile /competitions/{code}/matches pentru toate competitiile, concurent."""
+    if not fx.API_KEY:
+        return []
+    if cb.is_open("football-data"):
+        logger.warning("[ingest] football-data: circuit deschis, skip fetch")
+        return []
+    headers = {"X-Auth-Token": fx.API_KEY}
+    params  = {"dateFrom": date_from, "dateTo": date_to, "status": status}
+    results = await asyncio.gather(*(
+        _get_json(session, "football-data", f"{fx.BASE_URL}/competitions/{code}/matches",
+                  params=params, headers=headers)
+        for code in codes
+    ))
+    return [data for st, data in results if st == 200 and data]
+
+
+async def fetch_fixtures(session, target: str, known: list, lookahead: bool = False):
+    """
+    Meciurile TIMED/SCHEDULED pentru `target`. Cu lookahead, un singur request per
+    competitie acopera target..target+4 zile si se pastreaza prima zi cu meciuri
+    (inainte: pana la 5 runde de 10 request-uri). Returneaza (fixtures, data_gasita).
+    """
+    date_to = target
+    if lookahead:
+        date_to = (datetime.date.fromisoformat(target)
+                   + datetime.timedelta(days=LOOKAHEAD_DAYS)).isoformat()
+
+    fixtures = []
+    for data in await _fd_matches(session, fx.TIER_ONE_CODES, target, date_to, "TIMED,SCHEDULED"):
+        fixtures.extend(fx._parse_matches(data, known, default_date=target))
+    if fixtures:
+        cb.record_success("football-data")
+
+    found = target
+    if lookahead and fixtures:
+        found = min(f["date"] for f in fixtures)
+        fixtures = [f for f in fixtures if f["date"] == found]
+        if found != target:
+            logger.info("[ingest] Look-ahead: %d meciuri gasite pentru %s", len(fixtures), found)
+
+    # EL si alte ligi neacoperite de football-data.org free tier (sincron, rar folosit)
+    fixtures += await asyncio.to_thread(fx._fetch_af_missing_leagues, found, known, fixtures)
+    return fixtures, found
+
+
+async def fetch_odds(session, known: list, active_comp_codes: list = None) -> dict:
+    """
+    Echivalentul async al fixtures.get_today_odds — acelasi plan (odds_planner), iar
+    sporturile de reimprospatat se descarca concurent.
+    """
+    import odds_planner
+
+    if not fx.ODDS_API_KEY:
+        return {}
+    if cb.is_open("the-odds-api"):
+        logger.warning("[ingest] the-odds-api: circuit deschis, skip fetch")
+        return {}
+
+    backup = await asyncio.to_thread(fx._odds_backup)
+    if backup is not None:
+        return backup
+
+    pulls, to_fetch = await asyncio.to_thread(odds_planner.plan, list(fx._odds_sport_map(active_comp_codes)))
+    claimed = [s for s in to_fetch if await asyncio.to_thread(odds_planner.claim, s) or s not in pulls]
+    params = {"apiKey": fx.ODDS_API_KEY, **odds_planner.PARAMS}
+    # 429 pe The-Odds-API = quota lunara epuizata — nu are rost sa reincercam
+    # Header-ele (x-requests-remaining) ajung in odds_planner.store, ca in get_events
+    resp_headers = {sport: {} for sport in claimed}
+    results = await asyncio.gather(*(
+        _get_json(session, "the-odds-api", f"{fx.ODDS_API_URL}/sports/{sport}/odds/",
+                  params=params, retry_429=False, response_headers=resp_headers[sport])
+        for sport in claimed
+    ))
+
+    quota_exhausted = False
+    for sport, (status, events) in zip(claimed, results):
+        if status == 429:
+            quota_exhausted = True
+        elif status == 200 and events is not None:
+            pulls[sport] = await asyncio.to_thread(odds_planner.store, sport, events, resp_headers[sport])
+
+    odds_map = {}
+    for pull in pulls.values():
+        odds_map.update(await asyncio.to_thread(
+            fx._parse_odds_events, pull["events"], known, pull.get("fresh", False)))
+
+    if quota_exhausted:
+        # Backup-ul de ieri completeaza ce avem deja (cache / inainte de 429)
+        backup = await asyncio.to_thread(fx._odds_quota_exhausted)
+        odds_map = {**backup, **odds_map}
+    elif odds_map:
+        await asyncio.to_thread(fx._store_odds, odds_map)
+    return odds_map
+
+
+async def fetch_injuries(session, known: list) -> dict:
+    """Echivalentul async al fixtures.get_injuries_today — cele 5 ligi concurent."""
+    if not fx.AF_KEY:
+        return {}
+    import cache as redis_cache
+
+    today = datetime.date.today().isoformat()
+    cached = await asyncio.to_thread(redis_cache.get, "injuries_today", today)
+    if cached is not None:
+        return cached
+    if cb.is_open("api-football"):
+        logger.warning("[ingest] api-football: circuit deschis, skip injuries")
+        return {}
+
+    season  = fx._injury_season()
+    headers = {"x-apisports-key": fx.AF_KEY}
+    results = await asyncio.gather(*(
+        _get_json(session, "api-football", f"{fx.AF_BASE_URL}/injuries",
+                  params={"league": league_id, "season": season}, headers=headers)
+        for league_id in fx._INJURY_LEAGUE_IDS
+    ))
+
+    today_ts  = datetime.datetime.utcnow()
+    window_ts = today_ts + datetime.timedelta(days=5)
+    result: dict = {}
+    for status, data in results:
+        if status == 200 and data:
+            fx._count_injuries(data.get("response", []), known, today_ts, window_ts, result)
+
+    await asyncio.to_thread(redis_cache.set, "injuries_today", today, result, 21600)
+    logger.info("[injuries] %d echipe cu absente confirmate", len(result))
+    return result
+
+
+# ─── Orchestrare ────────────────────────────────────────────────────────────
+
+async def gather_inputs(target: str, known: list, lookahead: bool = False):
+    """
+    Absentele pornesc in paralel cu fixtures; cotele asteapta fixtures doar pentru
+    lista de ligi active (economie de quota The-Odds-API). Durata totala ~ cel mai
+    lent provider, nu suma lor.
+    """
+    async with aiohttp.ClientSession(timeout=HTTP_TIMEOUT) as session:
+        injuries_task = asyncio.create_task(fetch_injuries(session, known))
+        fixtures, found = await fetch_fixtures(session, target, known, lookahead)
+        active = sorted({f["competition_code"] for f in fixtures if f.get("competition_code")})
+        odds_map = await fetch_odds(session, known, active)
+        injuries = await injuries_task
+    return fixtures, found, odds_map, injuries
+
+
+async def gather_refresh_inputs(known: list, active_comp_codes: list):
+    """Doar cote + absente (fara fixtures) — pentru recalculul incremental din pick_scheduler."""
+    async with aiohttp.ClientSession(timeout=HTTP_TIMEOUT) as session:
+        return tuple(await asyncio.gather(fetch_odds(session, known, active_comp_codes),
+                                          fetch_injuries(session, known)))
+
+
+async def _finished_matches(date: str) -> list:
+    async with aiohttp.ClientSession(timeout=HTTP_TIMEOUT) as session:
+        responses = await _fd_matches(session, fx.TIER_ONE_CODES, date, date, "FINISHED")
+    return [m for data in responses for m in data.get("matches", [])]
+
+
+def _run(coro):
+    """asyncio.run si din cod apelat dintr-un event loop (FastAPI) — intr-un thread separat."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        return ex.submit(asyncio.run, coro).result()
+
+
+def fetch_ingestion_inputs(target: str, known: list, lookahead: bool = False):
+    """Sincron: (fixtures, data_gasita, odds_map, injuries)."""
+    return _run(gather_inputs(target, known, lookahead))
+
+
+def fetch_refresh_inputs(known: list, active_comp_codes: list):
+    """Sincron: (odds_map, injuries) — cotele prin odds_planner, absentele din cache-ul de 6h."""
+    return _run(gather_refresh_inputs(known, active_comp_codes))
+
+
+def fetch_finished_matches(date: str) -> list:
+    """Sincron: meciurile FINISHED (JSON brut football-data.org) pentru `date`."""
+    return _run(_finished_matches(date))
@@ -12,96 +12,90 @@ import cache as redis_cache
 logger = logging.getLogger(__name__)
 
 MODEL_VERSION = "xgb-v2"  # bump: filtre TIMED/SCHEDULED + doar 10 ligi active
+RESULTS_CHUNK    = 500   # randuri pick_results per upsert
+BACKFILL_WORKERS = 4     # zile procesate concurent la backfill
+
+
+def _pick(fix: dict, odds: dict, result: dict) -> dict:
+    """Intrarea din daily_picks pentru un meci (fixture + cote + predictie ajustata)."""
+    return {
+        "home":             fix["home"],
+        "away":             fix["away"],
+        "home_raw":         fix.get("home_raw", fix["home"]),
+        "away_raw":         fix.get("away_raw", fix["away"]),
+        "league":           fix["league"],
+        "flag":             fix["flag"],
+        "time":             fix.get("time", ""),
+        "competition_code": fix.get("competition_code", ""),
+        "home_win":         round(result["home_win"] * 100, 1),
+        "draw":             round(result["draw"] * 100, 1),
+        "away_win":         round(result["away_win"] * 100, 1),
+        "prediction":       result["prediction"],
+        "prediction_label": result["prediction_label"],
+        "confidence":       round(result["confidence"] * 100, 1),
+        "confidence_level": result["confidence_level"],
+        "high_confidence":  result["high_confidence"],
+        "home_elo":         result.get("home_elo", 1500),
+        "away_elo":         result.get("away_elo", 1500),
+        "home_form":        round(result.get("home_form", 0.4) * 100, 0),
+        "away_form":        round(result.get("away_form", 0.4) * 100, 0),
+        "home_venue_form":  round(result.get("home_venue_form", 0.4) * 100, 0),
+        "away_venue_form":  round(result.get("away_venue_form", 0.4) * 100, 0),
+        "btts_rate":        round(result.get("btts_rate", 0.5) * 100, 0),
+        "over25_rate":      round(result.get("over25_rate", 0.5) * 100, 0),
+        "has_odds":         odds is not None,
+        "odds_home":        round(odds["AvgH"], 2) if odds and odds.get("AvgH") else None,
+        "odds_draw":        round(odds["AvgD"], 2) if odds and odds.get("AvgD") else None,
+        "odds_away":        round(odds["AvgA"], 2) if odds and odds.get("AvgA") else None,
+        "vip_only":         False,
+        "model_version":    MODEL_VERSION,
+        # BI signals
+        "edge":             result.get("edge", 0.0),
+        "value_bet":        result.get("value_bet", False),
+        "market_signal":    result.get("market_signal", "NO_ODDS"),
+        "upset_risk":       result.get("upset_risk", False),
+    }
 
 
-def compute_and_store_picks(date: str = None) -> dict:
-    """
-    Calculeaza pick-urile pentru `date` (default: azi) si le salveaza
-    in tabelul daily_picks. Returneaza datele salvate.
-    """
-    # Import local ca sa evitam circular imports
-    from predictor import predict_match, get_known_teams, apply_injury_adjustment
-    from fixtures import get_today_fixtures, get_today_odds, get_injuries_today, COMPETITIONS
-
-    target = date or datetime.date.today().isoformat()
-    logger.info("[ingestion] Start pre-calcul picks pentru %s", target)
-
-    known    = get_known_teams()
-    fixtures = get_today_fixtures(date=target, known_teams=known)
-
-    # Daca nu sunt meciuri pentru data ceruta si e AZI, fa look-ahead pana la 4 zile
-    if not fixtures and target == datetime.date.today().isoformat():
-        for _offset in range(1, 5):
-            _lookahead = (datetime.date.today() + datetime.timedelta(days=_offset)).isoformat()
-            fixtures = get_today_fixtures(date=_lookahead, known_teams=known)
-            if fixtures:
-                logger.info("[ingestion] Look-ahead: %d meciuri gasite pentru %s", len(fixtures), _lookahead)
-                target = _lookahead
-                break
+def _predict_picks(fixtures: list, odds_map: dict, injuries: dict, errors: list) -> list:
+    """Un singur predict_proba pentru toata lista de meciuri (batch) -> pick-uri."""
+    from predictor import predict_matches, apply_injury_adjustment
+    from fixtures import COMPETITIONS
 
-    actual_date = fixtures[0].get("date", target) if fixtures else target
-    # Trimite doar ligile cu meciuri azi — reduce consumul de quota The-Odds-API
-    active_comps = list({f.get("competition_code") for f in fixtures if f.get("competition_code")})
-    odds_map    = get_today_odds(known_teams=known, active_comp_codes=active_comps)
-    injuries    = get_injuries_today(known_teams=known)
-
-    picks  = []
-    errors = []
+    batch = [{
+        "home_team":   fix["home"],
+        "away_team":   fix["away"],
+        "odds":        odds_map.get((fix["home"].lower(), fix["away"].lower())),
+        "league_code": COMPETITIONS.get(fix.get("competition_code", ""), {}).get("div", ""),
+    } for fix in fixtures]
+    try:
+        # Meciurile care esueaza individual ajung in errors, restul se publica
+        results = predict_matches(batch, errors)
+    except Exception as e:
+        logger.error("[ingestion] Predictie batch esuata: %s", e)
+        results = []
+        errors.append({"match": f"{len(batch)} meciuri", "error": str(e)})
 
-    for fix in fixtures:
+    picks = []
+    for fix, item, result in zip(fixtures, batch, results):
+        if result is None:
+            continue
         try:
-            key  = (fix["home"].lower(), fix["away"].lower())
-            odds = odds_map.get(key)
-            div_code = COMPETITIONS.get(fix.get("competition_code", ""), {}).get("div", "")
-            result = predict_match(home_team=fix["home"], away_team=fix["away"],
-                                   odds=odds, league_code=div_code)
             result = apply_injury_adjustment(result, fix["home"], fix["away"], injuries)
-
-            picks.append({
-                "home":             fix["home"],
-                "away":             fix["away"],
-                "home_raw":         fix.get("home_raw", fix["home"]),
-                "away_raw":         fix.get("away_raw", fix["away"]),
-                "league":           fix["league"],
-                "flag":             fix["flag"],
-                "time":             fix.get("time", ""),
-                "competition_code": fix.get("competition_code", ""),
-                "home_win":         round(result["home_win"] * 100, 1),
-                "draw":             round(result["draw"] * 100, 1),
-                "away_win":         round(result["away_win"] * 100, 1),
-                "prediction":       result["prediction"],
-                "prediction_label": result["prediction_label"],
-                "confidence":       round(result["confidence"] * 100, 1),
-                "confidence_level": result["confidence_level"],
-                "high_confidence":  result["high_confidence"],
-                "home_elo":         result.get("home_elo", 1500),
-                "away_elo":         result.get("away_elo", 1500),
-                "home_form":        round(result.get("home_form", 0.4) * 100, 0),
-                "away_form":        round(result.get("away_form", 0.4) * 100, 0),
-                "home_venue_form":  round(result.get("home_venue_form", 0.4) * 100, 0),
-                "away_venue_form":  round(result.get("away_venue_form", 0.4) * 100, 0),
-                "btts_rate":        round(result.get("btts_rate", 0.5) * 100, 0),
-                "over25_rate":      round(result.get("over25_rate", 0.5) * 100, 0),
-                "has_odds":         odds is not None,
-                "odds_home":        round(odds["AvgH"], 2) if odds and odds.get("AvgH") else None,
-                "odds_draw":        round(odds["AvgD"], 2) if odds and odds.get("AvgD") else None,
-                "odds_away":        round(odds["AvgA"], 2) if odds and odds.get("AvgA") else None,
-                "vip_only":         False,
-                "model_version":    MODEL_VERSION,
-                # BI signals
-                "edge":             result.get("edge", 0.0),
-                "value_bet":        result.get("value_bet", False),
-                "market_signal":    result.get("market_signal", "NO_ODDS"),
-                "upset_risk":       result.get("upset_risk", False),
-            })
+            picks.append(_pick(fix, item["odds"], result))
         except Exception as e:
             errors.append({"match": f"{fix['home']} vs {fix['away']}", "error": str(e)})
+    return picks
+
 
+def _build_payload(picks: list, actual_date: str, target: str, total_fixtures: int, errors: list) -> dict:
+    """Sortare, VIP, banker si contoare — acelasi payload pentru calcul complet si incremental."""
     picks.sort(key=lambda x: x["confidence"], reverse=True)
 
     # Top 3 picks cu confidence >= 65% devin VIP-only (monetizare)
     vip_count = 0
     for p in picks:
+        p["vip_only"] = False
         if p["confidence"] >= 65 and vip_count < 3:
             p["vip_only"] = True
             vip_count += 1
@@ -113,10 +107,10 @@ def compute_and_store_picks(date: str = None) -> dict:
     # Banker = cel mai confident pick
     banker = picks[0] if high_conf else (picks[0] if picks else None)
 
-    payload = {
+    return {
         "date":           actual_date,
         "requested_date": target,
-        "total_fixtures": len(fixtures),
+        "total_fixtures": total_fixtures,
         "total_picks":    len(picks),
         "high_conf":      len(high_conf),
         "med_conf":       len(med_conf),
@@ -129,24 +123,56 @@ def compute_and_store_picks(date: str = None) -> dict:
         "computed_at":    datetime.datetime.utcnow().isoformat(),
     }
 
-    # Salveaza in Supabase daily_picks (upsert pe pick_date) — doar daca exista picks reale
+
+def _save_payload(payload: dict, target: str):
+    """Upsert daily_picks (doar daca exista picks reale) + invalidare cache daily."""
+    actual_date, picks = payload["date"], payload["picks"]
     client = get_client()
     if client and picks:
         try:
             client.table("daily_picks").upsert({
                 "pick_date":     actual_date,
                 "picks":         json.dumps(picks, default=str),
-                "banker":        json.dumps(banker, default=str) if banker else None,
+                "banker":        json.dumps(payload["banker"], default=str) if payload["banker"] else None,
                 "model_version": MODEL_VERSION,
             }, on_conflict="pick_date").execute()
             logger.info("[ingestion] Salvat %d picks in Supabase pentru %s", len(picks), actual_date)
         except Exception as e:
             logger.error("[ingestion] Supabase upsert failed: %s", e)
 
-    # Invalideaza cache Redis pentru toate pragurile de confidence folosite
-    for _mc in ("0.5", "0.45", "0.55", "0.6", "0.65"):
-        redis_cache.delete("daily", f"{target}:{_mc}")
-        redis_cache.delete("daily", f"{actual_date}:{_mc}")
+    # Invalideaza intrarea canonica (una per data, orice prag de confidence)
+    redis_cache.delete_many("daily", sorted({target, actual_date}))
+
+
+def compute_and_store_picks(date: str = None) -> dict:
+    """
+    Calculeaza pick-urile pentru `date` (default: azi) si le salveaza
+    in tabelul daily_picks. Returneaza datele salvate.
+    """
+    # Import local ca sa evitam circular imports
+    from predictor import get_known_teams
+    from ingest_async import fetch_ingestion_inputs
+
+    target = date or datetime.date.today().isoformat()
+    logger.info("[ingestion] Start pre-calcul picks pentru %s", target)
+
+    known = get_known_teams()
+
+    # Fixtures + cote + absente descarcate concurent; daca e AZI si nu sunt meciuri,
+    # look-ahead pana la 4 zile (acelasi request per competitie, interval de date)
+    fixtures, target, odds_map, injuries = fetch_ingestion_inputs(
+        target, known, lookahead=target == datetime.date.today().isoformat())
+
+    actual_date = fixtures[0].get("date", target) if fixtures else target
+
+    errors  = []
+    picks   = _predict_picks(fixtures, odds_map, injuries, errors)
+    payload = _build_payload(picks, actual_date, target, len(fixtures), errors)
+    _save_payload(payload, target)
+    if picks:
+        # Starea zilei pentru recalculul incremental (pick_scheduler.refresh)
+        import pick_scheduler
+        pick_scheduler.remember_inputs(actual_date, fixtures, odds_map, injuries, payload)
 
     logger.info("[ingestion] Complet: %d picks pentru %s", len(picks), actual_date)
 
@@ -170,70 +196,64 @@ def compute_and_store_picks(date: str = None) -> dict:
     return payload
 
 
-def auto_mark_results(date: str = None) -> dict:
-    """
-    Fetches rezultatele meciurilor FINISHED pentru `date` din football-data.org,
-    le compara cu pick-urile salvate si marcheaza automat WIN/LOSS in pick_results.
-    Ruleaza zilnic la 23:30 Bucharest via scheduler.
-    Foloseste per-competition endpoint (TIER_ONE compatible).
-    """
-    import os, time, requests as req
+def _fetch_finished(target: str) -> list:
+    """Meciurile FINISHED din `target` (football-data, per competitie, concurent), nume normalizate."""
     from predictor import get_known_teams
     from fixtures import _normalize_name, COMPETITIONS
-
-    target = date or datetime.date.today().isoformat()
-    logger.info("[results] Start auto-marcare rezultate pentru %s", target)
-
-    api_key = os.getenv("FOOTBALL_DATA_KEY", "")
-    if not api_key:
-        logger.warning("[results] FOOTBALL_DATA_KEY nu e setat")
-        return {"marked": 0, "error": "no api key"}
+    from ingest_async import fetch_finished_matches
 
     known = get_known_teams()
     finished = []
 
-    # Itereaza per competitie — /v4/matches general returneaza 0 pe TIER_ONE
-    for code in COMPETITIONS:
-        try:
-            resp = req.get(
-                f"https://api.football-data.org/v4/competitions/{code}/matches",
-                headers={"X-Auth-Token": api_key},
-                params={"dateFrom": target, "dateTo": target, "status": "FINISHED"},
-                timeout=15,
-            )
-            if resp.status_code == 429:
-                logger.warning("[results] Rate limit hit la %s - sleep 12s", code)
-                time.sleep(12)
-                resp = req.get(
-                    f"https://api.football-data.org/v4/competitions/{code}/matches",
-                    headers={"X-Auth-Token": api_key},
-                    params={"dateFrom": target, "dateTo": target, "status": "FINISHED"},
-                    timeout=15,
-                )
-            if resp.status_code != 200:
-                logger.debug("[results] %s: HTTP %s", code, resp.status_code)
-                time.sleep(0.3)
-                continue
-            for m in resp.json().get("matches", []):
-                score = m.get("score", {}).get("fullTime", {})
-                home_goals = score.get("home")
-                away_goals = score.get("away")
-                if home_goals is None or away_goals is None:
-                    continue
-                home_raw = m.get("homeTeam", {}).get("name", "")
-                away_raw = m.get("awayTeam", {}).get("name", "")
-                finished.append({
-                    "home":       _normalize_name(home_raw, known),
-                    "away":       _normalize_name(away_raw, known),
-                    "home_goals": home_goals,
-                    "away_goals": away_goals,
-                })
-            time.sleep(0.3)
-        except Exception as e:
-            logger.warning("[results] Fetch failed pentru %s: %s", code, e)
+    # Per competitie, concurent — /v4/matches general returneaza 0 pe TIER_ONE
+    for m in fetch_finished_matches(target):
+        score = m.get("score", {}).get("fullTime", {})
+        home_goals = score.get("home")
+        away_goals = score.get("away")
+        if home_goals is None or away_goals is None:
             continue
+        home_raw = m.get("homeTeam", {}).get("name", "")
+        away_raw = m.get("awayTeam", {}).get("name", "")
+        code = m.get("competition", {}).get("code", "")
+        finished.append({
+            "id":         m.get("id"),
+            "date":       target,
+            "kickoff":    m.get("utcDate", ""),
+            "div":        COMPETITIONS.get(code, {}).get("div", code),
+            "home":       _normalize_name(home_raw, known),
+            "away":       _normalize_name(away_raw, known),
+            "home_goals": home_goals,
+            "away_goals": away_goals,
+        })
 
     logger.info("[results] Total meciuri FINISHED gasite: %d pentru %s", len(finished), target)
+    return finished
+
+
+def write_results(client, rows: list) -> int:
+    """
+    Scrie randurile pick_results in bloc: upsert pe (pick_date, home, away), cate
+    RESULTS_CHUNK randuri per request (inainte: delete + insert per pick), apoi
+    contoarele track_stats intr-un singur pipeline. Returneaza randurile scrise.
+    """
+    import track_stats
+
+    written = []
+    for i in range(0, len(rows), RESULTS_CHUNK):
+        chunk = rows[i:i + RESULTS_CHUNK]
+        try:
+            track_stats.upsert_results(client, chunk)
+            written += chunk
+        except Exception as e:
+            logger.error("[results] Upsert esuat pentru %d randuri: %s", len(chunk), e)
+    track_stats.mark_many([(r["pick_date"], r["home"], r["away"], r["result"], r["confidence"], r.get("league"))
+                           for r in written])
+    return len(written)
+
+
+def mark_results(target: str, finished: list) -> dict:
+    """Compara meciurile FINISHED cu pick-urile salvate pentru `target` si scrie WIN/LOSS."""
+    import track_stats
 
     if not finished:
         logger.info("[results] Niciun meci FINISHED gasit pentru %s", target)
@@ -257,7 +277,7 @@ def auto_mark_results(date: str = None) -> dict:
     if not client:
         return {"marked": 0, "error": "no db client"}
 
-    marked = 0
+    rows = []
     skipped = 0
 
     for pick in picks:
@@ -279,31 +299,95 @@ def auto_mark_results(date: str = None) -> dict:
             actual = "D"
 
         result = "win" if prediction == actual else "loss"
+        rows.append({
+            "pick_date":    target,
+            "home":         pick["home"],
+            "away":         pick["away"],
+            "result":       result,
+            "confidence":   confidence,
+            "actual_score": f"{home_goals}-{away_goals}",
+            "prediction":   pick.get("prediction"),
+            **track_stats.row_fields(pick),
+        })
+        logger.info("[results] %s vs %s: pred=%s actual=%s (%s-%s) -> %s",
+                    pick["home"], pick["away"], prediction, actual,
+                    home_goals, away_goals, result)
+
+    marked = write_results(client, rows)
+    logger.info("[results] Complet: %d marcate, %d sarite pentru %s", marked, skipped, target)
+    return {"marked": marked, "skipped": skipped, "finished_found": len(finished)}
+
+
+def auto_mark_results(date: str = None) -> dict:
+    """
+    Fetches rezultatele meciurilor FINISHED pentru `date` din football-data.org,
+    le compara cu pick-urile salvate si marcheaza automat WIN/LOSS in pick_results.
+    Ruleaza zilnic la 23:30 Bucharest via scheduler.
+    Foloseste per-competition endpoint (TIER_ONE compatible).
+    """
+    import os
 
+    target = date or datetime.date.today().isoformat()
+    logger.info("[results] Start auto-marcare rezultate pentru %s", target)
+
+    if not os.getenv("FOOTBALL_DATA_KEY", ""):
+        logger.warning("[results] FOOTBALL_DATA_KEY nu e setat")
+        return {"marked": 0, "error": "no api key"}
+
+    finished = _fetch_finished(target)
+
+    # Forma / Elo / H2H actualizate incremental din aceleasi rezultate (fara retrain)
+    if finished:
         try:
-            client.table("pick_results").delete()\
-                .eq("pick_date", target)\
-                .eq("home", pick["home"])\
-                .eq("away", pick["away"])\
-                .execute()
-            client.table("pick_results").insert({
-                "pick_date":    target,
-                "home":         pick["home"],
-                "away":         pick["away"],
-                "result":       result,
-                "confidence":   confidence,
-                "actual_score": f"{home_goals}-{away_goals}",
-                "prediction":   pick.get("prediction"),
-            }).execute()
-            marked += 1
-            logger.info("[results] %s vs %s: pred=%s actual=%s (%s-%s) -> %s",
-                        pick["home"], pick["away"], prediction, actual,
-                        home_goals, away_goals, result)
+            from state_refresh import refresh_from_results
+            logger.info("[results] State refresh: %s", refresh_from_results(finished))
         except Exception as e:
-            logger.error("[results] Insert failed pentru %s vs %s: %s", pick["home"], pick["away"], e)
+            logger.error("[results] State refresh esuat: %s", e)
 
-    logger.info("[results] Complet: %d marcate, %d sarite pentru %s", marked, skipped, target)
-    return {"marked": marked, "skipped": skipped, "finished_found": len(finished)}
+    return mark_results(target, finished)
+
+
+def backfill_results(date_from: str, date_to: str = None, workers: int = BACKFILL_WORKERS) -> dict:
+    """
+    auto_mark_results pentru un interval de date: zilele ruleaza concurent (pool de
+    `workers` thread-uri; request-urile football-data trec oricum prin rate_limiter),
+    fiecare zi = un fetch + un upsert in bloc. Starea modelului se actualizeaza o
+    singura data la final, cu toate meciurile in ordine cronologica — refresh-ul
+    incremental nu suporta zile aplicate in paralel sau in dezordine.
+    """
+    import os
+    from concurrent.futures import ThreadPoolExecutor
+
+    if not os.getenv("FOOTBALL_DATA_KEY", ""):
+        logger.warning("[backfill] FOOTBALL_DATA_KEY nu e setat")
+        return {"marked": 0, "error": "no api key"}
+
+    start = datetime.date.fromisoformat(date_from)
+    stop  = datetime.date.fromisoformat(date_to or date_from)
+    dates = [(start + datetime.timedelta(days=i)).isoformat() for i in range((stop - start).days + 1)]
+
+    def _day(target):
+        try:
+            finished = _fetch_finished(target)
+            return finished, mark_results(target, finished)
+        except Exception as e:
+            logger.warning("[backfill] Eroare la %s: %s", target, e)
+            return [], {"marked": 0, "error": str(e)}
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        done = list(pool.map(_day, dates))
+
+    finished = [m for f, _ in done for m in f]
+    if finished:
+        try:
+            from state_refresh import refresh_from_results
+            logger.info("[backfill] State refresh: %s", refresh_from_results(finished))
+        except Exception as e:
+            logger.error("[backfill] State refresh esuat: %s", e)
+
+    marked = sum(r.get("marked", 0) for _, r in done)
+    logger.info("[backfill] %s..%s: %d zile, %d marcate", dates[0], dates[-1], len(dates), marked)
+    return {"days": len(dates), "marked": marked}
 
 
 def load_picks_from_db(date: str) -> dict | None:
@@ -324,8 +408,7 @@ def load_picks_from_db(date: str) -> dict | None:
         if row.get("model_version") != MODEL_VERSION:
             logger.info("[ingestion] Versiune veche (%s) - sterg si recomputez", row.get("model_version"))
             client.table("daily_picks").delete().eq("pick_date", date).execute()
-            redis_cache.delete("daily", f"{date}:0.5")
-            redis_cache.delete("daily", f"{date}:0.45")
+            redis_cache.delete("daily", date)
             return None
 
         picks  = json.loads(row["picks"])  if isinstance(row["picks"],  str) else row["picks"]
@@ -4,11 +4,10 @@ OXIANO — Backend API v2
 
 import os
 import math
+import bisect
 import datetime
-import time
 import logging
 import threading
-import requests
 from fastapi import FastAPI, HTTPException, Query, Request, Depends, Header, BackgroundTasks
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
@@ -19,10 +18,12 @@ from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 import sentry_sdk
 
-from predictor import predict_match, load_model, get_known_teams
+from predictor import predict_match, predict_matches, load_model, get_known_teams
 from fixtures import get_today_fixtures, get_today_odds, _fetch_fixtures_for_range, fetch_competition_fixtures
 from db import log_predictions_bulk, get_client
 import cache as redis_cache
+import daily_render
+import elo_engine
 from auth import register_user, login_user, get_current_user, require_user, require_admin, request_password_reset, reset_password
 from ingestion import compute_and_store_picks, load_picks_from_db, auto_mark_results
 
@@ -100,6 +101,9 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup_event():
     load_model()
+    # Hot-reload: fiecare worker uvicorn isi verifica singur artefactul modelului
+    from predictor import start_model_watcher
+    start_model_watcher()
     # Incarca Elo-uri externe de la clubelo.com (mai precise decat cele din model)
     try:
         from predictor import refresh_clubelo
@@ -110,11 +114,8 @@ async def startup_event():
     # Goleste cache la fiecare restart — evita date invechite
     try:
         import cache as _c
-        for ns in ("daily", "fixtures"):
-            import datetime as _dt
-            today_str = _dt.date.today().isoformat()
-            _c.delete(ns, f"{today_str}:0.5")
-            _c.delete(ns, f"{today_str}:0.45")
+        import datetime as _dt
+        _c.delete("daily", _dt.date.today().isoformat())
     except Exception:
         pass
 
@@ -122,8 +123,9 @@ async def startup_event():
     # API-ul este pur serving — zero compute la startup.
 
 
-CACHE_TTL_DAILY    = 900    # 15 minute
-CACHE_TTL_FIXTURES = 86400  # 24 ore
+CACHE_TTL_DAILY       = 900    # 15 minute
+CACHE_TTL_DAILY_EMPTY = 60     # intrarea "fara pick-uri" — scheduler-ul le poate scrie oricand
+CACHE_TTL_FIXTURES    = 86400  # 24 ore
 
 
 # ─────────────────────────────────────────────
@@ -145,7 +147,8 @@ def api_health():
 
     # Model — foloseste globalele incarcate la startup, fara reload
     try:
-        vals = [_pred._model, _pred._features, _pred._team_stats, _pred._label_encoder]
+        b = _pred._bundle
+        vals = [b and b.model, b and b.features, b and b.team_stats, b and b.label_encoder]
         missing = [k for k, v in zip(["model", "features", "team_stats", "label_encoder"], vals) if v is None]
         if missing:
             model_status = f"not loaded: {missing}"
@@ -188,6 +191,23 @@ def health_circuits(admin_secret: str = Header(None, alias="X-Admin-Secret")):
     return {"circuits": cb.status() or "all closed"}
 
 
+@app.get("/api/health/cache")
+def health_cache(admin_secret: str = Header(None, alias="X-Admin-Secret")):
+    """Contoare L1 cache (hit/miss/evictions) pentru worker-ul care raspunde."""
+    if admin_secret != ADMIN_SECRET:
+        raise HTTPException(403, "Forbidden")
+    return redis_cache.stats()
+
+
+@app.get("/api/health/ratelimits")
+def health_ratelimits(admin_secret: str = Header(None, alias="X-Admin-Secret")):
+    """Buget ramas per provider extern (partajat API + worker) si quota raportata de provider."""
+    if admin_secret != ADMIN_SECRET:
+        raise HTTPException(403, "Forbidden")
+    import rate_limiter
+    return rate_limiter.stats()
+
+
 # ─────────────────────────────────────────────
 # AUTH
 # ─────────────────────────────────────────────
@@ -355,6 +375,7 @@ def api_leagues():
 # ─────────────────────────────────────────────
 
 FREE_PICKS_LIMIT = 3
+DAILY_DEFAULT_MIN_CONF = 0.50
 
 
 def _mask_vip_picks(picks: list, user: Optional[dict]) -> list:
@@ -412,13 +433,72 @@ def _mask_vip_picks(picks: list, user: Optional[dict]) -> list:
     return result
 
 
+def _canonical_daily(data: Optional[dict], date: str) -> dict:
+    """
+    Intrarea canonica din cache pentru o data: toate pick-urile sortate descrescator
+    dupa confidence + cheile de cautare binara. None -> intrare goala (cache negativ,
+    invalidata de compute_and_store_picks ca orice alta intrare).
+    """
+    if not data:
+        return {"date": date, "total_picks": 0, "picks": [], "_conf_neg": [], "_n_high": 0, "_n_med_high": 0}
+    picks = sorted(data.get("picks", []), key=lambda p: p.get("confidence", 0), reverse=True)
+    conf_neg = [-p.get("confidence", 0) for p in picks]   # crescator -> bisect
+    canon = {
+        **data,
+        "picks":       picks,
+        "total_picks": len(picks),
+        "_conf_neg":   conf_neg,
+        # Prefix-uri pe lista sortata: primele _n_high sunt HIGH, primele _n_med_high HIGH+MEDIUM
+        "_n_high":     bisect.bisect_right(conf_neg, -65),
+        "_n_med_high": bisect.bisect_right(conf_neg, -55),
+    }
+    # Hash-ul continutului -> ETag-ul render-urilor pre-serializate (daily_render)
+    canon["_rev"] = daily_render.revision(canon)
+    return canon
+
+
+def _daily_k(canon: dict, min_confidence: float) -> int:
+    return bisect.bisect_right(canon["_conf_neg"], -min_confidence * 100)
+
+
+def _daily_render(date: str, canon: dict, min_confidence: float, tier: str) -> dict:
+    """Bytes-ii raspunsului /api/daily pentru (data, prag, tier) — serializati o data per continut."""
+    def build(t):
+        view = _daily_view(canon, min_confidence)
+        return {**view, "picks": _mask_vip_picks(view["picks"], daily_render.TIER_USERS[t])}
+    return daily_render.get(date, canon, _daily_k(canon, min_confidence), tier, build)
+
+
+def _prerender_daily(date: str, canon: dict):
+    """Cele trei tier-uri pentru pragul implicit, imediat dupa construirea intrarii canonice."""
+    if canon.get("total_picks", 0) > 0:
+        for t in daily_render.TIERS:
+            _daily_render(date, canon, DAILY_DEFAULT_MIN_CONF, t)
+
+
+def _daily_view(canon: dict, min_confidence: float) -> dict:
+    """Filtrare dupa prag in O(log n): pick-urile cu confidence >= prag sunt un prefix al listei."""
+    k = _daily_k(canon, min_confidence)
+    high = min(k, canon["_n_high"])
+    med  = min(k, canon["_n_med_high"]) - high
+    view = {key: v for key, v in canon.items() if not key.startswith("_")}
+    view.update({
+        "picks":       canon["picks"][:k],
+        "total_picks": k,
+        "high_conf":   high,
+        "med_conf":    med,
+        "low_conf":    k - high - med,
+    })
+    return view
+
+
 @app.get("/api/daily")
 @limiter.limit("30/minute")
 def daily_picks(
     request: Request,
     background_tasks: BackgroundTasks,
     date: Optional[str] = None,
-    min_confidence: float = Query(0.50, ge=0.0, le=1.0),
+    min_confidence: float = Query(DAILY_DEFAULT_MIN_CONF, ge=0.0, le=1.0),
     user: Optional[dict] = Depends(get_current_user),
 ):
     """
@@ -430,23 +510,16 @@ def daily_picks(
     - >= 0.65  →  HIGH    (acuratete reala ~75%)
     - >= 0.55  →  MEDIUM  (acuratete reala ~65%)
     - < 0.55   →  LOW     (acuratete reala ~57%)
+
+    Raspunsul vine pre-serializat (daily_render): bytes orjson / gzip / br per tier,
+    cu ETag puternic (If-None-Match -> 304).
     """
     target    = date or datetime.date.today().isoformat()
     today_str = datetime.date.today().isoformat()
+    tier      = daily_render.tier(user)
 
-    cache_key = f"{target}:{min_confidence}"
-
-    # 1. Redis cache (cel mai rapid) — stale-while-revalidate
-    cached = redis_cache.get("daily", cache_key)
-    if cached and cached.get("total_picks", 0) > 0:
-        remaining_ttl = redis_cache.ttl("daily", cache_key)
-        if 0 < remaining_ttl < 300 and target >= today_str:
-            # Cache aproape expirat — refresh in background, servim stale acum
-            background_tasks.add_task(compute_and_store_picks, target)
-            logger.info("[daily] stale-while-revalidate pentru %s (ttl=%ds)", target, remaining_ttl)
-        return {**cached, "picks": _mask_vip_picks(cached["picks"], user)}
-
-    # 2. Supabase daily_picks — look-ahead pana la 4 zile cand nu e data explicita
+    # Cache: o singura intrare canonica per data (toate pick-urile); pragul se aplica la citire
+    # 1+2. Redis/L1 apoi Supabase daily_picks — look-ahead pana la 4 zile cand nu e data explicita
     search_dates = [target]
     if not date:
         for i in range(1, 5):
@@ -455,33 +528,34 @@ def daily_picks(
             )
 
     for search_date in search_dates:
-        db_data = load_picks_from_db(search_date)
-        if not db_data or db_data.get("total_picks", 0) == 0:
+        canon, remaining_ttl = redis_cache.get_with_ttl("daily", search_date)
+        if canon is None:
+            db_data = load_picks_from_db(search_date)
+            canon = _canonical_daily(db_data if db_data and db_data.get("total_picks", 0) > 0 else None,
+                                     search_date)
+            ttl = CACHE_TTL_DAILY if canon.get("total_picks", 0) > 0 else CACHE_TTL_DAILY_EMPTY
+            redis_cache.set("daily", search_date, canon, ttl=ttl)
+            _prerender_daily(search_date, canon)
+        elif search_date == target and 0 < remaining_ttl < 300 and target >= today_str \
+                and canon.get("total_picks", 0) > 0:
+            # Cache aproape expirat — refresh in background, servim stale acum
+            background_tasks.add_task(compute_and_store_picks, target)
+            logger.info("[daily] stale-while-revalidate pentru %s (ttl=%ds)", target, remaining_ttl)
+
+        if canon.get("total_picks", 0) == 0:
             continue
-        all_picks = db_data["picks"]
-        filtered  = [p for p in all_picks if p["confidence"] >= min_confidence * 100]
-        if not filtered and search_date != target:
+        if _daily_k(canon, min_confidence) == 0 and search_date != target:
             continue
-        db_data["picks"]       = filtered
-        db_data["total_picks"] = len(filtered)
-        db_data["high_conf"]   = len([p for p in filtered if p["confidence"] >= 65])
-        db_data["med_conf"]    = len([p for p in filtered if 55 <= p["confidence"] < 65])
-        db_data["low_conf"]    = len([p for p in filtered if p["confidence"] < 55])
-        redis_cache.set("daily", cache_key, db_data, ttl=CACHE_TTL_DAILY)
-        return {**db_data, "picks": _mask_vip_picks(db_data["picks"], user)}
+        return daily_render.respond(request, _daily_render(search_date, canon, min_confidence, tier))
 
     # 3. Calcul live cu coalescing — un singur thread calculeaza, restul asteapta
     if target >= today_str:
         live_data = _coalesced_compute(target)
         if live_data and live_data.get("total_picks", 0) > 0:
-            all_picks = live_data.get("picks", [])
-            filtered  = [p for p in all_picks if p.get("confidence", 0) >= min_confidence * 100]
-            live_data["picks"]       = filtered
-            live_data["total_picks"] = len(filtered)
-            live_data["high_conf"]   = len([p for p in filtered if p.get("confidence", 0) >= 65])
-            live_data["med_conf"]    = len([p for p in filtered if 55 <= p.get("confidence", 0) < 65])
-            redis_cache.set("daily", cache_key, live_data, ttl=CACHE_TTL_DAILY)
-            return {**live_data, "picks": _mask_vip_picks(filtered, user)}
+            canon = _canonical_daily(live_data, target)
+            redis_cache.set("daily", target, canon, ttl=CACHE_TTL_DAILY)
+            _prerender_daily(target, canon)
+            return daily_render.respond(request, _daily_render(target, canon, min_confidence, tier))
 
     # 4. Nu exista date — picks in curs de calcul (scheduler 07:00/13:00)
     return {
@@ -649,8 +723,8 @@ def predict_get(
 
     # ── Elo model (formula clasica Bradley-Terry) ──────────────
     elo_diff = home_elo - away_elo
-    elo_hw   = round(1 / (1 + 10 ** (-elo_diff / 400)) * 100, 1)
-    elo_aw   = round(1 / (1 + 10 ** (elo_diff / 400)) * 100, 1)
+    elo_hw   = round(elo_engine.win_prob(elo_diff) * 100, 1)
+    elo_aw   = round(elo_engine.win_prob(-elo_diff) * 100, 1)
     elo_dr   = round(max(0, 100 - elo_hw - elo_aw), 1)
     # Redistribuim draw mai realist (15-25% din spatiu)
     draw_share = min(28, max(15, 22 - abs(elo_diff) * 0.02))
@@ -731,12 +805,16 @@ def predict_get(
 def api_standings(league: str):
     """Returneaza clasamentul curent pentru o liga (football-data.org)."""
     from fixtures import API_KEY, BASE_URL
+    import rate_limiter
     code = LEGACY_MAP.get(str(league), league.upper())
     if not API_KEY:
         return {"standings": [], "league": code}
     try:
-        r = requests.get(
+        # Buget football-data comun cu worker-ul; compute-ul zilnic are prioritate
+        r = rate_limiter.get(
+            "football-data",
             f"{BASE_URL}/competitions/{code}/standings",
+            priority=rate_limiter.PRIORITY_STANDINGS,
             headers={"X-Auth-Token": API_KEY},
             timeout=10,
         )
@@ -780,7 +858,7 @@ class BatchRequest(BaseModel):
 
 @app.post("/api/predict/batch")
 def predict_batch(req: BatchRequest):
-    results = []
+    batch = []
     for m in req.matches:
         try:
             odds = None
@@ -797,17 +875,25 @@ def predict_batch(req: BatchRequest):
                     "MaxD": m.get("odds_maxd", m["odds_b365d"]),
                     "MaxA": m.get("odds_maxa", m["odds_b365a"]),
                 }
-            result = predict_match(
-                home_team=m["home_team"],
-                away_team=m["away_team"],
-                odds=odds,
-                league_id=m.get("league_id", 0),
-                month=m.get("month"),
-            )
-            if result["confidence"] >= req.min_confidence:
-                results.append(result)
+            batch.append({
+                "home_team": m["home_team"],
+                "away_team": m["away_team"],
+                "odds":      odds,
+                "league_id": m.get("league_id", 0),
+                "month":     m.get("month"),
+            })
         except Exception:
             continue
+    errors = []
+    try:
+        # Ca inainte de batch: un meci care esueaza se sare, nu strica tot request-ul
+        predictions = predict_matches(batch, errors)
+    except Exception as e:
+        logger.warning("[predict_batch] %s", e)
+        raise HTTPException(status_code=500, detail="Eroare interna")
+    if errors:
+        logger.warning("[predict_batch] %d meciuri sarite: %s", len(errors), errors[:3])
+    results = [r for r in predictions if r is not None and r["confidence"] >= req.min_confidence]
     results.sort(key=lambda x: x["confidence"], reverse=True)
     return {"count": len(results), "min_confidence": req.min_confidence, "predictions": results}
 
@@ -817,7 +903,7 @@ def predict_batch(req: BatchRequest):
 # ─────────────────────────────────────────────
 @app.get("/api/debug")
 def debug_status():
-    import os, requests as req
+    import os
     fd_key   = os.getenv("FOOTBALL_DATA_KEY", "")
     odds_key = os.getenv("ODDS_API_KEY", "")
 
@@ -831,9 +917,12 @@ def debug_status():
     if fd_key:
         try:
             import datetime
+            import rate_limiter
             today = datetime.date.today().isoformat()
-            r = req.get(
+            r = rate_limiter.get(
+                "football-data",
                 "https://api.football-data.org/v4/matches",
+                priority=rate_limiter.PRIORITY_DEBUG,
                 headers={"X-Auth-Token": fd_key},
                 params={"dateFrom": today, "dateTo": today},
                 timeout=10,
@@ -879,13 +968,15 @@ def debug_odds(request: Request, admin_secret: Optional[str] = Header(None, alia
     """Test direct Odds API — arata ce cote returneaza pentru La Liga azi."""
     if not (admin_secret and ADMIN_SECRET and admin_secret == ADMIN_SECRET):
         raise HTTPException(403, "Unauthorized")
-    import requests as req
+    import rate_limiter
     odds_key = os.getenv("ODDS_API_KEY", "")
     if not odds_key:
         return {"error": "ODDS_API_KEY not set"}
     try:
-        r = req.get(
+        r = rate_limiter.get(
+            "the-odds-api",
             "https://api.the-odds-api.com/v4/sports/soccer_spain_la_liga/odds/",
+            priority=rate_limiter.PRIORITY_DEBUG,
             params={"apiKey": odds_key, "regions": "eu", "markets": "h2h", "oddsFormat": "decimal"},
             timeout=10,
         )
@@ -944,29 +1035,48 @@ def admin_bet_signals_results(request: Request, admin_secret: Optional[str] = He
 
 @app.get("/api/admin/bet-signals")
 @limiter.limit("10/minute")
-def admin_bet_signals_list(request: Request, limit: int = 50, admin_secret: Optional[str] = Header(None, alias="X-Admin-Secret")):
-    """Returneaza ultimele semnale BET din Supabase."""
+def admin_bet_signals_list(
+    request: Request,
+    limit: Optional[int] = None,
+    stream: Optional[str] = Query(None, pattern="^(ndjson|json)$"),
+    cursor: Optional[str] = Query(None),
+    admin_secret: Optional[str] = Header(None, alias="X-Admin-Secret"),
+):
+    """Returneaza ultimele semnale BET din Supabase (?stream=ndjson|json: paginat keyset, sumar la final)."""
     if not (admin_secret and ADMIN_SECRET and admin_secret == ADMIN_SECRET):
         raise HTTPException(403, "Unauthorized")
     client = get_client()
     if not client:
         raise HTTPException(503, "Supabase indisponibil")
+
+    def summarize(rows):
+        s = {"W": 0, "L": 0, "P": 0, "profit_loss": 0.0}
+        for r in rows:
+            s[r.get("result") if r.get("result") in ("W", "L") else "P"] += 1
+            s["profit_loss"] += r.get("profit_loss") or 0
+            yield r
+        s["profit_loss"] = round(s["profit_loss"], 4)
+        summary.update(s)
+
+    summary = {}
+    if stream:
+        import streaming
+        pager = streaming.KeysetPager(lambda: client.table("bet_signals").select("*"),
+                                      ("created_at", "id"), cursor=cursor, limit=limit)
+        return streaming.response(summarize(pager), pager, stream, field="signals",
+                                  extra=lambda: {"summary": summary})
     try:
         resp = (
             client.table("bet_signals")
             .select("*")
             .order("created_at", desc=True)
-            .limit(limit)
+            .limit(limit or 50)
             .execute()
         )
-        rows = resp.data or []
-        total_w = sum(1 for r in rows if r.get("result") == "W")
-        total_l = sum(1 for r in rows if r.get("result") == "L")
-        total_p = sum(1 for r in rows if r.get("result") == "P" or r.get("result") is None)
-        profit  = sum(r.get("profit_loss") or 0 for r in rows)
+        rows = list(summarize(resp.data or []))
         return {
             "count": len(rows),
-            "summary": {"W": total_w, "L": total_l, "P": total_p, "profit_loss": round(profit, 4)},
+            "summary": summary,
             "signals": rows,
         }
     except Exception as e:
@@ -977,29 +1087,12 @@ def admin_bet_signals_list(request: Request, limit: int = 50, admin_secret: Opti
 @app.get("/api/bet-signals/stats")
 def bet_signals_stats():
     """Statistici publice bet_signals: win rate, ROI, ultimele 10 semnale finalizate."""
+    import track_stats
     client = get_client()
     if not client:
         return {"total": 0, "wins": 0, "losses": 0, "win_rate": 0, "roi_total": 0, "avg_odds": 0, "recent": []}
     try:
-        resp = client.table("bet_signals").select("*").order("match_date", desc=True).execute()
-        rows = resp.data or []
-        completed = [r for r in rows if r.get("result") in ("W", "L")]
-        wins = sum(1 for r in completed if r.get("result") == "W")
-        losses = len(completed) - wins
-        roi = round(sum(r.get("profit_loss") or 0 for r in completed), 2)
-        odds_vals = [r["odds_at_signal"] for r in completed if r.get("odds_at_signal")]
-        avg_odds = round(sum(odds_vals) / len(odds_vals), 2) if odds_vals else 0
-        win_rate = round(wins / len(completed) * 100, 1) if completed else 0
-        recent = completed[:10]
-        return {
-            "total": len(completed),
-            "wins": wins,
-            "losses": losses,
-            "win_rate": win_rate,
-            "roi_total": roi,
-            "avg_odds": avg_odds,
-            "recent": recent,
-        }
+        return track_stats.cached("signals", track_stats.signals_stats, client)
     except Exception as e:
         logger.error("[bet-signals/stats] %s", e)
         raise HTTPException(500, "Eroare interna")
@@ -1010,192 +1103,93 @@ def bet_signals_stats():
 # ─────────────────────────────────────────────
 @app.get("/api/track-record")
 def track_record():
-    """Statistici acuratete live din pick_results (auto-marcate zilnic la 23:30)."""
+    """Statistici acuratete live din agregatele track_stats (actualizate la marcarea rezultatelor)."""
+    import track_stats
     client = get_client()
     if client is None:
         return {"total": 0, "tracking_since": "Aprilie 2026"}
     try:
-        # Citeste toate pick_results marcate WIN/LOSS
-        pr_rows = client.table("pick_results").select("*").execute()
-        pr_data = pr_rows.data or []
-        resolved = [r for r in pr_data if r.get("result") in ("win", "loss")]
-
-        def acc(lst):
-            wins = sum(1 for r in lst if r["result"] == "win")
-            return round(wins / len(lst) * 100, 1) if lst else 0
-
-        def group(lst, min_c, max_c=None):
-            if max_c is None:
-                return [r for r in lst if (r.get("confidence") or 0) >= min_c]
-            return [r for r in lst if min_c <= (r.get("confidence") or 0) < max_c]
-
-        # Confidence breakdown (confidence stocat ca fractie 0-1 in DB)
-        above_70  = group(resolved, 0.70)
-        above_65  = group(resolved, 0.65)
-        above_60  = group(resolved, 0.60)
-        med_band  = group(resolved, 0.55, 0.65)
-
-        # Tracking since = primul pick_date din pick_results
-        since = "Aprilie 2026"
-        days  = 0
-        if resolved:
-            dates = [r["pick_date"] for r in resolved if r.get("pick_date")]
-            if dates:
-                since = min(dates)
-                try:
-                    days = (datetime.date.today() - datetime.date.fromisoformat(since)).days
-                except Exception:
-                    pass
-
-        # Per-liga breakdown din pick_results (home/away → liga nu e stocata direct,
-        # dar o putem aproxima din daily_picks JSONB)
-        league_stats = _compute_league_stats(client, resolved)
-
-        wins_total = sum(1 for r in resolved if r["result"] == "win")
-        final_equity = round(wins_total - (len(resolved) - wins_total), 2)
-
-        return {
-            "total":               len(resolved),
-            "high_conf_total":     len(above_65),
-            "high_conf_wins":      sum(1 for r in above_65 if r["result"] == "win"),
-            "high_conf_accuracy":  acc(above_65),
-            "med_conf_total":      len(med_band),
-            "med_conf_wins":       sum(1 for r in med_band if r["result"] == "win"),
-            "med_conf_accuracy":   acc(med_band),
-            "tracking_since":      since,
-            "days_tracked":        days,
-            "final_equity":        final_equity,
-            # Breakdown detaliat pe praguri — înlocuiește valorile hardcodate din frontend
-            "confidence_breakdown": [
-                {
-                    "label":    "Confidence >70%",
-                    "total":    len(above_70),
-                    "wins":     sum(1 for r in above_70 if r["result"] == "win"),
-                    "accuracy": acc(above_70),
-                },
-                {
-                    "label":    "Confidence ≥65%",
-                    "total":    len(above_65),
-                    "wins":     sum(1 for r in above_65 if r["result"] == "win"),
-                    "accuracy": acc(above_65),
-                },
-                {
-                    "label":    "Confidence ≥60%",
-                    "total":    len(above_60),
-                    "wins":     sum(1 for r in above_60 if r["result"] == "win"),
-                    "accuracy": acc(above_60),
-                },
-                {
-                    "label":    "Toate predicțiile",
-                    "label_en": "All predictions",
-                    "total":    len(resolved),
-                    "wins":     sum(1 for r in resolved if r["result"] == "win"),
-                    "accuracy": acc(resolved),
-                },
-            ],
-            "league_stats": league_stats,
-        }
+        return track_stats.cached("main", track_stats.track_record, client)
     except Exception as e:
         logger.error("[track-record] %s", e)
         return {"total": 0, "tracking_since": "Aprilie 2026", "error": str(e)}
 
 
-def _compute_league_stats(client, resolved: list) -> list:
-    """
-    Calculeaza acuratete per liga din daily_picks JSONB.
-    Incruciseaza pick_results cu informatia de liga din daily_picks.
-    """
+@app.get("/api/track-record/leagues")
+def track_record_leagues(since: Optional[str] = Query(None), min_conf: float = Query(0.0, ge=0, le=1)):
+    """Acuratete per liga, grupata in DB pe coloana pick_results.league (filtre: data minima, confidence)."""
+    import track_stats
+    client = get_client()
+    if client is None:
+        return {"leagues": []}
     try:
-        # Incarca daily_picks pentru datele din pick_results
-        dates = list({r["pick_date"] for r in resolved if r.get("pick_date")})
-        if not dates:
-            return []
-
-        # Build index: (date, home_lower, away_lower) -> result
-        result_index = {
-            (r["pick_date"], r["home"].lower(), r["away"].lower()): r["result"]
-            for r in resolved
-        }
-        conf_index = {
-            (r["pick_date"], r["home"].lower(), r["away"].lower()): r.get("confidence", 0.6)
-            for r in resolved
-        }
+        return {"leagues": track_stats.league_breakdown(client, since, min_conf)}
+    except Exception as e:
+        logger.error("[track-record/leagues] %s", e)
+        return {"leagues": [], "error": str(e)}
 
-        league_map: dict = {}  # league_name -> {total, wins, total65, wins65}
-
-        for date in dates:
-            rows = client.table("daily_picks").select("picks").eq("pick_date", date).execute()
-            if not rows.data:
-                continue
-            import json as _json
-            picks_raw = rows.data[0].get("picks", "[]")
-            picks = _json.loads(picks_raw) if isinstance(picks_raw, str) else picks_raw
-            for p in picks:
-                key = (date, p["home"].lower(), p["away"].lower())
-                if key not in result_index:
-                    continue
-                league = p.get("league", "Unknown")
-                conf   = conf_index.get(key, 0.6)
-                res    = result_index[key]
-                if league not in league_map:
-                    league_map[league] = {"total": 0, "wins": 0, "total65": 0, "wins65": 0}
-                league_map[league]["total"] += 1
-                if res == "win":
-                    league_map[league]["wins"] += 1
-                if conf >= 0.65:
-                    league_map[league]["total65"] += 1
-                    if res == "win":
-                        league_map[league]["wins65"] += 1
 
-        result = []
-        for league, s in league_map.items():
-            if s["total"] < 3:  # ignora ligile cu prea putine date
-                continue
-            acc_all = round(s["wins"] / s["total"] * 100, 1) if s["total"] else 0
-            acc65   = round(s["wins65"] / s["total65"] * 100, 1) if s["total65"] else 0
-            result.append({
-                "league":   league,
-                "total":    s["total"],
-                "total65":  s["total65"],
-                "accuracy": acc_all,
-                "acc65":    acc65,
-            })
-        result.sort(key=lambda x: x["acc65"], reverse=True)
-        return result
-    except Exception as e:
-        logger.warning("[track-record] league_stats failed: %s", e)
-        return []
+def _history_item(r: dict, equity: float) -> dict:
+    return {
+        "date":         r["pick_date"],
+        "home":         r["home"],
+        "away":         r["away"],
+        "league":       r.get("league") or "",
+        "result":       r["result"],
+        "prediction":   r.get("prediction", ""),
+        "confidence":   round(r.get("confidence", 0.6) * 100, 1),
+        "actual_score": r.get("actual_score", ""),
+        "equity":       round(equity, 2),
+        "created_at":   r.get("created_at", ""),
+    }
+
+
+def _equity_step(r: dict) -> float:
+    return 1.0 if r["result"] == "win" else (-1.0 if r["result"] == "loss" else 0.0)
 
 
 @app.get("/api/track-record/history")
-def track_record_history(limit: int = Query(100, le=500)):
-    """Returneaza istoricul individual al pick-urilor marcate WIN/LOSS/VOID."""
+def track_record_history(
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    league: Optional[str] = Query(None),
+    stream: Optional[str] = Query(None, pattern="^(ndjson|json)$"),
+    cursor: Optional[str] = Query(None),
+):
+    """
+    Returneaza istoricul individual al pick-urilor marcate WIN/LOSS/VOID (optional filtrat pe liga).
+    ?stream=ndjson|json: tot istoricul in ordine cronologica, paginat keyset pe (pick_date, id),
+    cu equity cumulat pe parcurs si cursor pentru continuare (limit = maxim randuri per raspuns).
+    """
     client = get_client()
     if client is None:
         return {"results": []}
+
+    def query():
+        q = client.table("pick_results").select("*")
+        return q.eq("league", league) if league else q
+
+    if stream:
+        import streaming
+        pager = streaming.KeysetPager(query, ("pick_date", "id"), desc=False, cursor=cursor, limit=limit)
+
+        def rows():
+            equity = float(pager.carry or 0)
+            for r in pager:
+                equity += _equity_step(r)
+                pager.carry = round(equity, 2)
+                yield _history_item(r, equity)
+
+        return streaming.response(rows(), pager, stream, extra=lambda: {"final_equity": pager.carry or 0})
+
     try:
-        rows = client.table("pick_results").select("*").order("pick_date", desc=True).limit(limit).execute()
-        data = rows.data or []
+        data = query().order("pick_date", desc=True).limit(limit or 100).execute().data or []
 
         # Calculeaza equity curve (stake fix 1 unitate, odds medii 2.0)
         results = []
         running_units = 0.0
         for r in reversed(data):  # cronologic pentru equity
-            if r["result"] == "win":
-                running_units += 1.0
-            elif r["result"] == "loss":
-                running_units -= 1.0
-            results.append({
-                "date":         r["pick_date"],
-                "home":         r["home"],
-                "away":         r["away"],
-                "result":       r["result"],
-                "prediction":   r.get("prediction", ""),
-                "confidence":   round(r.get("confidence", 0.6) * 100, 1),
-                "actual_score": r.get("actual_score", ""),
-                "equity":       round(running_units, 2),
-                "created_at":   r.get("created_at", ""),
-            })
+            running_units += _equity_step(r)
+            results.append(_history_item(r, running_units))
 
         results.reverse()  # cel mai recent primul
 
@@ -1222,31 +1216,12 @@ def track_record_history(limit: int = Query(100, le=500)):
 @app.get("/api/track-record/vip")
 def track_record_vip():
     """Stats VIP picks (confidence >= 75%) — afisate pe pagina Pro."""
-    import datetime as _dt
+    import track_stats
     client = get_client()
     if client is None:
         return {"total": 0, "wins": 0, "accuracy": 0, "this_month_total": 0, "this_month_wins": 0, "this_month_accuracy": 0}
     try:
-        now = _dt.date.today()
-        month_start = now.replace(day=1).isoformat()
-
-        rows = client.table("pick_results").select("confidence, result, pick_date").execute()
-        data = rows.data or []
-
-        vip_all = [r for r in data if r.get("result") in ("win", "loss") and (r.get("confidence") or 0) >= 0.75]
-        this_month = [r for r in vip_all if (r.get("pick_date") or "") >= month_start]
-
-        wins_all = sum(1 for r in vip_all if r["result"] == "win")
-        wins_month = sum(1 for r in this_month if r["result"] == "win")
-
-        return {
-            "total":                len(vip_all),
-            "wins":                 wins_all,
-            "accuracy":             round(wins_all / len(vip_all) * 100, 1) if vip_all else 0,
-            "this_month_total":     len(this_month),
-            "this_month_wins":      wins_month,
-            "this_month_accuracy":  round(wins_month / len(this_month) * 100, 1) if this_month else 0,
-        }
+        return track_stats.cached("vip", track_stats.vip, client)
     except Exception as e:
         return {"total": 0, "wins": 0, "accuracy": 0, "this_month_total": 0, "this_month_wins": 0, "this_month_accuracy": 0, "error": str(e)}
 
@@ -1287,6 +1262,8 @@ def admin_set_tier(
 @app.get("/api/admin/users")
 def admin_list_users(
     search: Optional[str] = Query(None),
+    stream: Optional[str] = Query(None, pattern="^(ndjson|json)$"),
+    cursor: Optional[str] = Query(None),
     x_admin_key: Optional[str] = Header(None, alias="X-Admin-Key"),
     current_user: Optional[dict] = Depends(get_current_user),
 ):
@@ -1297,6 +1274,12 @@ def admin_list_users(
         client = get_client()
         if not client:
             raise HTTPException(503, "DB indisponibil")
+        if stream:
+            # Toti userii, paginat keyset pe id (fara plafonul de 200)
+            import streaming
+            pager = streaming.KeysetPager(lambda: client.table("users").select("id,email,tier,tier_expires,role"),
+                                          ("id",), cursor=cursor)
+            return streaming.response(pager, pager, stream, field="users")
         rows = client.table("users").select("id,email,tier,tier_expires,role").order("id", desc=True).limit(200).execute()
         return rows.data
     except HTTPException:
@@ -1331,14 +1314,18 @@ def admin_set_pick_result(
     if client is None:
         raise HTTPException(503, "DB indisponibil")
     try:
-        client.table("pick_results").upsert({
+        import track_stats
+        extra = track_stats.pick_fields(client, req.pick_date, req.home, req.away)
+        track_stats.upsert_results(client, [{
             "pick_date":    req.pick_date,
             "home":         req.home,
             "away":         req.away,
             "result":       req.result,
             "confidence":   req.confidence,
             "actual_score": req.actual_score,
-        }, on_conflict="pick_date,home,away").execute()
+            **extra,
+        }])
+        track_stats.mark(req.pick_date, req.home, req.away, req.result, req.confidence, extra.get("league"))
         return {"ok": True, "saved": f"{req.home} vs {req.away} ({req.pick_date}) = {req.result}"}
     except Exception as e:
         logger.error("[admin/picks/result] %s", e)
@@ -1381,9 +1368,11 @@ def admin_clear_odds_cache(x_admin_secret: Optional[str] = Header(None, alias="X
     today = _dt.date.today().isoformat()
     import cache as redis_cache
     redis_cache.delete("odds_daily", today)
-    redis_cache.delete("daily", f"{today}:0.5")
-    redis_cache.delete("daily", f"{today}:0.45")
+    redis_cache.delete("daily", today)
     redis_cache.delete("odds_quota_exhausted", today)
+    # Pull-urile partajate din odds_planner — recompute-ul descarca cote noi
+    from fixtures import ODDS_SPORT_MAP
+    redis_cache.delete_many("odds_events", list(ODDS_SPORT_MAP))
     # Sterge si din Supabase ca sa forteze recompute
     client = get_client()
     if client:
@@ -1425,24 +1414,15 @@ def admin_backfill_results(
     date_to: Optional[str] = Query(None),
     user: dict = Depends(require_admin),
 ):
-    """Backfill WIN/LOSS pentru un interval de date. Ruleaza in background."""
-    import datetime as _dt, time as _time
-
-    def _run():
-        end = date_to or date_from
-        current = _dt.date.fromisoformat(date_from)
-        stop    = _dt.date.fromisoformat(end)
-        while current <= stop:
-            try:
-                auto_mark_results(current.isoformat())
-            except Exception as e:
-                logger.warning("[backfill] Eroare la %s: %s", current, e)
-            current += _dt.timedelta(days=1)
-            _time.sleep(2)
-
-    background_tasks.add_task(_run)
-    import datetime as _dt2
-    days = (_dt2.date.fromisoformat(date_to or date_from) - _dt2.date.fromisoformat(date_from)).days + 1
+    """Backfill WIN/LOSS pentru un interval de date (zile procesate concurent). Ruleaza in background."""
+    import datetime as _dt
+    from ingestion import backfill_results
+
+    try:
+        days = (_dt.date.fromisoformat(date_to or date_from) - _dt.date.fromisoformat(date_from)).days + 1
+    except ValueError:
+        raise HTTPException(400, "Data invalida (YYYY-MM-DD)")
+    background_tasks.add_task(backfill_results, date_from, date_to)
     return {"started": True, "date_from": date_from, "date_to": date_to or date_from, "days": days}
 
 
@@ -1451,19 +1431,27 @@ def admin_backfill_results(
 def admin_get_pick_results(
     request: Request,
     date: Optional[str] = None,
+    stream: Optional[str] = Query(None, pattern="^(ndjson|json)$"),
+    cursor: Optional[str] = Query(None),
     x_admin_key: Optional[str] = Header(None, alias="X-Admin-Key"),
 ):
-    """Lista rezultatele salvate. Necesita X-Admin-Key header."""
+    """Lista rezultatele salvate (?stream=ndjson|json: paginat keyset). Necesita X-Admin-Key header."""
     if not ADMIN_SECRET or x_admin_key != ADMIN_SECRET:
         raise HTTPException(403, "Unauthorized")
     client = get_client()
     if client is None:
         raise HTTPException(503, "DB indisponibil")
+
+    def query():
+        q = client.table("pick_results").select("*")
+        return q.eq("pick_date", date) if date else q
+
+    if stream:
+        import streaming
+        pager = streaming.KeysetPager(query, ("pick_date", "id"), cursor=cursor)
+        return streaming.response(pager, pager, stream)
     try:
-        q = client.table("pick_results").select("*").order("pick_date", desc=True)
-        if date:
-            q = q.eq("pick_date", date)
-        rows = q.execute()
+        rows = query().order("pick_date", desc=True).execute()
         return {"results": rows.data or []}
     except Exception as e:
         logger.error("[admin/picks/results] %s", e)
@@ -1726,6 +1714,21 @@ def admin_refresh_picks(
 
 
 
+@app.post("/api/admin/model/reload")
+def admin_model_reload(
+    x_admin_key: Optional[str] = Header(None, alias="X-Admin-Key"),
+    force: bool = False,
+):
+    """
+    Hot-reload model fara restart: incarca artefactul nou, smoke test, swap atomic.
+    Ajunge la un singur worker uvicorn — ceilalti il preiau prin watcher.
+    """
+    if not ADMIN_SECRET or x_admin_key != ADMIN_SECRET:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    from predictor import reload_model
+    return reload_model(force=force)
+
+
 # ─────────────────────────────────────────────
 # ECHIPE CUNOSCUTE
 # ─────────────────────────────────────────────
@@ -0,0 +1,307 @@
+"""
+Artefact de model split, versionat, incarcabil cu mmap.
+
+model.pkl tine totul intr-un blob pickle (model + team_stats + elo + h2h ca dict-uri
+Python), deci fiecare proces (2 workeri uvicorn + worker APScheduler) are copia lui.
+Formatul split (director <model>.v1/ langa .pkl):
+
+  manifest.json        versiune format, features, feature_means, clase, chei team_stats
+  booster.ubj          XGBoost in format nativ (UBJ)
+  calibrators.npz      tabelele (x, y) ale calibratorilor isotonici
+  teams.npy            nume echipe                       ┐
+  team_stats.npy       [echipe x chei] float64, NaN=lipsa ┘ np.load(mmap_mode="r")
+  elo_keys.npy / elo_values.npy                "liga|echipa" sortat -> Elo
+  h2h_keys.npy         "echipaA|echipaB" sortat (cautare binara)
+  h2h_offsets.npy      intervalul de meciuri pentru fiecare pereche
+  h2h_home_first.npy / h2h_ftr.npy / h2h_hg.npy / h2h_ag.npy
+
+Tabelele mari se citesc cu mmap — paginile sunt partajate intre procese prin page cache.
+Loader-ul prefera formatul split si cade pe pickle daca lipseste sau e incompatibil.
+"""
+import os
+import json
+import shutil
+import pickle
+import datetime
+from collections.abc import Mapping
+
+import numpy as np
+
+from calibrator import CalibratedXGB, IsotonicTable
+
+FORMAT_VERSION = 1
+
+
+def split_dir(pkl_path: str) -> str:
+    """model.pkl -> model.v1/ (versiunea formatului e in numele directorului)."""
+    return f"{os.path.splitext(pkl_path)[0]}.v{FORMAT_VERSION}"
+
+
+# ─── View-uri read-only peste tabelele mmap ─────────────────────────────────
+
+class TeamStatsTable(Mapping):
+    """team_stats ca tabel columnar: table[echipa] -> dict (doar valorile prezente)."""
+
+    def __init__(self, teams, values, keys: list, int_keys: list):
+        self._row      = {t: i for i, t in enumerate(teams.tolist())}
+        self._values   = values
+        self._keys     = keys
+        self._int_keys = set(int_keys)
+
+    def __getitem__(self, team) -> dict:
+        row = self._values[self._row[team]]
+        out = {}
+        for k, v in zip(self._keys, row.tolist()):
+            if v != v:      # NaN = cheie lipsa / None in pickle
+                continue
+            out[k] = int(v) if k in self._int_keys else v
+        return out
+
+    def __contains__(self, team) -> bool:
+        return team in self._row
+
+    def __iter__(self):
+        return iter(self._row)
+
+    @property
+    def columns(self) -> list:
+        """Ordinea coloanelor din row()."""
+        return self._keys
+
+    def row(self, team):
+        """Randul brut al echipei (view peste mmap, NaN = lipsa); KeyError daca nu exista."""
+        return self._values[self._row[team]]
+
+    def __len__(self) -> int:
+        return len(self._row)
+
+
+class EloTable(Mapping):
+    """elo_ratings peste tabelele mmap: chei "liga|echipa" sortate, cautare binara."""
+
+    def __init__(self, keys, values):
+        self._keys   = keys
+        self._values = values
+
+    def __getitem__(self, key) -> float:
+        i = int(np.searchsorted(self._keys, key))
+        if i >= len(self._keys) or self._keys[i] != key:
+            raise KeyError(key)
+        return float(self._values[i])
+
+    def __iter__(self):
+        return iter(self._keys.tolist())
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def items(self):
+        return zip(self._keys.tolist(), self._values.tolist())
+
+
+class H2HTable(Mapping):
+    """h2h_history ca tabel columnar: table[(a, b)] -> lista de meciuri (a < b)."""
+
+    def __init__(self, keys, offsets, home_first, ftr, hg, ag):
+        self._keys       = keys
+        self._offsets    = offsets
+        self._home_first = home_first
+        self._ftr        = ftr
+        self._hg         = hg
+        self._ag         = ag
+
+    def __getitem__(self, key) -> list:
+        k = f"{key[0]}|{key[1]}"
+        i = int(np.searchsorted(self._keys, k))
+        if i >= len(self._keys) or self._keys[i] != k:
+            raise KeyError(key)
+        lo, hi = int(self._offsets[i]), int(self._offsets[i + 1])
+        out = []
+        for j in range(lo, hi):
+            home, away = (key[0], key[1]) if self._home_first[j] else (key[1], key[0])
+            out.append({"home": home, "away": away, "ftr": str(self._ftr[j]),
+                        "hg": float(self._hg[j]), "ag": float(self._ag[j])})
+        return out
+
+    def __iter__(self):
+        for k in self._keys.tolist():
+            yield tuple(k.split("|", 1))
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+
+# ─── Scriere ────────────────────────────────────────────────────────────────
+
+def save_split(pkl_path: str, data: dict):
+    """
+    Scrie artefactul split pentru acelasi dict salvat in pkl_path.
+    Scrie intr-un director temporar si il muta la final — un loader nu vede niciodata
+    un artefact partial.
+    """
+    target = split_dir(pkl_path)
+    tmp    = f"{target}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    model = data["model"]
+    if isinstance(model, CalibratedXGB):
+        booster, kind = model.model, "calibrated_xgb"
+        tables = [c if isinstance(c, IsotonicTable) else IsotonicTable.from_isotonic(c)
+                  for c in model.calibrators]
+        np.savez(os.path.join(tmp, "calibrators.npz"),
+                 **{f"x{i}": t.x for i, t in enumerate(tables)},
+                 **{f"y{i}": t.y for i, t in enumerate(tables)})
+    else:
+        booster, kind = model, "xgb"
+    booster.save_model(os.path.join(tmp, "booster.ubj"))
+
+    # team_stats — coloanele = reuniunea cheilor; valorile int se refac la citire
+    team_stats = data.get("team_stats", {})
+    teams = sorted(team_stats)
+    team_keys = sorted({k for s in team_stats.values() for k in s})
+    int_keys = [k for k in team_keys
+                if all(isinstance(s.get(k), (int, np.integer)) for s in team_stats.values() if k in s)]
+    values = np.full((len(teams), len(team_keys)), np.nan, dtype=np.float64)
+    for i, t in enumerate(teams):
+        s = team_stats[t]
+        for j, k in enumerate(team_keys):
+            v = s.get(k)
+            if v is not None:
+                values[i, j] = v
+    np.save(os.path.join(tmp, "teams.npy"), np.array(teams, dtype=str))
+    np.save(os.path.join(tmp, "team_stats.npy"), values)
+
+    # elo — chei sortate (cautare binara in EloTable)
+    elo = data.get("elo_ratings", {})
+    elo_keys = sorted(elo)
+    np.save(os.path.join(tmp, "elo_keys.npy"), np.array(elo_keys, dtype=str))
+    np.save(os.path.join(tmp, "elo_values.npy"), np.array([elo[k] for k in elo_keys], dtype=np.float64))
+
+    # h2h — perechi sortate + meciurile concatenate (CSR)
+    h2h = data.get("h2h_history", {})
+    pairs = sorted(h2h, key=lambda p: f"{p[0]}|{p[1]}")
+    offsets = np.zeros(len(pairs) + 1, dtype=np.int64)
+    home_first, ftr, hg, ag = [], [], [], []
+    for i, p in enumerate(pairs):
+        recs = h2h[p]
+        offsets[i + 1] = offsets[i] + len(recs)
+        for r in recs:
+            home_first.append(r["home"] == p[0])
+            ftr.append(r["ftr"])
+            hg.append(r["hg"])
+            ag.append(r["ag"])
+    np.save(os.path.join(tmp, "h2h_keys.npy"), np.array([f"{a}|{b}" for a, b in pairs], dtype=str))
+    np.save(os.path.join(tmp, "h2h_offsets.npy"), offsets)
+    np.save(os.path.join(tmp, "h2h_home_first.npy"), np.array(home_first, dtype=bool))
+    np.save(os.path.join(tmp, "h2h_ftr.npy"), np.array(ftr, dtype="U1"))
+    np.save(os.path.join(tmp, "h2h_hg.npy"), np.array(hg, dtype=np.float64))
+    np.save(os.path.join(tmp, "h2h_ag.npy"), np.array(ag, dtype=np.float64))
+
+    le = data.get("label_encoder")
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "created_at":     datetime.datetime.utcnow().isoformat(),
+        "model_kind":     kind,
+        "features":       list(data["features"]),
+        "feature_means":  {k: float(v) for k, v in data.get("feature_means", {}).items()},
+        "classes":        [str(c) for c in le.classes_] if le is not None else None,
+        "team_keys":      team_keys,
+        "int_keys":       int_keys,
+    }
+    with open(os.path.join(tmp, "manifest.json"), "w") as f:
+        json.dump(manifest, f)
+
+    old = f"{target}.old-{os.getpid()}"
+    if os.path.exists(target):
+        os.rename(target, old)
+    os.rename(tmp, target)
+    shutil.rmtree(old, ignore_errors=True)
+    print(f"[model_store] Artefact split salvat: {target}")
+
+
+def save(pkl_path: str, data: dict):
+    """
+    Publica un model: artefactul split, apoi pickle-ul (atomic).
+    Split-ul e preferat de load(), deci se scrie primul; daca esueaza, directorul
+    vechi se sterge — altfel load() ar servi in continuare modelul anterior.
+    """
+    try:
+        save_split(pkl_path, data)
+    except Exception as e:
+        print(f"[model_store] Artefact split esuat ({e}) — sterg {split_dir(pkl_path)}, raman pe pickle")
+        shutil.rmtree(split_dir(pkl_path), ignore_errors=True)
+    # Scriere atomica — watcher-ul de hot-reload din API nu vede un pickle partial
+    with open(pkl_path + ".tmp", "wb") as f:
+        pickle.dump(data, f)
+    os.replace(pkl_path + ".tmp", pkl_path)
+
+
+# ─── Citire ─────────────────────────────────────────────────────────────────
+
+def _load_split(path: str) -> dict:
+    from xgboost import XGBClassifier
+    from sklearn.preprocessing import LabelEncoder
+
+    with open(os.path.join(path, "manifest.json")) as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"format_version {manifest.get('format_version')} != {FORMAT_VERSION}")
+
+    def npy(name):
+        return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+    booster = XGBClassifier()
+    booster.load_model(os.path.join(path, "booster.ubj"))
+    if manifest["model_kind"] == "calibrated_xgb":
+        with np.load(os.path.join(path, "calibrators.npz")) as z:
+            n_classes = len(z.files) // 2
+            calibrators = [IsotonicTable(z[f"x{i}"], z[f"y{i}"]) for i in range(n_classes)]
+        model = CalibratedXGB(booster, calibrators, n_classes)
+    else:
+        model = booster
+
+    le = None
+    if manifest.get("classes") is not None:
+        le = LabelEncoder()
+        le.classes_ = np.array(manifest["classes"])
+
+    return {
+        "model":         model,
+        "features":      manifest["features"],
+        "team_stats":    TeamStatsTable(npy("teams"), npy("team_stats"),
+                                        manifest["team_keys"], manifest["int_keys"]),
+        "label_encoder": le,
+        "elo_ratings":   EloTable(npy("elo_keys"), npy("elo_values")),
+        "feature_means": manifest["feature_means"],
+        "h2h_history":   H2HTable(npy("h2h_keys"), npy("h2h_offsets"), npy("h2h_home_first"),
+                                  npy("h2h_ftr"), npy("h2h_hg"), npy("h2h_ag")),
+    }
+
+
+def load(pkl_path: str) -> dict:
+    """
+    Incarca modelul: artefactul split daca exista si e compatibil, altfel pickle-ul.
+    Returneaza acelasi dict ca pickle-ul scris de train.py.
+    """
+    path = split_dir(pkl_path)
+    if os.path.isdir(path):
+        try:
+            data = _load_split(path)
+            print(f"[model_store] Incarcat artefact split: {path}")
+            return data
+        except Exception as e:
+            print(f"[model_store] Artefact split invalid ({e}) — fallback la pickle")
+    if not os.path.exists(pkl_path):
+        raise FileNotFoundError(pkl_path)
+    with open(pkl_path, "rb") as f:
+        return pickle.load(f)
+
+
+if __name__ == "__main__":
+    # Conversie pentru modele antrenate inainte de formatul split:
+    #   python model_store.py model.pkl [model_no_odds.pkl ...]
+    import sys
+    for p in sys.argv[1:]:
+        with open(p, "rb") as f:
+            save_split(p, pickle.load(f))
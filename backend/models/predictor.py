@@ -82,9 +82,18 @@ class EloEngine:
         }
 
     def bulk_update_from_history(self, matches: list[dict]):
-        """Antrenează Elo pe istoricul meciurilor."""
-        for m in sorted(matches, key=lambda x: x.get('date', '')):
-            self.update(m['home'], m['away'], m['result'])
+        """Antrenează Elo pe istoricul meciurilor (kernel-ul comun din elo_engine)."""
+        import elo_engine
+        matches = sorted(matches, key=lambda x: x.get('date', ''))
+        if not matches:
+            return
+        h_ids, a_ids, teams = elo_engine.encode_teams([m['home'] for m in matches],
+                                                      [m['away'] for m in matches])
+        score = [{'1': 1.0, 'X': 0.5, '2': 0.0}.get(m['result'], 0.5) for m in matches]
+        init = [self.get_rating(t) for t in teams]
+        _, _, _, final = elo_engine.replay(h_ids, a_ids, score, len(teams), k=self.K_BASE,
+                                           home_adv=self.HOME_ADVANTAGE, init=init)
+        self.ratings.update(zip(teams, final.tolist()))
 
 
 def _estimate_draw_probability(ra: float, rb: float) -> float:
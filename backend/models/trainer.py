@@ -68,16 +68,22 @@ class EloTracker:
     def get(self, team):
         return self.ratings.get(team, 1500.0)
 
-    def expected(self, ra, rb):
-        return 1.0 / (1 + 10 ** ((rb - ra) / 400))
-
-    def update(self, home, away, result):
-        ra = self.get(home) + self.HOME_ADV
-        rb = self.get(away)
-        ea = self.expected(ra, rb)
-        sa, sb = {"H":(1,0),"D":(0.5,0.5),"A":(0,1)}.get(result,(0.5,0.5))
-        self.ratings[home] = self.get(home) + self.K*(sa-ea)
-        self.ratings[away] = self.get(away) + self.K*(sb-(1-ea))
+    def replay(self, matches):
+        """
+        Ruleaza Elo peste meciuri (in ordinea data) cu kernel-ul din elo_engine.
+        Returneaza ratingurile inainte de fiecare meci (home, away); self.ratings = finale.
+        """
+        import elo_engine
+        if not matches:
+            return [], []
+        h_ids, a_ids, teams = elo_engine.encode_teams([m["home"] for m in matches],
+                                                      [m["away"] for m in matches])
+        score = [{"H": 1.0, "D": 0.5, "A": 0.0}.get(m["result"], 0.5) for m in matches]
+        h_pre, a_pre, _, final = elo_engine.replay(h_ids, a_ids, score, len(teams), k=self.K,
+                                                   home_adv=self.HOME_ADV,
+                                                   init=[self.get(t) for t in teams])
+        self.ratings.update(zip(teams, final.tolist()))
+        return h_pre.tolist(), a_pre.tolist()
 
     def draw_prob(self, ra, rb):
         diff = abs(ra - rb)
@@ -91,17 +97,18 @@ class FeatureBuilder:
     def build(self, matches):
         matches = sorted(matches, key=lambda x: x["date"])
         elo = EloTracker()
+        h_pre, a_pre = elo.replay(matches)
         hist = {}
         h2h = {}
         rows = []
 
-        for m in matches:
+        for i, m in enumerate(matches):
             home, away = m["home"], m["away"]
             hg, ag = m["home_goals"], m["away_goals"]
 
-            # Elo
-            he = elo.get(home)
-            ae = elo.get(away)
+            # Elo (inainte de meci)
+            he = h_pre[i]
+            ae = a_pre[i]
             ed = (he + elo.HOME_ADV) - ae
             dp = elo.draw_prob(he + elo.HOME_ADV, ae)
 
@@ -175,7 +182,6 @@ class FeatureBuilder:
             })
 
             # Update
-            elo.update(home, away, m["result"])
             res_h = "W" if hg>ag else "D" if hg==ag else "L"
             res_a = "W" if ag>hg else "D" if hg==ag else "L"
             hist.setdefault(home,[]).append({"res":res_h,"gf":hg,"gc":ag})
@@ -317,8 +323,7 @@ async def run_training():
         model.save_model(MODEL_PATH)
         # Salvăm și ratingurile Elo finale din antrenament
         elo_tracker = EloTracker()
-        for m in matches:
-            elo_tracker.update(m["home"], m["away"], m["result"])
+        elo_tracker.replay(matches)
         # Top 200 echipe după rating
         top_elos = dict(sorted(elo_tracker.ratings.items(), key=lambda x: x[1], reverse=True)[:200])
         metrics["elo_ratings"] = top_elos
@@ -0,0 +1,209 @@
+"""
+Istoric de cote per meci — snapshot-uri din fiecare pull The-Odds-API.
+
+Pana acum se pastra doar cheia odds_daily (ultimul pull al zilei), iar la inferenta
+toate features de miscare a liniei (ps_move_*, *_steamed, clv_*, reverse_line_*)
+erau 0: nu aveam cota de deschidere. Acelasi eveniment apare insa in pull-urile
+din zilele dinaintea meciului (fixtures + bet_signal, fereastra 72h), deci quota
+consumata oricum ne da si deschiderea.
+
+Un log append-only per meci, cheia normalizata (data meciului, gazda, oaspete):
+  flopi:odds_log:<data>|<gazda>|<oaspete>   lista Redis, un rand per pull:
+                                            [ts, PSH, PSD, PSA, AvgH, ..., B365A]
+  - RPUSH intoarce lungimea, LINDEX 0 = deschiderea — ambele O(1), un singur
+    pipeline pentru tot pull-ul;
+  - randul identic cu precedentul (acelasi pull repetat) nu se mai adauga;
+  - fara Redis, acelasi log se tine in memoria procesului.
+
+record() (pull nou) si attach_open() (pull refolosit din cache-ul odds_planner)
+ataseaza fiecarui dict de cote `open` (prima cota vazuta + numarul de snapshot-uri);
+line_movement() calculeaza din el features de miscare cu aceleasi formule ca
+features.build_market_features (deschidere vs ultima cota in loc de PSH vs PSCH).
+"""
+import json
+import time
+import datetime
+import logging
+import threading
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+SNAP_COLS = ("PSH", "PSD", "PSA", "AvgH", "AvgD", "AvgA",
+             "MaxH", "MaxD", "MaxA", "B365H", "B365D", "B365A")
+LOG_TTL   = 10 * 86400
+MAX_SNAPS = 200
+LOCAL_TZ  = ZoneInfo("Europe/Bucharest")
+
+MOVEMENT_COLS = ["ps_move_h", "ps_move_a", "ps_move_d",
+                 "home_steamed", "away_steamed", "home_drifted", "away_drifted",
+                 "clv_h", "clv_a", "reverse_line_h", "reverse_line_a"]
+
+# Fallback in proces (fara Redis): cheie -> lista de randuri
+_local: dict = {}
+_last:  dict = {}     # cheie -> (ultimul rand scris de acest proces, deschiderea) — dedup
+_lock = threading.Lock()
+
+
+def match_date(commence_time: str) -> str:
+    """commence_time ISO (UTC) din The-Odds-API -> data locala a meciului (YYYY-MM-DD)."""
+    try:
+        dt = datetime.datetime.fromisoformat(commence_time.replace("Z", "+00:00"))
+        return dt.astimezone(LOCAL_TZ).date().isoformat()
+    except (AttributeError, ValueError):
+        return datetime.date.today().isoformat()
+
+
+def event_key(home: str, away: str, date: str) -> str:
+    return f"{date}|{home.lower()}|{away.lower()}"
+
+
+def _redis_key(key: str) -> str:
+    return f"flopi:odds_log:{key}"
+
+
+def _pack(odds: dict, ts: int) -> list:
+    return [ts] + [round(float(odds[c]), 3) if odds.get(c) else None for c in SNAP_COLS]
+
+
+def _unpack(row) -> dict | None:
+    if isinstance(row, str):
+        try:
+            row = json.loads(row)
+        except ValueError:
+            return None
+    if not isinstance(row, list) or len(row) != len(SNAP_COLS) + 1:
+        return None
+    out = {c: v for c, v in zip(SNAP_COLS, row[1:]) if v is not None}
+    out["ts"] = row[0]
+    return out
+
+
+def _prune_local(today: str):
+    for key in [k for k in _local if k[:10] < today]:
+        _local.pop(key, None)
+        _last.pop(key, None)
+
+
+def record(entries: list, ts: int = None) -> dict:
+    """
+    Adauga un snapshot pentru fiecare (home, away, date, odds) si ataseaza odds["open"].
+    Returneaza {event_key: open} pentru meciurile inregistrate.
+    """
+    import cache as redis_cache
+
+    ts = int(ts or time.time())
+    rows, keys = [], []
+    opens = {}
+    for home, away, date, odds in entries:
+        if not odds:
+            continue
+        key = event_key(home, away, date)
+        row = _pack(odds, ts)
+        prev = _last.get(key)
+        if prev and prev[0] == row[1:]:
+            odds["open"] = opens[key] = prev[1]
+            continue
+        rows.append(row)
+        keys.append((key, odds))
+    if not keys:
+        return opens
+
+    cmds = []
+    for (key, _), row in zip(keys, rows):
+        rk = _redis_key(key)
+        cmds += [["RPUSH", rk, json.dumps(row, separators=(",", ":"))],
+                 ["LINDEX", rk, 0],
+                 ["EXPIRE", rk, LOG_TTL]]
+    res = redis_cache._pipeline(cmds)
+
+    with _lock:
+        _prune_local(datetime.date.today().isoformat())
+        for i, ((key, odds), row) in enumerate(zip(keys, rows)):
+            n, first = res[3 * i], res[3 * i + 1]
+            if n is None:
+                # Fara Redis (sau eroare): logul din proces
+                log = _local.setdefault(key, [])
+                if len(log) < MAX_SNAPS:
+                    log.append(row)
+                n, first = len(log), log[0]
+            opening = _unpack(first) or _unpack(row)
+            opening["n"] = int(n)
+            odds["open"] = opens[key] = opening
+            _last[key] = (row[1:], opening)
+
+    logger.info("[odds_history] %d snapshot-uri inregistrate", len(keys))
+    return opens
+
+
+def attach_open(entries: list) -> dict:
+    """
+    Ca record(), fara snapshot nou — pentru un pull deja inregistrat (cache-ul din
+    odds_planner): doar ataseaza odds["open"] din log.
+    """
+    import cache as redis_cache
+
+    keys = [(event_key(home, away, date), odds) for home, away, date, odds in entries if odds]
+    if not keys:
+        return {}
+    res = redis_cache._pipeline([cmd for key, _ in keys
+                                 for cmd in (["LINDEX", _redis_key(key), 0], ["LLEN", _redis_key(key)])])
+    opens = {}
+    for i, (key, odds) in enumerate(keys):
+        first, n = res[2 * i], res[2 * i + 1]
+        if first is None:
+            log = _local.get(key)
+            if not log:
+                continue
+            first, n = log[0], len(log)
+        opening = _unpack(first)
+        if opening:
+            opening["n"] = int(n)
+            odds["open"] = opens[key] = opening
+    return opens
+
+
+def history(home: str, away: str, date: str) -> list:
+    """Toate snapshot-urile unui meci, in ordinea pull-urilor."""
+    import cache as redis_cache
+
+    key = event_key(home, away, date)
+    rows = redis_cache._redis(["LRANGE", _redis_key(key), 0, -1])
+    if rows is None:
+        rows = _local.get(key, [])
+    return [r for r in (_unpack(x) for x in rows) if r]
+
+
+def line_movement(odds: dict) -> dict:
+    """
+    Features de miscare a liniei din odds["open"] (deschiderea) si cota curenta.
+    Fara istoric (un singur snapshot) -> 0, ca inainte.
+    """
+    odds    = odds or {}
+    opening = odds.get("open") or {}
+    # Ca in predictor: PSH lipsa (pull-urile bet_signal) -> B365H
+    psh, psd, psa = (opening.get(f"PS{o}") or opening.get(f"B365{o}") for o in "HDA")
+    cur_h, cur_d, cur_a = (odds.get(f"PS{o}") or odds.get(f"B365{o}") for o in "HDA")
+    if opening.get("n", 0) < 2 or not all(
+            v and v > 1.01 for v in (psh, psd, psa, cur_h, cur_d, cur_a)):
+        return {c: 0.0 for c in MOVEMENT_COLS}
+
+    def clip(x, lo, hi):
+        return max(lo, min(hi, x))
+
+    feat = {
+        "ps_move_h": clip(cur_h / psh - 1, -0.40, 0.40),
+        "ps_move_a": clip(cur_a / psa - 1, -0.40, 0.40),
+        "ps_move_d": clip(cur_d / psd - 1, -0.40, 0.40),
+        "home_steamed": float(cur_h < psh * 0.98),
+        "away_steamed": float(cur_a < psa * 0.98),
+        "home_drifted": float(cur_h > psh * 1.03),
+        "away_drifted": float(cur_a > psa * 1.03),
+    }
+    vig_o = max(1/psh + 1/psd + 1/psa, 0.9)
+    vig_c = max(1/cur_h + 1/cur_d + 1/cur_a, 0.9)
+    feat["clv_h"] = clip((1/cur_h)/vig_c - (1/psh)/vig_o, -0.15, 0.15)
+    feat["clv_a"] = clip((1/cur_a)/vig_c - (1/psa)/vig_o, -0.15, 0.15)
+    feat["reverse_line_h"] = float(feat["home_steamed"] == 1 and feat["clv_h"] < -0.02)
+    feat["reverse_line_a"] = float(feat["away_steamed"] == 1 and feat["clv_a"] < -0.02)
+    return feat
@@ -0,0 +1,178 @@
+"""
+Planificator de fetch pentru The-Odds-API — o singura sursa de cote pentru toti consumatorii.
+
+Inainte fixtures.get_today_odds (picks 07:00 / 13:00, ligile active azi) si
+bet_signal.fetch_odds_live (09:00, toate ligile, fereastra 72h) descarcau separat
+acelasi endpoint /sports/{sport}/odds — acelasi cost de quota, date suprapuse.
+
+Acum:
+  - un pull per sport, fara fereastra de timp (costul e acelasi indiferent de
+    interval — markets x regions), care acopera reuniunea ferestrelor tuturor
+    consumatorilor; fiecare consumator isi filtreaza singur meciurile;
+  - evenimentele brute se publica in cache-ul partajat (namespace odds_events,
+    o cheie per sport) — API, worker si bet_signal citesc acelasi pull;
+  - plan() decide per sport daca pull-ul din cache mai e bun, dupa apropierea
+    kickoff-ului (CADENCE) si quota lunara ramasa (x-requests-remaining, salvata
+    de rate_limiter.observe): cand bugetul zilnic nu acopera cadenta, varstele
+    maxime se intind proportional; sub RESERVE credite se descarca doar sporturile
+    fara niciun pull in cache;
+  - un lock Redis per sport (SET NX) impiedica doua procese sa descarce acelasi
+    sport in acelasi timp.
+
+Consumatori: fixtures.get_today_odds, ingest_async.fetch_odds, bet_signal.fetch_odds_live.
+"""
+import time
+import datetime
+import logging
+
+import cache as redis_cache
+import rate_limiter
+
+logger = logging.getLogger(__name__)
+
+PROVIDER  = "the-odds-api"
+CACHE_TTL = 2 * 86400
+LOCK_TTL  = 120
+RESERVE   = 25          # credite pastrate pentru sporturile fara cache
+
+# (ore pana la cel mai apropiat kickoff, varsta maxima a pull-ului in secunde)
+CADENCE = [
+    (3,    30 * 60),
+    (24,   3 * 3600),
+    (72,   8 * 3600),
+    (None, 24 * 3600),
+]
+MAX_STRETCH = 4         # presiunea pe quota intinde varsta maxima de cel mult atatea ori
+
+PARAMS = {
+    "regions":    "eu",
+    "markets":    "h2h",
+    "oddsFormat": "decimal",
+    "dateFormat": "iso",
+}
+
+_remaining_local = None     # fara Redis: ultima valoare x-requests-remaining vazuta
+
+
+def _parse_ts(iso: str):
+    try:
+        return datetime.datetime.fromisoformat(iso.replace("Z", "+00:00")).timestamp()
+    except (AttributeError, ValueError):
+        return None
+
+
+def _nearest_kickoff_h(pull: dict, now: float):
+    """Ore pana la urmatorul kickoff din pull (None daca nu mai are meciuri viitoare)."""
+    upcoming = [t for t in (_parse_ts(ev.get("commence_time", "")) for ev in pull.get("events", []))
+                if t is not None and t >= now]
+    return (min(upcoming) - now) / 3600 if upcoming else None
+
+
+def _base_age(kickoff_h) -> int:
+    for hours, age in CADENCE:
+        if hours is None or (kickoff_h is not None and kickoff_h <= hours):
+            return age
+    return CADENCE[-1][1]
+
+
+def remaining_quota():
+    """Credite ramase luna asta (None = necunoscut)."""
+    flat = redis_cache._redis(["HGET", f"flopi:rl:quota:{PROVIDER}", "x-requests-remaining"])
+    try:
+        return float(flat) if flat is not None else _remaining_local
+    except (TypeError, ValueError):
+        return _remaining_local
+
+
+def _days_left(today: datetime.date = None) -> int:
+    # Quota se reseteaza lunar; aproximam cu sfarsitul lunii calendaristice
+    today = today or datetime.date.today()
+    nxt = (today.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+    return max(1, (nxt - today).days)
+
+
+def plan(sports: list, now: float = None) -> tuple:
+    """
+    (pull-uri utilizabile din cache {sport: pull}, sporturi de descarcat).
+    pull = {"fetched_at": ts, "events": [...]}
+    """
+    now    = now or time.time()
+    sports = list(dict.fromkeys(sports))
+    cached = redis_cache.get_many("odds_events", sports)
+
+    ages = {s: _base_age(_nearest_kickoff_h(cached[s], now)) for s in cached}
+    # Presiunea pe quota: pull-uri/zi necesare la cadenta de baza vs bugetul zilnic
+    remaining = remaining_quota()
+    stretch = 1.0
+    if remaining is not None:
+        if remaining <= RESERVE:
+            stretch = float("inf")
+        else:
+            needed = sum(86400 / ages.get(s, _base_age(None)) for s in sports)
+            budget = (remaining - RESERVE) / _days_left()
+            stretch = min(MAX_STRETCH, max(1.0, needed / max(budget, 1e-9)))
+
+    usable, to_fetch = {}, []
+    for s in sports:
+        pull = cached.get(s)
+        if pull:
+            usable[s] = pull        # si pull-urile vechi raman ca fallback daca fetch-ul esueaza
+        if not pull or now - pull.get("fetched_at", 0) > ages[s] * stretch:
+            to_fetch.append(s)
+    if to_fetch:
+        logger.info("[odds_planner] fetch %s (quota ramasa %s, stretch %.1f)",
+                    to_fetch, "?" if remaining is None else int(remaining), stretch)
+    return usable, to_fetch
+
+
+def claim(sport: str) -> bool:
+    """Lock-ul de fetch pentru un sport; fara Redis, mereu acordat."""
+    if not redis_cache._REDIS_URL:
+        return True
+    return redis_cache._redis(["SET", f"flopi:odds_plan:lock:{sport}", "1", "NX", "EX", LOCK_TTL]) == "OK"
+
+
+def store(sport: str, events: list, headers=None) -> dict:
+    """Publica pull-ul in cache-ul partajat; returneaza pull-ul."""
+    global _remaining_local
+    if headers is not None and headers.get("x-requests-remaining") is not None:
+        try:
+            _remaining_local = float(headers["x-requests-remaining"])
+        except (TypeError, ValueError):
+            pass
+    pull = {"fetched_at": time.time(), "events": events, "fresh": True}
+    redis_cache.set("odds_events", sport, {**pull, "fresh": False}, ttl=CACHE_TTL)
+    return pull
+
+
+def get_events(sports: list, api_url: str, api_key: str) -> tuple:
+    """
+    Varianta sincrona: pull-urile pentru `sports` (cache sau fetch, dupa plan).
+    Returneaza ({sport: pull}, status) — status: "ok", "quota" (429) sau "auth" (401).
+    pull["fresh"] = True doar pentru ce s-a descarcat acum (snapshot-urile de cote
+    se inregistreaza o singura data per pull).
+    """
+    pulls, to_fetch = plan(sports)
+    status = "ok"
+    for sport in to_fetch:
+        if not claim(sport) and sport in pulls:
+            continue
+        try:
+            resp = rate_limiter.get(PROVIDER, f"{api_url}/sports/{sport}/odds/",
+                                    params={"apiKey": api_key, **PARAMS}, timeout=10)
+        except Exception as e:
+            logger.warning("[odds_planner] %s: %s", sport, e)
+            continue
+        if resp.status_code == 401:
+            status = "auth"
+            break
+        if resp.status_code == 429:
+            status = "quota"
+            break
+        if resp.status_code != 200:
+            continue
+        try:
+            pulls[sport] = store(sport, resp.json(), resp.headers)
+        except ValueError:
+            continue
+    return pulls, status
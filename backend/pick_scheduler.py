@@ -0,0 +1,167 @@
+"""
+Recalcul incremental al pick-urilor, dupa kickoff — folosit de worker.py.
+
+Inainte worker-ul recalcula toata ziua la ore fixe (07:00, 13:00, ...) si fiecare
+rulare redescarca fixtures, cote si absente pentru toate meciurile. Acum:
+
+  - calculul complet (compute_and_store_picks) ramane doar pentru descoperirea
+    meciurilor unei zile; la final salveaza starea zilei (payload + amprenta
+    intrarilor fiecarui meci) in cache, namespace pick_state;
+  - refresh(date) — rulat periodic (TICK_MIN) — nu mai cere fixtures: ia cotele prin
+    odds_planner (se descarca doar sporturile cu pull expirat, dupa kickoff si
+    quota) si absentele din cache-ul de 6h, recalculeaza amprenta meciurilor
+    neincepute si prezice DOAR meciurile cu intrari schimbate (cote noi, absente,
+    model republicat); pick-urile noi se patch-uiesc in payload, apoi upsert
+    daily_picks + invalidarea cache-ului daily;
+  - schedule_finals() pune cate un job one-shot cu FINAL_LEAD_MIN minute inainte
+    de fiecare kickoff — ultimul refresh al meciului, cu cotele de aproape de start.
+"""
+import json
+import hashlib
+import datetime
+import logging
+from zoneinfo import ZoneInfo
+
+import cache as redis_cache
+
+logger = logging.getLogger(__name__)
+
+LOCAL_TZ       = ZoneInfo("Europe/Bucharest")
+STATE_TTL      = 3 * 86400
+TICK_MIN       = 30
+FINAL_LEAD_MIN = 40
+
+_OPEN_COLS = ("PSH", "PSD", "PSA", "B365H", "B365D", "B365A")
+
+
+def _key(home: str, away: str) -> str:
+    return f"{home}|{away}"
+
+
+def kickoff(pick: dict, date: str):
+    """Kickoff-ul (ora Bucuresti, aware) din data zilei + campul time "HH:MM"; None daca lipseste."""
+    try:
+        t = datetime.time.fromisoformat(pick.get("time") or "")
+        return datetime.datetime.combine(datetime.date.fromisoformat(date), t, LOCAL_TZ)
+    except ValueError:
+        return None
+
+
+def _model_signature() -> str:
+    import predictor
+    b = predictor._bundle
+    return str(b.signature) if b is not None else ""
+
+
+def _fingerprint(fix: dict, odds: dict, injuries: dict, model_sig: str) -> str:
+    """Amprenta intrarilor unui meci: cote (+ deschiderea), absente, versiunea modelului."""
+    import odds_history
+
+    odds = odds or {}
+    opening = odds.get("open") or {}
+    sig = {
+        "odds":  [round(odds[c], 3) if odds.get(c) else None for c in odds_history.SNAP_COLS],
+        "open":  [opening.get(c) for c in _OPEN_COLS] if opening.get("n", 0) >= 2 else None,
+        "inj":   [(injuries or {}).get(fix["home"], 0), (injuries or {}).get(fix["away"], 0)],
+        "model": model_sig,
+    }
+    return hashlib.sha1(json.dumps(sig, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _fixture(pick: dict, date: str) -> dict:
+    """Fixture-ul din care a fost calculat pick-ul (fara request la football-data)."""
+    return {k: pick.get(k, "") for k in ("home", "away", "home_raw", "away_raw", "league",
+                                         "flag", "time", "competition_code")} | {"date": date}
+
+
+def remember_inputs(date: str, fixtures: list, odds_map: dict, injuries: dict, payload: dict = None):
+    """Starea zilei dupa un calcul complet: payload-ul salvat + amprenta fiecarui meci."""
+    model_sig = _model_signature()
+    fps = {_key(f["home"], f["away"]): _fingerprint(f, odds_map.get((f["home"].lower(), f["away"].lower())),
+                                                     injuries, model_sig)
+           for f in fixtures}
+    state = {"fps": fps}
+    if payload is not None:
+        state["payload"] = payload
+    redis_cache.set("pick_state", date, state, ttl=STATE_TTL)
+
+
+def _load_state(date: str) -> dict | None:
+    state = redis_cache.get("pick_state", date) or {}
+    if not state.get("payload"):
+        from ingestion import load_picks_from_db
+        state["payload"] = load_picks_from_db(date)
+    return state if state.get("payload") else None
+
+
+def refresh(date: str = None, only: list = None, force: bool = False) -> dict:
+    """
+    Recalculeaza meciurile neincepute din `date` ale caror intrari s-au schimbat.
+    only: chei "home|away" (ex. refresh-ul final al unui meci); force: ignora amprenta.
+    """
+    from predictor import get_known_teams
+    from ingest_async import fetch_refresh_inputs
+    from ingestion import _predict_picks, _build_payload, _save_payload
+
+    date  = date or datetime.date.today().isoformat()
+    state = _load_state(date)
+    if state is None:
+        return {"date": date, "changed": 0, "reason": "fara picks"}
+
+    payload = state["payload"]
+    fps     = state.get("fps", {})
+    now     = datetime.datetime.now(LOCAL_TZ)
+    pending = [p for p in payload["picks"]
+               if (kickoff(p, date) or now) >= now and (only is None or _key(p["home"], p["away"]) in only)]
+    if not pending:
+        return {"date": date, "changed": 0, "reason": "niciun meci neinceput"}
+
+    fixtures = [_fixture(p, date) for p in pending]
+    active   = sorted({f["competition_code"] for f in fixtures if f["competition_code"]})
+    odds_map, injuries = fetch_refresh_inputs(get_known_teams(), active)
+
+    model_sig = _model_signature()
+    changed, new_fps = [], {}
+    for f in fixtures:
+        k  = _key(f["home"], f["away"])
+        fp = _fingerprint(f, odds_map.get((f["home"].lower(), f["away"].lower())), injuries, model_sig)
+        if force or fps.get(k) != fp:
+            changed.append(f)
+            new_fps[k] = fp
+    if not changed:
+        logger.info("[pick_scheduler] %s: %d meciuri verificate, nimic schimbat", date, len(fixtures))
+        return {"date": date, "checked": len(fixtures), "changed": 0}
+
+    errors = []
+    fresh  = {_key(p["home"], p["away"]): p for p in _predict_picks(changed, odds_map, injuries, errors)}
+    picks  = [fresh.get(_key(p["home"], p["away"]), p) for p in payload["picks"]]
+    payload = _build_payload(picks, payload["date"], payload.get("requested_date", date),
+                             payload.get("total_fixtures", len(picks)), errors)
+    _save_payload(payload, date)
+
+    fps.update({k: fp for k, fp in new_fps.items() if k in fresh})
+    redis_cache.set("pick_state", date, {"fps": fps, "payload": payload}, ttl=STATE_TTL)
+    logger.info("[pick_scheduler] %s: %d/%d meciuri recalculate", date, len(fresh), len(fixtures))
+    return {"date": date, "checked": len(fixtures), "changed": len(fresh)}
+
+
+def schedule_finals(scheduler, date: str = None) -> int:
+    """Un job one-shot (APScheduler DateTrigger) cu FINAL_LEAD_MIN inainte de fiecare kickoff."""
+    from apscheduler.triggers.date import DateTrigger
+
+    date  = date or datetime.date.today().isoformat()
+    state = _load_state(date)
+    if state is None:
+        return 0
+    now = datetime.datetime.now(LOCAL_TZ)
+    n = 0
+    for p in state["payload"]["picks"]:
+        ko = kickoff(p, date)
+        if ko is None or ko <= now:
+            continue
+        run_at = max(now + datetime.timedelta(seconds=5), ko - datetime.timedelta(minutes=FINAL_LEAD_MIN))
+        k = _key(p["home"], p["away"])
+        scheduler.add_job(refresh, DateTrigger(run_date=run_at), args=[date], kwargs={"only": [k]},
+                          id=f"final:{date}:{k}", replace_existing=True, misfire_grace_time=600)
+        n += 1
+    return n
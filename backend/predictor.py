@@ -1,15 +1,19 @@
 """
 OXIANO - Modul predictie AI
 Folosit de main.py pentru a prezice rezultatele meciurilor.
-Incarca model.pkl generat de train.py si construieste vectorul complet de features.
+Incarca modelul generat de train.py (artefact split sau model.pkl) si construieste vectorul complet de features.
 """
 
 import math
 import numpy as np
-import pandas as pd
-import pickle
 import os
+import time
+import threading
+import model_store
+import elo_engine
+import odds_history
 from calibrator import CalibratedXGB  # noqa: F401 — necesar pentru deserializare pkl
+from elo_index import build_team_elo_index, DEFAULT_ELO
 
 
 def _poisson_over25(lam: float) -> float:
@@ -20,35 +24,139 @@ def _poisson_over25(lam: float) -> float:
     return round(max(0.0, min(1.0, 1 - p_le2)), 3)
 
 MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "model.pkl")
+MODEL_WATCH_INTERVAL = int(os.getenv("MODEL_WATCH_INTERVAL", "60"))  # secunde, 0 = dezactivat
 
-_model         = None
-_features      = None
-_team_stats    = None
-_label_encoder = None
-_elo_ratings   = None
-_feature_means = None
-_h2h_history   = None
+
+class ModelBundle:
+    """
+    Tot ce tine de un model incarcat: modelul, tabelele si indexurile derivate.
+    Construit o singura data, apoi doar citit. Hot-reload-ul publica un bundle nou
+    printr-o singura atribuire a lui _bundle — un request in curs lucreaza pana la
+    capat pe bundle-ul citit la inceput, fara amestec intre modelul vechi si cel nou.
+    """
+    __slots__ = (
+        "model", "features", "team_stats", "label_encoder", "elo_ratings",
+        "feature_means", "h2h_history", "team_elo_idx",
+        # index precalculat pentru _build_feature_row (vezi _index_team_rows)
+        "feature_pos", "default_row", "home_pos", "away_pos", "diff_pos",
+        "team_rows", "unknown_rows",
+        "signature", "loaded_at",
+    )
+
+
+_bundle: ModelBundle = None
+_reload_lock       = threading.Lock()
+_failed_signature  = None    # artefact care a picat la reload — nu reincercam pana se schimba
+_watcher_started   = False
 _clubelo_ratings: dict = {}   # Elo externe de la clubelo.com (mai precise)
 
 
-def load_model():
-    global _model, _features, _team_stats, _label_encoder, _elo_ratings, _feature_means, _h2h_history
+def _artifact_signature() -> tuple:
+    """(mtime_ns, size) pentru manifest-ul split si model.pkl — se schimba la orice retrain."""
+    sig = []
+    for path in (os.path.join(model_store.split_dir(MODEL_PATH), "manifest.json"), MODEL_PATH):
+        try:
+            st = os.stat(path)
+            sig.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            sig.append(None)
+    return tuple(sig)
 
-    if not os.path.exists(MODEL_PATH):
+
+def _load_bundle() -> ModelBundle:
+    """Citeste artefactul de pe disc si construieste un bundle nou (nepublicat)."""
+    if not os.path.exists(MODEL_PATH) and not os.path.isdir(model_store.split_dir(MODEL_PATH)):
         raise FileNotFoundError(
             f"Modelul nu exista! Ruleaza mai intai: python train.py (cautat la: {MODEL_PATH})"
         )
 
-    with open(MODEL_PATH, "rb") as f:
-        data = pickle.load(f)
-    _model         = data["model"]
-    _features      = data["features"]
-    _team_stats    = data.get("team_stats", {})
-    _label_encoder = data.get("label_encoder")
-    _elo_ratings   = data.get("elo_ratings", {})
-    _feature_means = data.get("feature_means", {})
-    _h2h_history   = data.get("h2h_history", {})
-    print(f"Model AI incarcat: {len(_team_stats)} echipe, {len(_features)} features")
+    signature = _artifact_signature()
+    # Artefact split (mmap) daca exista, altfel model.pkl
+    data = model_store.load(MODEL_PATH)
+
+    b = ModelBundle()
+    b.model         = data["model"]
+    b.features      = data["features"]
+    b.team_stats    = data.get("team_stats", {})
+    b.label_encoder = data.get("label_encoder")
+    b.elo_ratings   = data.get("elo_ratings", {})
+    b.feature_means = data.get("feature_means", {})
+    b.h2h_history   = data.get("h2h_history", {})
+    b.team_elo_idx  = build_team_elo_index(b.elo_ratings)
+    _index_team_rows(b)
+    b.signature     = signature
+    b.loaded_at     = time.time()
+    return b
+
+
+def load_model() -> ModelBundle:
+    """Incarcare sincrona (startup) — publica bundle-ul fara smoke test."""
+    global _bundle
+    b = _load_bundle()
+    _bundle = b
+    print(f"Model AI incarcat: {len(b.team_stats)} echipe, {len(b.features)} features")
+    return b
+
+
+def _smoke_test(b: ModelBundle):
+    """Predictie de proba pe bundle-ul nou inainte de publicare. Arunca exceptie daca e stricat."""
+    teams = list(b.team_rows)[:2] or ["__smoke_home__", "__smoke_away__"]
+    home, away = teams[0], teams[-1]
+    X = _build_feature_row(b, home, away, month=1)[None, :]
+    proba = b.model.predict_proba(X)
+    n_classes = len(b.label_encoder.classes_) if b.label_encoder is not None else 3
+    if proba.shape != (1, n_classes) or not np.all(np.isfinite(proba)) or abs(proba.sum() - 1) > 1e-3:
+        raise ValueError(f"smoke test: probabilitati invalide {proba!r}")
+    _result_from_proba(b, home, away, proba[0])
+
+
+def reload_model(force: bool = False) -> dict:
+    """
+    Hot-reload fara restart: daca artefactul s-a schimbat (sau force=True) incarca
+    modelul nou in firul apelant, ruleaza un smoke test si abia apoi inlocuieste _bundle.
+    La orice eroare ramane modelul vechi. Fiecare proces (worker uvicorn, worker.py)
+    are propriul bundle — triggerul admin ajunge la un singur proces, restul il preiau
+    prin start_model_watcher.
+    """
+    global _bundle, _failed_signature
+    if not _reload_lock.acquire(blocking=False):
+        return {"reloaded": False, "reason": "reload deja in curs"}
+    try:
+        signature = _artifact_signature()
+        current = _bundle
+        if not force and current is not None and signature in (current.signature, _failed_signature):
+            return {"reloaded": False, "reason": "artefact neschimbat"}
+        try:
+            new = _load_bundle()
+            _smoke_test(new)
+        except Exception as e:
+            _failed_signature = signature
+            print(f"[model] Reload esuat, raman pe modelul curent: {e}")
+            return {"reloaded": False, "reason": f"eroare: {e}"}
+        _bundle = new
+        _failed_signature = None
+        print(f"[model] Hot-reload: {len(new.team_stats)} echipe, {len(new.features)} features")
+        return {"reloaded": True, "teams": len(new.team_stats), "features": len(new.features)}
+    finally:
+        _reload_lock.release()
+
+
+def start_model_watcher(interval: int = MODEL_WATCH_INTERVAL):
+    """Thread daemon: la fiecare `interval` secunde verifica artefactul si face reload_model()."""
+    global _watcher_started
+    if _watcher_started or interval <= 0:
+        return
+    _watcher_started = True
+
+    def _loop():
+        while True:
+            time.sleep(interval)
+            try:
+                reload_model()
+            except Exception as e:
+                print(f"[model] Watcher: {e}")
+
+    threading.Thread(target=_loop, name="model-watcher", daemon=True).start()
 
 
 def refresh_clubelo(redis_cache=None):
@@ -64,17 +172,16 @@ def refresh_clubelo(redis_cache=None):
         print(f"[club_elo] Eroare refresh: {e}")
 
 
-def _team_elo(team: str) -> float:
+def _team_elo(b: ModelBundle, team: str) -> float:
     """Cauta Elo pentru echipa — prioritate clubelo.com, fallback la model intern."""
     if team in _clubelo_ratings:
         return _clubelo_ratings[team]
-    vals = [v for k, v in _elo_ratings.items() if k.split("|", 1)[-1] == team]
-    return max(vals) if vals else 1500.0
+    return b.team_elo_idx.get(team, DEFAULT_ELO)
 
 
-def _get_team_stats(team: str, as_home: bool) -> dict:
+def _get_team_stats(team_stats: dict, team: str, as_home: bool) -> dict:
     """Returneaza stats complet pentru o echipa (home sau away)."""
-    if _team_stats is None or team not in _team_stats:
+    if team_stats is None or team not in team_stats:
         # Valori implicite pentru echipa necunoscuta
         return {
             "atk_all5": 1.3, "def_all5": 1.3, "atk_all10": 1.3, "def_all10": 1.3,
@@ -89,7 +196,7 @@ def _get_team_stats(team: str, as_home: bool) -> dict:
             "xgf_all5": None, "xga_all5": None,
         }
 
-    s = _team_stats[team]
+    s = team_stats[team]
     venue_atk = s.get("atk_home5" if as_home else "atk_away5", 1.4 if as_home else 1.1)
     venue_def = s.get("def_home5" if as_home else "def_away5", 1.1 if as_home else 1.3)
     win_venue = s.get("win_home5" if as_home else "win_away5", 0.40)
@@ -122,22 +229,127 @@ def _get_team_stats(team: str, as_home: bool) -> dict:
     }
 
 
-# Home advantage per liga (Elo points) — calculat din datele de antrenament
+# Coloane pentru care modelul are diferentiale diff_{col} = h_{col} - a_{col}
+_DIFF_COLS = ["atk_all5", "def_all5", "atk_all10", "def_all10",
+              "atk_venue5", "def_venue5", "win5", "win10",
+              "pts5", "pts10", "win_venue5", "pts_venue5"]
+
+def _team_side(team_stats: dict, team, as_home: bool, keys: list, diff_cols: list) -> tuple:
+    """
+    Felia unei echipe pe o parte a meciului:
+    (valori float32 pentru keys, valori float64 pentru diferentiale, xG pentru perechi).
+    """
+    s = _get_team_stats(team_stats, team, as_home)
+    vals = np.array([np.nan if s[k] is None else s[k] for k in keys], dtype=np.float32)
+    diff = np.array([s[c] for c in diff_cols], dtype=np.float64)
+    xg = (
+        s["atk_venue5"], s["def_venue5"],
+        s.get("xgf_venue5") or s.get("xgf_all5"),
+        s.get("xga_venue5") or s.get("xga_all5"),
+    )
+    return vals, diff, xg
+
+
+def _index_team_rows(b: ModelBundle):
+    """
+    Precalculeaza feliile h_*/a_* pentru fiecare echipa din team_stats.
+    La inferenta un rand = copie din default_row + doua atribuiri vectoriale,
+    in loc de dict-uri reconstruite si ~110 lookup-uri pe meci.
+    """
+    b.feature_pos = {f: i for i, f in enumerate(b.features)}
+    b.default_row = np.array([b.feature_means.get(f, 0.0) for f in b.features], dtype=np.float32)
+
+    # Cheile team-level: aceleasi pentru orice echipa (None -> valorile implicite)
+    team_keys = list(_get_team_stats(None, None, as_home=True))
+    home_keys = [k for k in team_keys if f"h_{k}" in b.feature_pos]
+    away_keys = [k for k in team_keys if f"a_{k}" in b.feature_pos]
+    diff_cols = [c for c in _DIFF_COLS if f"diff_{c}" in b.feature_pos]
+    b.home_pos = np.array([b.feature_pos[f"h_{k}"] for k in home_keys], dtype=np.intp)
+    b.away_pos = np.array([b.feature_pos[f"a_{k}"] for k in away_keys], dtype=np.intp)
+    b.diff_pos = np.array([b.feature_pos[f"diff_{c}"] for c in diff_cols], dtype=np.intp)
+
+    ts = b.team_stats
+    if isinstance(ts, model_store.TeamStatsTable):
+        # Artefact split: feliile se citesc la cerere din randul mmap — nimic copiat per proces
+        b.team_rows = _MmapTeamRows(ts, home_keys, away_keys, diff_cols)
+    else:
+        b.team_rows = {
+            team: (_team_side(ts, team, True, home_keys, diff_cols),
+                   _team_side(ts, team, False, away_keys, diff_cols))
+            for team in ts
+        }
+    b.unknown_rows = (_team_side(None, None, True, home_keys, diff_cols),
+                      _team_side(None, None, False, away_keys, diff_cols))
+
+
+# Cheile derivate din coloanele per venue: atk_venue5 -> atk_home5 / atk_away5
+_VENUE_KEYS = ("atk_venue5", "def_venue5", "win_venue5", "pts_venue5", "xgf_venue5", "xga_venue5")
+_XG_KEYS    = ["atk_venue5", "def_venue5", "xgf_venue5", "xgf_all5", "xga_venue5", "xga_all5"]
+
+
+def _or_none(venue: float, total: float):
+    # Echivalentul `s.get(venue) or s.get(total)` din _team_side (NaN = cheie lipsa)
+    if venue == venue and venue:
+        return venue
+    return total if total == total else None
+
+
+class _MmapTeamRows:
+    """
+    team_rows peste TeamStatsTable (artefact split). Aceleasi felii ca _team_side,
+    calculate din randul mmap al echipei cu un singur index vectorial per parte —
+    tabelul ramane in page cache, partajat intre procese.
+    """
+    __slots__ = ("_table", "_plans")
+
+    def __init__(self, table, home_keys: list, away_keys: list, diff_cols: list):
+        self._table = table
+        self._plans = (self._plan(table, True, home_keys, diff_cols),
+                       self._plan(table, False, away_keys, diff_cols))
+
+    @staticmethod
+    def _plan(table, as_home: bool, keys: list, diff_cols: list) -> tuple:
+        """(coloane sursa, coloane absente, valori implicite, n keys, n diff) pentru o parte."""
+        venue    = "home" if as_home else "away"
+        defaults = _get_team_stats(None, None, as_home)
+        col      = {k: i for i, k in enumerate(table.columns)}
+        wanted   = keys + diff_cols + _XG_KEYS
+        src = [col.get(k.replace("venue", venue) if k in _VENUE_KEYS else k, -1) for k in wanted]
+        return (
+            np.array([max(i, 0) for i in src], dtype=np.intp),
+            np.array([i < 0 for i in src], dtype=bool),
+            np.array([np.nan if defaults[k] is None else defaults[k] for k in wanted], dtype=np.float64),
+            len(keys), len(diff_cols),
+        )
+
+    def side(self, team, side: int) -> tuple:
+        idx, absent, dflt, nk, nd = self._plans[side]
+        v = self._table.row(team)[idx]
+        v[absent] = np.nan
+        v = np.where(np.isnan(v), dflt, v)
+        atk, dfn, xgf_v, xgf_a, xga_v, xga_a = v[nk + nd:].tolist()
+        return (v[:nk].astype(np.float32), v[nk:nk + nd],
+                (atk, dfn, _or_none(xgf_v, xgf_a), _or_none(xga_v, xga_a)))
+
+    def __contains__(self, team) -> bool:
+        return team in self._table
+
+    def __iter__(self):
+        return iter(self._table)
+
+
+def _team_slice(b: ModelBundle, team: str, side: int) -> tuple:
+    """Felia (vals, diff, xg) a echipei pentru side 0 = home / 1 = away."""
+    rows = b.team_rows
+    if team not in rows:
+        return b.unknown_rows[side]
+    if isinstance(rows, _MmapTeamRows):
+        return rows.side(team, side)
+    return rows[team][side]
+
+
+# Home advantage per liga (Elo points): elo_engine.HOME_ADV — calculat din datele de antrenament
 # Formula: elo_adv = 400 * log10(P_home_adj / (1 - P_home_adj)) la elo_diff=0
-_HOME_ADV: dict[str, int] = {
-    "E0": 23, "E1": 18, "E2": 15, "E3": 9, "EC": 6,
-    "D1": 22, "D2": 25,
-    "SP1": 34, "SP2": 25,
-    "I1": 26, "I2": 22,
-    "F1": 31, "F2": 27,
-    "P1": 28, "P2": 20,
-    "N1": 30,
-    "B1": 38,
-    "T1": 30,
-    "G1": 43,
-    "SC0": 4, "SC1": -5,
-}
-_DEFAULT_HOME_ADV = 25
 
 # Draw boost per liga — ligi cu mai putine egaluri au nevoie de boost mai mare
 # Calibrat din draw_rate per liga din setul de antrenament
@@ -157,55 +369,52 @@ _DRAW_BOOST: dict[str, float] = {
 _DEFAULT_DRAW_BOOST = 1.40
 
 
-def _build_feature_vector(home_team: str, away_team: str,
-                           odds: dict = None, league_id: int = 0,
-                           month: int = None, league_code: str = "") -> pd.DataFrame:
+def _build_feature_row(b: ModelBundle, home_team: str, away_team: str,
+                       odds: dict = None, league_id: int = 0,
+                       month: int = None, league_code: str = "") -> np.ndarray:
     """
-    Construieste vectorul complet de ~80 features pe baza team_stats.
+    Construieste vectorul complet de ~80 features (float32) pe baza feliilor
+    precalculate in _index_team_rows, aliniat la ordinea exacta din b.features.
     odds: dict optional cu chei PSH/PSD/PSA, B365H/B365D/B365A, etc.
     """
     import datetime
     if month is None:
         month = datetime.date.today().month
 
-    h = _get_team_stats(home_team, as_home=True)
-    a = _get_team_stats(away_team, as_home=False)
+    h_vals, h_diff, h_xg = _team_slice(b, home_team, 0)
+    a_vals, a_diff, a_xg = _team_slice(b, away_team, 1)
+    h_atk_venue, h_def_venue, h_xgf, h_xga = h_xg
+    a_atk_venue, a_def_venue, a_xgf, a_xga = a_xg
 
-    h_elo = _team_elo(home_team)
-    a_elo = _team_elo(away_team)
+    h_elo = _team_elo(b, home_team)
+    a_elo = _team_elo(b, away_team)
     elo_diff = h_elo - a_elo
 
     # Elo probabilities (formula clasica)
-    home_adv = _HOME_ADV.get(league_code, _DEFAULT_HOME_ADV)
-    elo_diff_adj = elo_diff + home_adv
-    elo_prob_h = 1 / (1 + 10 ** (-elo_diff_adj / 400))
+    elo_diff_adj = elo_diff + elo_engine.home_advantage(league_code)
+    elo_prob_h = elo_engine.win_prob(elo_diff_adj)
     # Draw probability: aproximare empirica
-    diff_abs = abs(elo_diff_adj)
-    elo_prob_d = max(0.15, min(0.35, 0.27 * math.exp(-diff_abs / 500)))
+    elo_prob_d = elo_engine.draw_prob(elo_diff_adj)
 
     # xG — real (Understat rolling) cu fallback la proxy din goluri
-    h_xgf = h.get("xgf_venue5") or h.get("xgf_all5")
-    h_xga = h.get("xga_venue5") or h.get("xga_all5")
-    a_xgf = a.get("xgf_venue5") or a.get("xgf_all5")
-    a_xga = a.get("xga_venue5") or a.get("xga_all5")
     if h_xgf is not None and a_xga is not None:
         xg_h = (h_xgf + a_xga) / 2
     else:
-        xg_h = (h["atk_venue5"] + a["def_venue5"]) / 2
+        xg_h = (h_atk_venue + a_def_venue) / 2
     if a_xgf is not None and h_xga is not None:
         xg_a = (a_xgf + h_xga) / 2
     else:
-        xg_a = (a["atk_venue5"] + h["def_venue5"]) / 2
+        xg_a = (a_atk_venue + h_def_venue) / 2
     xg_diff = xg_h - xg_a
 
-    feat = {}
+    # Team features + diferentiale — felii precalculate
+    row = b.default_row.copy()
+    row[b.home_pos] = h_vals
+    row[b.away_pos] = a_vals
+    row[b.diff_pos] = h_diff - a_diff
 
-    # Team features — home
-    for k, v in h.items():
-        feat[f"h_{k}"] = v
-    # Team features — away
-    for k, v in a.items():
-        feat[f"a_{k}"] = v
+    # Features dependente de pereche
+    feat = {}
 
     # xG
     feat["xg_h"]    = xg_h
@@ -213,9 +422,9 @@ def _build_feature_vector(home_team: str, away_team: str,
     feat["xg_diff"] = xg_diff
 
     # H2H real (din istoricul antrenamentului)
-    if _h2h_history:
+    if b.h2h_history:
         key = tuple(sorted([home_team, away_team]))
-        recent = _h2h_history.get(key, [])[-6:]
+        recent = b.h2h_history.get(key, [])[-6:]
         if recent:
             hw = dr = 0
             gd_sum = 0.0
@@ -273,28 +482,21 @@ def _build_feature_vector(home_team: str, away_team: str,
                 # Folosim medii din antrenament
                 for sfx in ["ph", "pd", "pa"]:
                     k = f"mkt_{sfx}_{source}"
-                    feat[k] = _feature_means.get(k, 0.333)
-                feat[f"mkt_margin_{source}"] = _feature_means.get(f"mkt_margin_{source}", 1.05)
+                    feat[k] = b.feature_means.get(k, 0.333)
+                feat[f"mkt_margin_{source}"] = b.feature_means.get(f"mkt_margin_{source}", 1.05)
         feat["has_odds"] = 1.0
     else:
         # Fara cote: folosim medii din antrenament
         for source in ["ps", "avg", "b365", "max"]:
             for sfx in ["ph", "pd", "pa"]:
                 k = f"mkt_{sfx}_{source}"
-                feat[k] = _feature_means.get(k, 0.333)
-            feat[f"mkt_margin_{source}"] = _feature_means.get(f"mkt_margin_{source}", 1.05)
+                feat[k] = b.feature_means.get(k, 0.333)
+            feat[f"mkt_margin_{source}"] = b.feature_means.get(f"mkt_margin_{source}", 1.05)
         feat["has_odds"] = 0.0
 
-    # Diferentiale
-    for col in ["atk_all5", "def_all5", "atk_all10", "def_all10",
-                "atk_venue5", "def_venue5", "win5", "win10",
-                "pts5", "pts10", "win_venue5", "pts_venue5"]:
-        if f"h_{col}" in feat and f"a_{col}" in feat:
-            feat[f"diff_{col}"] = feat[f"h_{col}"] - feat[f"a_{col}"]
-
     # ── Market Intelligence features ────────────────────────────────────────
-    # La inferenta nu avem opening odds → miscarea liniei = 0 (neutral)
-    # Calculam ce putem din cotele curente disponibile
+    # Miscarea liniei: deschiderea din odds_history (odds["open"]) vs cota curenta;
+    # restul din cotele curente disponibile
     _MI_ZERO = ["ps_move_h","ps_move_a","ps_move_d",
                 "home_steamed","away_steamed","home_drifted","away_drifted",
                 "clv_h","clv_a","reverse_line_h","reverse_line_a",
@@ -323,8 +525,8 @@ def _build_feature_vector(home_team: str, away_team: str,
             feat["public_fav_h"] = float(feat["sharp_soft_div_h"] > 0.08)
             feat["public_fav_a"] = float(feat["sharp_soft_div_a"] > 0.08)
         else:
-            feat["sharp_soft_div_h"] = _feature_means.get("sharp_soft_div_h", 0.0)
-            feat["sharp_soft_div_a"] = _feature_means.get("sharp_soft_div_a", 0.0)
+            feat["sharp_soft_div_h"] = b.feature_means.get("sharp_soft_div_h", 0.0)
+            feat["sharp_soft_div_a"] = b.feature_means.get("sharp_soft_div_a", 0.0)
             feat["public_fav_h"] = 0.0
             feat["public_fav_a"] = 0.0
 
@@ -341,7 +543,7 @@ def _build_feature_vector(home_team: str, away_team: str,
             feat["market_vig"] = float(1/max_h + 1/max_d + 1/max_a - 1)
             feat["low_vig"]    = float(feat["market_vig"] < 0.04)
         else:
-            feat["market_vig"] = _feature_means.get("market_vig", 0.05)
+            feat["market_vig"] = b.feature_means.get("market_vig", 0.05)
             feat["low_vig"]    = 0.0
 
         # Value zone 1.60–2.10
@@ -350,16 +552,19 @@ def _build_feature_vector(home_team: str, away_team: str,
         feat["value_zone_h"] = float(1.60 <= ref_h <= 2.10) if ref_h else 0.0
         feat["value_zone_a"] = float(1.60 <= ref_a <= 2.10) if ref_a else 0.0
 
-        # Miscarea liniei necunoscuta la inferenta → 0
-        for col in _MI_ZERO:
-            feat[col] = 0.0
+        # Miscarea liniei (0 daca meciul are un singur snapshot)
+        feat.update(odds_history.line_movement(odds))
+        feat["drift_in_value_h"] = feat["home_drifted"] * feat["value_zone_h"]
+        feat["steam_in_value_a"] = feat["away_steamed"] * feat["value_zone_a"]
+        feat["trap_game_h"] = float(feat["value_zone_h"] == 1 and feat["home_drifted"] == 1
+                                    and feat["sharp_soft_div_h"] > 0.05)
 
     else:
         # Fara cote: folosim medii
         for col in ["sharp_soft_div_h","sharp_soft_div_a","public_fav_h","public_fav_a",
                     "close_var_h","close_var_a","high_cov_h","high_cov_a",
                     "market_vig","low_vig","value_zone_h","value_zone_a"] + _MI_ZERO:
-            feat[col] = _feature_means.get(col, 0.0)
+            feat[col] = b.feature_means.get(col, 0.0)
 
     # Context
     season_month = (month - 8) % 12
@@ -376,8 +581,59 @@ def _build_feature_vector(home_team: str, away_team: str,
     feat["poisson_draw"] = math.exp(-(lam + mu)) * math.exp(2 * math.sqrt(lam * mu) - lam - mu + (lam + mu))
 
     # Aliniere la ordinea exacta de features din model
-    row = {f: feat.get(f, _feature_means.get(f, 0.0)) for f in _features}
-    return pd.DataFrame([row])[_features]
+    for f, v in feat.items():
+        pos = b.feature_pos.get(f)
+        if pos is not None:
+            row[pos] = v
+    return row
+
+
+def predict_matches(fixtures: list, errors: list = None) -> list:
+    """
+    Predictie batch: un singur apel predict_proba pentru toata lista de meciuri.
+    fixtures: lista de dict-uri cu aceleasi chei ca argumentele predict_match
+    (home_team, away_team, odds, league_id, month, league_code).
+    Returneaza lista de rezultate in aceeasi ordine.
+    errors: daca e dat, un meci care esueaza (features / rezultat) nu strica batch-ul —
+    pozitia lui devine None si eroarea se adauga in errors ({"match", "error"});
+    fara errors, prima eroare se propaga (predict_match).
+    """
+    if not fixtures:
+        return []
+    # O singura citire a bundle-ului — un hot-reload concurent nu afecteaza batch-ul curent
+    b = _bundle or load_model()
+
+    def _fail(fx, e):
+        if errors is None:
+            raise e
+        errors.append({"match": f"{fx.get('home_team')} vs {fx.get('away_team')}", "error": str(e)})
+
+    X  = np.empty((len(fixtures), len(b.features)), dtype=np.float32)
+    ok = []
+    for i, fx in enumerate(fixtures):
+        try:
+            X[len(ok)] = _build_feature_row(b, fx["home_team"], fx["away_team"],
+                                            odds=fx.get("odds"),
+                                            league_id=fx.get("league_id", 0),
+                                            month=fx.get("month"),
+                                            league_code=fx.get("league_code", ""))
+            ok.append(i)
+        except Exception as e:
+            _fail(fx, e)
+
+    results = [None] * len(fixtures)
+    if not ok:
+        return results
+    proba = b.model.predict_proba(X[:len(ok)])
+
+    for i, p in zip(ok, proba):
+        fx = fixtures[i]
+        try:
+            results[i] = _result_from_proba(b, fx["home_team"], fx["away_team"], p,
+                                            odds=fx.get("odds"), league_code=fx.get("league_code", ""))
+        except Exception as e:
+            _fail(fx, e)
+    return results
 
 
 def predict_match(
@@ -390,18 +646,22 @@ def predict_match(
     tournament: str = "Friendly",
     league_code: str = "",
 ) -> dict:
-    if _model is None:
-        load_model()
-
-    X = _build_feature_vector(home_team, away_team, odds=odds,
-                              league_id=league_id, month=month,
-                              league_code=league_code)
-
-    proba = _model.predict_proba(X)[0]
-
+    return predict_matches([{
+        "home_team":   home_team,
+        "away_team":   away_team,
+        "odds":        odds,
+        "league_id":   league_id,
+        "month":       month,
+        "league_code": league_code,
+    }])[0]
+
+
+def _result_from_proba(b: ModelBundle, home_team: str, away_team: str, proba: np.ndarray,
+                       odds: dict = None, league_code: str = "") -> dict:
+    """Transforma probabilitatile brute ale modelului in dict-ul de raspuns."""
     # Label encoder: A=0, D=1, H=2 (ordine alfabetica)
-    if _label_encoder is not None:
-        classes = _label_encoder.classes_
+    if b.label_encoder is not None:
+        classes = b.label_encoder.classes_
     else:
         classes = ["A", "D", "H"]
 
@@ -425,8 +685,8 @@ def predict_match(
     else:
         confidence_level = "low"
 
-    h_stats = _team_stats.get(home_team, {})
-    a_stats = _team_stats.get(away_team, {})
+    h_stats = b.team_stats.get(home_team, {})
+    a_stats = b.team_stats.get(away_team, {})
 
     # ── Market Intelligence signals ─────────────────────────────────────────
     edge           = 0.0
@@ -505,8 +765,8 @@ def predict_match(
         "confidence":       _cap(confidence),
         "confidence_level": confidence_level,
         "high_confidence":  confidence >= 0.65,
-        "home_elo":         round(_team_elo(home_team), 0),
-        "away_elo":         round(_team_elo(away_team), 0),
+        "home_elo":         round(_team_elo(b, home_team), 0),
+        "away_elo":         round(_team_elo(b, away_team), 0),
         "home_form":        _cap(h_stats.get("pts5", 0.40)),
         "away_form":        _cap(a_stats.get("pts5", 0.40)),
         "home_venue_form":  _cap(h_stats.get("pts_venue5", 0.40)),
@@ -590,6 +850,5 @@ def apply_injury_adjustment(result: dict, home_team: str, away_team: str, injuri
 
 
 def get_known_teams() -> list:
-    if _team_stats is None:
-        load_model()
-    return sorted(_team_stats.keys())
+    b = _bundle or load_model()
+    return sorted(b.team_stats.keys())
@@ -0,0 +1,294 @@
+"""
+Rate limiter per provider, partajat intre procese (API uvicorn + worker APScheduler).
+
+Fiecare provider extern are un token bucket tinut in Redis (un hash actualizat
+atomic de un script Lua), deci toate procesele consuma din acelasi buget per cheie
+API. Fara Redis (sau daca Redis nu raspunde) se foloseste un bucket local per proces.
+
+Prioritati — cand bugetul e pe terminate, request-urile importante trec primele:
+  PRIORITY_FIXTURES   compute zilnic, rezultate, semnale — rezerva si "pe datorie"
+                      (asteapta la rand pana se reface bugetul)
+  PRIORITY_STANDINGS  endpoint-uri publice — doar din token-uri disponibile
+  PRIORITY_DEBUG      diagnostic — doar daca bucket-ul e cel putin pe jumatate plin
+Un request de prioritate mica nu consuma din datoria celor mari; asteapta cel mult
+_MAX_WAIT secunde, apoi ridica Throttled.
+
+Un 429 goleste bucket-ul partajat pentru Retry-After secunde — celelalte procese
+nu mai trimit nimic in fereastra respectiva (inainte fiecare proces isi lua 429-ul lui).
+
+Metrici: stats() — token-uri ramase, request-uri/429 pe ziua curenta (toate procesele),
+quota ramasa raportata de provider in headere.
+"""
+import time
+import asyncio
+import datetime
+import logging
+import threading
+from collections import defaultdict
+
+import requests
+
+import cache as redis_cache
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_FIXTURES  = 0
+PRIORITY_STANDINGS = 1
+PRIORITY_DEBUG     = 2
+
+# Pragul (fractiune din capacitate) sub care o prioritate nu mai primeste token-uri.
+# None = poate rezerva pe datorie.
+_FLOOR    = {PRIORITY_FIXTURES: None, PRIORITY_STANDINGS: 0.0, PRIORITY_DEBUG: 0.5}
+_MAX_WAIT = {PRIORITY_FIXTURES: 300, PRIORITY_STANDINGS: 10, PRIORITY_DEBUG: 0}
+
+# Limitele free tier ale fiecarui provider
+PROVIDER_LIMITS = {
+    "football-data": {"rate": 10 / 60, "capacity": 10},   # 10 req/min
+    "api-football":  {"rate": 10 / 60, "capacity": 10},   # 10 req/min (100/zi)
+    "the-odds-api":  {"rate": 1.0,     "capacity": 5},    # quota lunara; fara rafale mari
+}
+# 429 fara Retry-After
+DEFAULT_BACKOFF = {"football-data": 30, "api-football": 60, "the-odds-api": 60}
+
+# Headerele cu quota ramasa, per provider
+_QUOTA_HEADERS = {
+    "football-data": ("X-Requests-Available-Minute",),
+    "api-football":  ("x-ratelimit-requests-remaining",),
+    "the-odds-api":  ("x-requests-remaining", "x-requests-used"),
+}
+
+
+class Throttled(requests.RequestException):
+    """Bugetul providerului nu permite request-ul in timpul de asteptare admis."""
+
+
+class TokenBucket:
+    """
+    Token bucket local, thread-safe: `rate` token-uri/secunda, maxim `capacity`.
+    take(floor) intoarce (acordat, asteptare) — aceeasi semantica ca scriptul Lua.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate     = rate
+        self.capacity = capacity
+        self._tokens  = capacity
+        self._ts      = time.monotonic()
+        self._lock    = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._ts) * self.rate)
+        self._ts = now
+
+    def take(self, floor: float = None) -> tuple:
+        with self._lock:
+            self._refill()
+            if floor is None:
+                self._tokens -= 1
+                return True, max(0.0, -self._tokens / self.rate)
+            if self._tokens - 1 < floor:
+                return False, (floor + 1 - self._tokens) / self.rate
+            self._tokens -= 1
+            return True, 0.0
+
+    def penalize(self, seconds: float):
+        """Dupa un 429: niciun request nou timp de `seconds`."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 1 - seconds * self.rate)
+
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+
+# KEYS: bucket, contor zilnic. ARGV: rate, capacity, now, floor ('-' = datorie permisa)
+_TAKE_LUA = """
+local rate = tonumber(ARGV[1]); local cap = tonumber(ARGV[2]); local now = tonumber(ARGV[3])
+local v = redis.call('HMGET', KEYS[1], 't', 'ts')
+local t = tonumber(v[1]) or cap
+local ts = tonumber(v[2]) or now
+if now > ts then t = math.min(cap, t + (now - ts) * rate) else now = ts end
+local wait = 0
+if ARGV[4] == '-' then
+  t = t - 1
+  if t < 0 then wait = -t / rate end
+else
+  local floor = tonumber(ARGV[4])
+  if t - 1 < floor then return {0, tostring((floor + 1 - t) / rate)} end
+  t = t - 1
+end
+redis.call('HSET', KEYS[1], 't', tostring(t), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil((cap - t) / rate) + 60)
+redis.call('HINCRBY', KEYS[2], 'requests', 1)
+redis.call('EXPIRE', KEYS[2], 172800)
+return {1, tostring(wait)}
+"""
+
+# KEYS: bucket, contor zilnic. ARGV: rate, capacity, now, secunde de pauza
+_PENALIZE_LUA = """
+local rate = tonumber(ARGV[1]); local cap = tonumber(ARGV[2]); local now = tonumber(ARGV[3])
+local v = redis.call('HMGET', KEYS[1], 't', 'ts')
+local t = tonumber(v[1]) or cap
+local ts = tonumber(v[2]) or now
+if now > ts then t = math.min(cap, t + (now - ts) * rate) else now = ts end
+t = math.min(t, 1 - tonumber(ARGV[4]) * rate)
+redis.call('HSET', KEYS[1], 't', tostring(t), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil((cap - t) / rate) + 60)
+redis.call('HINCRBY', KEYS[2], 'rate_limited', 1)
+redis.call('EXPIRE', KEYS[2], 172800)
+return tostring(t)
+"""
+
+_local = {name: TokenBucket(**lim) for name, lim in PROVIDER_LIMITS.items()}
+_counters = defaultdict(lambda: defaultdict(float))   # metrici per proces
+_counters_lock = threading.Lock()
+
+
+def _bucket_key(provider: str) -> str:
+    return f"flopi:rl:{provider}"
+
+
+def _day_key(provider: str) -> str:
+    return f"flopi:rl:{provider}:{datetime.date.today().isoformat()}"
+
+
+def _count(provider: str, field: str, n: float = 1):
+    with _counters_lock:
+        _counters[provider][field] += n
+
+
+def _take(provider: str, priority: int) -> tuple:
+    lim   = PROVIDER_LIMITS[provider]
+    frac  = _FLOOR[priority]
+    floor = None if frac is None else frac * lim["capacity"]
+    res = redis_cache._redis([
+        "EVAL", _TAKE_LUA, 2, _bucket_key(provider), _day_key(provider),
+        lim["rate"], lim["capacity"], f"{time.time():.3f}", "-" if floor is None else floor,
+    ])
+    if isinstance(res, list) and len(res) == 2:
+        return bool(int(res[0])), float(res[1])
+    # Redis indisponibil — buget local per proces
+    return _local[provider].take(floor)
+
+
+def _plan(provider: str, priority: int, max_wait: float = None):
+    """Generator de pauze: da secundele de asteptat pana cand request-ul are token."""
+    max_wait = _MAX_WAIT[priority] if max_wait is None else max_wait
+    waited = 0.0
+    while True:
+        granted, wait = _take(provider, priority)
+        if granted:
+            if wait > 0:
+                _count(provider, "waited_s", wait)
+                yield wait
+            _count(provider, "granted")
+            return
+        if waited + wait > max_wait:
+            _count(provider, "throttled")
+            raise Throttled(f"{provider}: buget epuizat (prioritate {priority})")
+        waited += wait
+        _count(provider, "waited_s", wait)
+        yield wait
+
+
+def acquire(provider: str, priority: int = PRIORITY_FIXTURES, max_wait: float = None):
+    """Blocheaza pana cand request-ul se incadreaza in buget; altfel Throttled."""
+    for wait in _plan(provider, priority, max_wait):
+        time.sleep(wait)
+
+
+async def acquire_async(provider: str, priority: int = PRIORITY_FIXTURES, max_wait: float = None):
+    """Ca acquire(), dar fara sa blocheze event loop-ul (Redis apelat din thread)."""
+    plan = _plan(provider, priority, max_wait)
+    while True:
+        wait = await asyncio.to_thread(next, plan, None)
+        if wait is None:
+            return
+        await asyncio.sleep(wait)
+
+
+def penalize(provider: str, seconds: float = None):
+    """Dupa un 429: opreste request-urile catre provider, in toate procesele."""
+    seconds = DEFAULT_BACKOFF[provider] if seconds is None else seconds
+    lim = PROVIDER_LIMITS[provider]
+    _count(provider, "rate_limited")
+    _local[provider].penalize(seconds)
+    redis_cache._redis([
+        "EVAL", _PENALIZE_LUA, 2, _bucket_key(provider), _day_key(provider),
+        lim["rate"], lim["capacity"], f"{time.time():.3f}", seconds,
+    ])
+
+
+def retry_after(provider: str, headers) -> float:
+    """Pauza ceruta de provider la 429 (Retry-After / X-RequestCounter-Reset)."""
+    for h in ("Retry-After", "X-RequestCounter-Reset"):
+        try:
+            return float(headers[h])
+        except (KeyError, TypeError, ValueError):
+            continue
+    return DEFAULT_BACKOFF[provider]
+
+
+def observe(provider: str, headers):
+    """Salveaza quota ramasa raportata de provider (vizibila din toate procesele)."""
+    fields = []
+    for h in _QUOTA_HEADERS.get(provider, ()):
+        v = headers.get(h)
+        if v is not None:
+            fields += [h.lower(), v]
+    if fields:
+        redis_cache._redis(["HSET", f"flopi:rl:quota:{provider}", *fields,
+                            "updated_at", datetime.datetime.utcnow().isoformat()])
+
+
+def get(provider: str, url: str, priority: int = PRIORITY_FIXTURES,
+        max_wait: float = None, **kwargs) -> requests.Response:
+    """
+    requests.get prin bucket-ul providerului. La 429 aplica penalizarea partajata
+    si intoarce raspunsul — logica de retry/fallback ramane la apelant.
+    """
+    acquire(provider, priority, max_wait)
+    resp = requests.get(url, **kwargs)
+    observe(provider, resp.headers)
+    if resp.status_code == 429:
+        penalize(provider, retry_after(provider, resp.headers))
+    return resp
+
+
+def stats() -> dict:
+    """Buget ramas per provider + contoare (zi curenta: toate procesele; local: procesul curent)."""
+    providers = list(PROVIDER_LIMITS)
+    shared = redis_cache._pipeline(
+        [["HMGET", _bucket_key(p), "t", "ts"] for p in providers]
+        + [["HGETALL", _day_key(p)] for p in providers]
+        + [["HGETALL", f"flopi:rl:quota:{p}"] for p in providers]
+    )
+    n = len(providers)
+    out = {}
+    for i, p in enumerate(providers):
+        lim = PROVIDER_LIMITS[p]
+        bucket, day, quota = shared[i], shared[n + i], shared[2 * n + i]
+        tokens = _local[p].tokens()
+        if isinstance(bucket, list) and bucket[0] is not None:
+            t, ts = float(bucket[0]), float(bucket[1])
+            tokens = min(lim["capacity"], t + max(0.0, time.time() - ts) * lim["rate"])
+        with _counters_lock:
+            local = dict(_counters[p])
+        out[p] = {
+            "limit_per_min": round(lim["rate"] * 60, 2),
+            "burst":         lim["capacity"],
+            "tokens":        round(tokens, 2),
+            "today":         _pairs(day),
+            "upstream":      _pairs(quota),
+            "local":         {k: round(v, 1) for k, v in local.items()},
+        }
+    return {"backend": "redis" if redis_cache._REDIS_URL else "memory", "providers": out}
+
+
+def _pairs(flat) -> dict:
+    # HGETALL prin REST intoarce [camp, valoare, camp, valoare, ...]
+    if not isinstance(flat, list):
+        return {}
+    return dict(zip(flat[::2], flat[1::2]))
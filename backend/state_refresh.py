@@ -0,0 +1,297 @@
+"""
+Refresh incremental al starii modelului — fara retrain.
+
+team_stats, elo_ratings si h2h_history din artefact se calculau doar in train.main()
+(toate CSV-urile, tot istoricul, Optuna). Aici le actualizam zilnic din rezultatele
+FINISHED pe care auto_mark_results le descarca oricum la 23:30: O(meciuri de azi).
+
+Starea de care e nevoie in plus fata de artefact (<model>.state.pkl, scrisa la antrenare):
+  windows   echipa -> ultimele 10 meciuri, ultimele 5 acasa / in deplasare,
+            lungimea seriei curente (streak) si numarul total de meciuri
+  as_of     ultima data din CSV-urile de antrenare — meciurile <= as_of sunt deja incluse
+  last_applied   high-water mark: ultima zi aplicata (initial = as_of); meciurile din
+            zilele anterioare se resping — ferestrele, Elo si H2H cer ordine cronologica,
+            iar o zi deja aplicata nu se mai numara a doua oara (ex. backfill pe interval vechi)
+  applied   id-urile aplicate din ziua last_applied (aceeasi zi rulata din nou aplica
+            doar meciurile terminate intre timp)
+  elo_k / elo_home   constantele Elo ale trainer-ului
+
+Clasificatorul ramane neatins; se republica doar tabelele (pickle + split), iar
+watcher-ul de hot-reload din API le preia.
+
+Bootstrap pentru un model antrenat inainte de fisierul de stare:
+    python state_refresh.py [model.pkl ...]
+"""
+import os
+import pickle
+import logging
+
+from elo_index import build_team_elo_index, DEFAULT_ELO
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR    = os.path.dirname(os.path.abspath(__file__))
+MODEL_PATHS = [os.path.join(BASE_DIR, "model.pkl"), os.path.join(BASE_DIR, "model_no_odds.pkl")]
+H2H_KEEP    = 6
+
+
+def state_path(model_path: str) -> str:
+    return f"{os.path.splitext(model_path)[0]}.state.pkl"
+
+
+# ─── Ferestre per echipa ────────────────────────────────────────────────────
+
+def team_window(records: list) -> dict:
+    """Istoricul complet al unei echipe (features.build_team_features) -> fereastra compacta."""
+    run = 0
+    if records:
+        last = records[-1]["pts"]
+        for r in reversed(records):
+            if r["pts"] != last:
+                break
+            run += 1
+    return {
+        "last": records[-10:],
+        "home": [r for r in records if r["is_home"]][-5:],
+        "away": [r for r in records if not r["is_home"]][-5:],
+        "run":  run,
+        "n":    len(records),
+    }
+
+
+def _push(w: dict, rec: dict):
+    if w["last"] and w["last"][-1]["pts"] == rec["pts"]:
+        w["run"] += 1
+    else:
+        w["run"] = 1
+    w["last"] = (w["last"] + [rec])[-10:]
+    venue = "home" if rec["is_home"] else "away"
+    w[venue] = (w[venue] + [rec])[-5:]
+    w["n"] += 1
+
+
+def stats_from_window(w: dict, team_elo: float) -> dict:
+    """Intrarea din team_stats pentru o echipa (acelasi dict ca features.build_team_stats)."""
+    last10 = w["last"]
+    last5  = last10[-5:]
+    home5  = w["home"]
+    away5  = w["away"]
+
+    def avg(lst, key, default=1.3):
+        return sum(r[key] for r in lst) / len(lst) if lst else default
+
+    def avg_xg(lst, key):
+        vals = [r[key] for r in lst if r.get(key) is not None]
+        return sum(vals) / len(vals) if vals else None
+
+    def win_rate(lst):
+        return sum(1 for r in lst if r["pts"] == 3) / len(lst) if lst else 0.40
+
+    def pts_rate(lst):
+        return sum(r["pts"] for r in lst) / (3 * len(lst)) if lst else 0.40
+
+    last_pts = last10[-1]["pts"] if last10 else None
+    streak = w["run"] if last_pts == 3 else (-w["run"] if last_pts == 0 else 0)
+
+    return {
+        # All games
+        "atk_all5":    avg(last5, "gf"),
+        "def_all5":    avg(last5, "ga"),
+        "atk_all10":   avg(last10, "gf"),
+        "def_all10":   avg(last10, "ga"),
+        # Home venue stats
+        "atk_home5":   avg(home5, "gf", 1.4),
+        "def_home5":   avg(home5, "ga", 1.1),
+        "win_home5":   win_rate(home5),
+        "pts_home5":   pts_rate(home5),
+        # Away venue stats
+        "atk_away5":   avg(away5, "gf", 1.1),
+        "def_away5":   avg(away5, "ga", 1.3),
+        "win_away5":   win_rate(away5),
+        "pts_away5":   pts_rate(away5),
+        # Form
+        "win5":        win_rate(last5),
+        "win10":       win_rate(last10),
+        "draw5":       sum(1 for r in last5 if r["pts"] == 1) / max(len(last5), 1),
+        "pts5":        pts_rate(last5),
+        "pts10":       pts_rate(last10),
+        "btts5":       sum(1 for r in last5 if r["gf"] > 0 and r["ga"] > 0) / max(len(last5), 1),
+        "over25_5":    sum(1 for r in last5 if r["gf"] + r["ga"] > 2) / max(len(last5), 1),
+        "clean5":      sum(1 for r in last5 if r["ga"] == 0) / max(len(last5), 1),
+        "streak":      streak,
+        "n_matches":   w["n"],
+        "elo":         team_elo,
+        # xG real rolling (None daca datele Understat lipsesc pentru aceasta echipa)
+        "xgf_home5":   avg_xg(home5, "xgf"),
+        "xga_home5":   avg_xg(home5, "xga"),
+        "xgf_away5":   avg_xg(away5, "xgf"),
+        "xga_away5":   avg_xg(away5, "xga"),
+        "xgf_all5":    avg_xg(last5, "xgf"),
+        "xga_all5":    avg_xg(last5, "xga"),
+    }
+
+
+# ─── Stare pe disc ──────────────────────────────────────────────────────────
+
+def _atomic_pickle(path: str, obj):
+    # Scriere atomica — watcher-ul de hot-reload din API nu vede un pickle partial
+    with open(path + ".tmp", "wb") as f:
+        pickle.dump(obj, f)
+    os.replace(path + ".tmp", path)
+
+
+def save_state(model_path: str, hist: dict, as_of, elo_k: float, elo_home: float):
+    """Apelat de features.save_model dupa salvarea modelului."""
+    state = {
+        "windows":      {team: team_window(recs) for team, recs in hist.items() if recs},
+        "as_of":        str(as_of)[:10],
+        "last_applied": str(as_of)[:10],
+        "applied":      {},
+        "elo_k":        elo_k,
+        "elo_home":     elo_home,
+    }
+    _atomic_pickle(state_path(model_path), state)
+    print(f"[state] Stare salvata: {state_path(model_path)} ({len(state['windows'])} echipe, as_of={state['as_of']})")
+
+
+def load_state(model_path: str) -> dict | None:
+    try:
+        with open(state_path(model_path), "rb") as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _load_artifact(model_path: str) -> dict:
+    # Pickle-ul are dict-urile complete; artefactul split doar daca pickle-ul lipseste
+    if os.path.exists(model_path):
+        with open(model_path, "rb") as f:
+            return pickle.load(f)
+    import model_store
+    data = model_store.load(model_path)
+    data["team_stats"]  = {t: data["team_stats"][t] for t in data["team_stats"]}
+    data["h2h_history"] = {k: data["h2h_history"][k] for k in data["h2h_history"]}
+    return data
+
+
+def _publish(model_path: str, data: dict):
+    import model_store
+    model_store.save(model_path, data)
+
+
+# ─── Refresh ────────────────────────────────────────────────────────────────
+
+def _result(hg: int, ag: int) -> str:
+    return "H" if hg > ag else ("A" if hg < ag else "D")
+
+
+def _match_id(m: dict):
+    return m.get("id") or f"{m['date']}|{m['home']}|{m['away']}"
+
+
+def refresh_model(model_path: str, matches: list) -> dict:
+    """
+    Aplica meciurile terminate pe starea unui model si republica artefactul.
+    matches: dict-uri {id, date, div, home, away, home_goals, away_goals} cu nume
+    normalizate la numele modelului, in ordinea kickoff-ului.
+    """
+    import elo_engine
+
+    name = os.path.basename(model_path)
+    state = load_state(model_path)
+    if state is None:
+        logger.warning("[state] %s: fara %s — ruleaza train sau `python state_refresh.py`",
+                       name, os.path.basename(state_path(model_path)))
+        return {"applied": 0, "error": "no state"}
+
+    windows = state["windows"]
+    applied = state["applied"]
+    # Stari scrise inainte de high-water mark: ultima zi din `applied`, altfel as_of
+    hwm = state.get("last_applied") or max([state["as_of"], *applied.values()])
+    stale = [m for m in matches if m["date"] < hwm or m["date"] <= state["as_of"]]
+    if stale:
+        logger.info("[state] %s: %d meciuri ignorate (zile <= %s deja aplicate)", name, len(stale), hwm)
+    new = [m for m in matches
+           if m["date"] >= hwm and m["date"] > state["as_of"]
+           and not (m["date"] == hwm and _match_id(m) in applied)
+           and m["home"] in windows and m["away"] in windows]
+    if not new:
+        return {"applied": 0, "skipped": len(stale)}
+
+    data = _load_artifact(model_path)
+    elo  = dict(data.get("elo_ratings", {}))
+    h2h  = data.get("h2h_history", {})
+    # Doar ligile pe care a fost antrenat modelul (fara cupe europene — nu sunt in CSV)
+    divs = {k.split("|", 1)[0] for k in elo}
+    new  = [m for m in new if m["div"] in divs]
+    if not new:
+        return {"applied": 0, "skipped": len(stale)}
+
+    # Elo — acelasi motor si aceleasi constante ca la antrenare, pornind de la ratingurile curente
+    keys = list(dict.fromkeys(k for m in new for k in (f"{m['div']}|{m['home']}", f"{m['div']}|{m['away']}")))
+    kid  = {k: i for i, k in enumerate(keys)}
+    score = [{"H": 1.0, "D": 0.5, "A": 0.0}[_result(m["home_goals"], m["away_goals"])] for m in new]
+    _, _, _, ratings = elo_engine.replay(
+        [kid[f"{m['div']}|{m['home']}"] for m in new],
+        [kid[f"{m['div']}|{m['away']}"] for m in new],
+        score, len(keys), k=state["elo_k"], home_adv=state["elo_home"],
+        init=[elo.get(k, DEFAULT_ELO) for k in keys],
+    )
+    elo.update(zip(keys, ratings.tolist()))
+
+    touched = set()
+    for m in new:
+        hg, ag = float(m["home_goals"]), float(m["away_goals"])
+        ftr = _result(hg, ag)
+        h_pts = 3 if ftr == "H" else (1 if ftr == "D" else 0)
+        a_pts = 3 if ftr == "A" else (1 if ftr == "D" else 0)
+        _push(windows[m["home"]], {"gf": hg, "ga": ag, "is_home": True, "pts": h_pts, "xgf": None, "xga": None})
+        _push(windows[m["away"]], {"gf": ag, "ga": hg, "is_home": False, "pts": a_pts, "xgf": None, "xga": None})
+        key = tuple(sorted((m["home"], m["away"])))
+        h2h[key] = (list(h2h.get(key, [])) + [
+            {"home": m["home"], "away": m["away"], "ftr": ftr, "hg": hg, "ag": ag}])[-H2H_KEEP:]
+        touched.update((m["home"], m["away"]))
+        applied[_match_id(m)] = m["date"]
+
+    elo_idx = build_team_elo_index(elo)
+    team_stats = data.get("team_stats", {})
+    for team in touched:
+        team_stats[team] = stats_from_window(windows[team], elo_idx.get(team, DEFAULT_ELO))
+
+    data["elo_ratings"] = elo
+    data["h2h_history"] = h2h
+    data["team_stats"]  = team_stats
+    _publish(model_path, data)
+
+    last = max(hwm, max(m["date"] for m in new))
+    state["last_applied"] = last
+    state["applied"] = {k: d for k, d in applied.items() if d == last}
+    _atomic_pickle(state_path(model_path), state)
+
+    logger.info("[state] %s: %d meciuri aplicate, %d echipe actualizate (last_applied=%s)",
+                name, len(new), len(touched), last)
+    return {"applied": len(new), "teams": len(touched), "skipped": len(stale)}
+
+
+def refresh_from_results(matches: list) -> dict:
+    """Ambele modele (model.pkl + model_no_odds.pkl), cele lipsa se sar."""
+    matches = sorted(matches, key=lambda m: m.get("kickoff") or "")
+    out = {}
+    for path in MODEL_PATHS:
+        if os.path.exists(path) or os.path.exists(state_path(path)):
+            out[os.path.basename(path)] = refresh_model(path, matches)
+    return out
+
+
+def bootstrap(model_path: str):
+    """Stare din CSV-urile curente, pentru un model antrenat inainte de fisierul de stare."""
+    import features
+    data = features.preprocess(features.load_data(with_odds=False), with_odds=False)
+    _, hist = features.build_team_features(data, xg_lookup=features.load_xg_data())
+    save_state(model_path, hist, data["Date"].max(), features.ELO_K, features.ELO_HOME)
+
+
+if __name__ == "__main__":
+    import sys
+    for p in sys.argv[1:] or MODEL_PATHS:
+        bootstrap(os.path.abspath(p))
@@ -0,0 +1,143 @@
+"""
+Raspunsuri streamed (NDJSON / JSON chunked) pentru endpoint-urile cu istoric mare.
+
+/api/track-record/history, /api/admin/picks/results, /api/admin/bet-signals si
+/api/admin/users construiau toata lista in memorie si o serializau dintr-o bucata.
+Cu ?stream=ndjson (sau ?stream=json) aceleasi date se citesc din Supabase pagina cu
+pagina (PAGE_SIZE randuri) si se scriu pe masura ce vin — memoria per request nu
+mai depinde de cat istoric exista.
+
+Paginare keyset, nu offset: fiecare pagina continua dupa cheia ultimului rand
+(ex. (pick_date, id)), deci pagina N costa la fel ca pagina 1. Ultima linie NDJSON
+(sau campul next_cursor din JSON) e cursorul opac pentru pagina urmatoare — null
+cand nu mai sunt randuri; clientul il trimite inapoi in ?cursor=.
+
+Format NDJSON: un rand per linie, apoi {"next_cursor": ..., "count": n}.
+Format JSON:   {"<camp>": [...], "next_cursor": ..., "count": n}, scris in bucati.
+"""
+import json
+import base64
+import logging
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 200
+FORMATS   = ("ndjson", "json")
+
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list | None:
+    """Cursorul primit de la client -> lista de valori; None daca e invalid."""
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        return None
+    return values if isinstance(values, list) else None
+
+
+def _quote(v) -> str:
+    # Valorile din filtrele or=() ale PostgREST — ghilimele pentru ':', ',', '+' din timestamp-uri
+    return '"' + str(v).replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _after(key: tuple, last: list, desc: bool) -> str:
+    """Filtrul or=() pentru "dupa (k1, k2, ...) = last" in ordinea cheii."""
+    op = "lt" if desc else "gt"
+    terms = []
+    for i, col in enumerate(key):
+        eqs = [f"{c}.eq.{_quote(v)}" for c, v in zip(key[:i], last[:i])]
+        cond = f"{col}.{op}.{_quote(last[i])}"
+        terms.append(f"and({','.join(eqs + [cond])})" if eqs else cond)
+    return ",".join(terms)
+
+
+class KeysetPager:
+    """
+    Iterator peste randurile unui query Supabase, pagina cu pagina, in ordinea `key`.
+    query(): un query builder nou (select + filtre), fara order/limit.
+    Dupa iterare, next_cursor e cursorul paginii urmatoare (None la final).
+    carry: stare calculata pe parcurs (ex. equity) care trebuie sa continue in
+    pagina urmatoare — se codifica in cursor dupa valorile cheii.
+    """
+
+    def __init__(self, query, key: tuple, desc: bool = True, cursor: str = None,
+                 limit: int = None, page: int = PAGE_SIZE):
+        self.query  = query
+        self.key    = key
+        self.desc   = desc
+        self.last   = decode_cursor(cursor)
+        self.carry  = None
+        if self.last is not None and len(self.last) < len(key):
+            self.last = None
+        elif self.last is not None:
+            self.carry = self.last[len(key)] if len(self.last) > len(key) else None
+            self.last  = self.last[:len(key)]
+        self.limit  = limit
+        self.page   = page
+        self.count  = 0
+        self.next_cursor = None
+
+    def __iter__(self):
+        while self.limit is None or self.count < self.limit:
+            q = self.query()
+            if self.last is not None:
+                q = q.or_(_after(self.key, self.last, self.desc))
+            for col in self.key:
+                q = q.order(col, desc=self.desc)
+            n = self.page if self.limit is None else min(self.page, self.limit - self.count)
+            rows = q.limit(n).execute().data or []
+            for row in rows:
+                yield row
+            self.count += len(rows)
+            if rows:
+                self.last = [rows[-1].get(c) for c in self.key]
+            if len(rows) < n:
+                self.next_cursor = None
+                return
+        self.next_cursor = encode_cursor(self.last + ([self.carry] if self.carry is not None else []))
+
+
+def _dumps(obj) -> str:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def _body(rows, pager: KeysetPager, fmt: str, field: str, extra):
+    """Generatorul raspunsului; erorile din mijlocul stream-ului devin ultima linie/camp."""
+    error = None
+    if fmt == "json":
+        yield f'{{"{field}":['
+    try:
+        first = True
+        for row in rows:
+            if fmt == "ndjson":
+                yield _dumps(row) + "\n"
+            else:
+                yield ("" if first else ",") + _dumps(row)
+                first = False
+    except Exception as e:
+        logger.error("[stream] %s: %s", field, e)
+        error = str(e)
+    tail = {"next_cursor": pager.next_cursor, "count": pager.count, **(extra() if extra else {})}
+    if error:
+        tail["error"] = error
+    if fmt == "ndjson":
+        yield _dumps(tail) + "\n"
+    else:
+        yield "]," + _dumps(tail)[1:]
+
+
+def response(rows, pager: KeysetPager, fmt: str, field: str = "results", extra=None):
+    """
+    StreamingResponse pentru `rows` (iterator, de obicei pager-ul insusi sau o
+    transformare peste el). extra(): campuri adaugate in linia finala, calculate
+    dupa ultimul rand (ex. sumarul equity).
+    """
+    from fastapi.responses import StreamingResponse
+    media = "application/x-ndjson" if fmt == "ndjson" else "application/json"
+    return StreamingResponse(_body(rows, pager, fmt, field, extra), media_type=media)
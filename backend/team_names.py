@@ -0,0 +1,687 @@
+"""
+Rezolvare nume echipe: furnizori externi (football-data.org, The-Odds-API, Club-elo,
+api-football, Understat) -> numele din model (CSV football-data.co.uk).
+
+Inainte, fixtures._normalize_name si bet_signal._normalize_team cadeau pe
+difflib.get_close_matches contra intregii liste known_teams (uneori de doua ori per
+nume) — O(N) SequenceMatcher pentru fiecare fixture, eveniment de cote si rezultat.
+
+Aici:
+  1. mapari explicite (FDORG_TO_MODEL, CLUBELO_TO_MODEL, UNDERSTAT_TO_CSV) — dict,
+     dupa cheia normalizata (fara diacritice, lowercase, fara punctuatie);
+  2. potrivire exacta pe cheie, apoi pe cheia fara sufixe/prefixe de club (FC, AFC, CF...);
+  3. fuzzy doar pe candidatii care au trigrame comune (index inversat), scorati cu
+     acelasi SequenceMatcher.ratio si aceleasi praguri ca inainte (0.70 / 0.65);
+  4. memo in proces + hash Redis per set de echipe cunoscute (se incarca o data cu
+     HGETALL, rezolvarile noi se scriu cu HSET) — un nume se rezolva fuzzy o singura
+     data pentru toate procesele.
+
+API: resolve(raw, known_teams) -> nume model (sau raw daca nu se gaseste nimic).
+Benchmark (payload de 300 de evenimente de cote): python team_names.py
+"""
+import re
+import hashlib
+import logging
+import threading
+import unicodedata
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+from club_elo import CLUBELO_TO_MODEL
+
+logger = logging.getLogger(__name__)
+
+CUTOFF_CLEANED = 0.70
+CUTOFF_RAW     = 0.65
+MAX_CANDIDATES = 12
+REDIS_TTL      = 30 * 86400
+
+# Sufixe / prefixe de club ignorate la potrivire ("Arsenal FC", "AC Milan", "1. FC Koln")
+_AFFIXES = {"fc", "afc", "cf", "sc", "ac", "cd", "ud", "sd", "ssc", "as", "rc", "sv", "vfb",
+            "vfl", "tsg", "fk", "sk", "bk", "if", "club", "calcio", "1"}
+
+# football-data.org / The-Odds-API -> nume model
+# Formatul football-data.org: "Arsenal FC", "Manchester City FC", etc.
+FDORG_TO_MODEL = {
+    # Premier League
+    "Arsenal FC":                "Arsenal",
+    "Chelsea FC":                "Chelsea",
+    "Liverpool FC":              "Liverpool",
+    "Manchester City FC":        "Man City",
+    "Manchester United FC":      "Man United",
+    "Tottenham Hotspur FC":      "Tottenham",
+    "Newcastle United FC":       "Newcastle",
+    "Aston Villa FC":            "Aston Villa",
+    "West Ham United FC":        "West Ham",
+    "Brighton & Hove Albion FC": "Brighton",
+    "Brentford FC":              "Brentford",
+    "Fulham FC":                 "Fulham",
+    "Crystal Palace FC":         "Crystal Palace",
+    "Wolverhampton Wanderers FC":"Wolves",
+    "Everton FC":                "Everton",
+    "Nottingham Forest FC":      "Nott'm Forest",
+    "AFC Bournemouth":           "Bournemouth",
+    "Leicester City FC":         "Leicester",
+    "Southampton FC":            "Southampton",
+    "Ipswich Town FC":           "Ipswich",
+    "Leeds United FC":           "Leeds",
+    "Sheffield United FC":       "Sheffield Utd",
+    "Burnley FC":                "Burnley",
+    "Luton Town FC":             "Luton",
+    "Watford FC":                "Watford",
+    "Norwich City FC":           "Norwich",
+    "Sunderland AFC":            "Sunderland",
+    "Swansea City AFC":          "Swansea",
+    "Stoke City FC":             "Stoke",
+    "Queens Park Rangers FC":    "QPR",
+    "West Bromwich Albion FC":   "West Brom",
+    "Middlesbrough FC":          "Middlesbrough",
+    "Huddersfield Town AFC":     "Huddersfield",
+    "Cardiff City FC":           "Cardiff",
+    # Bundesliga
+    "FC Bayern München":         "Bayern Munich",
+    "Borussia Dortmund":         "Dortmund",
+    "Bayer 04 Leverkusen":       "Leverkusen",
+    "RB Leipzig":                "RB Leipzig",
+    "VfB Stuttgart":             "Stuttgart",
+    "Borussia Mönchengladbach":  "M'gladbach",
+    "Eintracht Frankfurt":       "Ein Frankfurt",
+    "TSG 1899 Hoffenheim":       "Hoffenheim",
+    "SC Freiburg":               "Freiburg",
+    "VfL Wolfsburg":             "Wolfsburg",
+    "1. FC Union Berlin":        "Union Berlin",
+    "1. FSV Mainz 05":           "Mainz",
+    "FC Augsburg":               "Augsburg",
+    "FC Köln":                   "FC Koln",
+    "Hertha BSC":                "Hertha",
+    "VfL Bochum 1848":           "Bochum",
+    "Werder Bremen":             "Werder Bremen",
+    "SV Darmstadt 98":           "Darmstadt",
+    "1. FC Heidenheim 1846":     "Heidenheim",
+    "Holstein Kiel":             "Holstein Kiel",
+    "FC St. Pauli 1910":         "St. Pauli",
+    "Hannover 96":               "Hannover",
+    "Fortuna Düsseldorf":        "Dusseldorf",
+    "Schalke 04":                "Schalke 04",
+    "Arminia Bielefeld":         "Bielefeld",
+    # Serie A
+    "Juventus FC":               "Juventus",
+    "AC Milan":                  "Milan",
+    "FC Internazionale Milano":  "Inter",
+    "SSC Napoli":                "Napoli",
+    "AS Roma":                   "Roma",
+    "SS Lazio":                  "Lazio",
+    "Atalanta BC":               "Atalanta",
+    "ACF Fiorentina":            "Fiorentina",
+    "Torino FC":                 "Torino",
+    "Bologna FC 1909":           "Bologna",
+    "Genoa CFC":                 "Genoa",
+    "UC Sampdoria":              "Sampdoria",
+    "Udinese Calcio":            "Udinese",
+    "Cagliari Calcio":           "Cagliari",
+    "Hellas Verona FC":          "Verona",
+    "Parma Calcio 1913":         "Parma",
+    "US Sassuolo Calcio":        "Sassuolo",
+    "Venezia FC":                "Venezia",
+    "Spezia Calcio":             "Spezia",
+    "US Salernitana 1919":       "Salernitana",
+    "US Lecce":                  "Lecce",
+    "Empoli FC":                 "Empoli",
+    "Frosinone Calcio":          "Frosinone",
+    "Como 1907":                 "Como",
+    "Monza":                     "Monza",
+    # La Liga
+    "Real Madrid CF":            "Real Madrid",
+    "FC Barcelona":              "Barcelona",
+    "Atlético de Madrid":        "Ath Madrid",
+    "Sevilla FC":                "Sevilla",
+    "Valencia CF":               "Valencia",
+    "Villarreal CF":             "Villarreal",
+    "Real Betis Balompié":       "Betis",
+    "Real Sociedad de Fútbol":   "Sociedad",
+    "Athletic Club":             "Ath Bilbao",
+    "Rayo Vallecano de Madrid":  "Rayo Vallecano",
+    "RCD Espanyol de Barcelona": "Espanol",
+    "Getafe CF":                 "Getafe",
+    "RC Celta de Vigo":          "Celta",
+    "Deportivo Alavés":          "Alaves",
+    "Granada CF":                "Granada",
+    "Girona FC":                 "Girona",
+    "UD Las Palmas":             "Las Palmas",
+    "CA Osasuna":                "Osasuna",
+    "Real Valladolid CF":        "Valladolid",
+    "Cádiz CF":                  "Cadiz",
+    "RCD Mallorca":              "Mallorca",
+    "Almería":                   "Almeria",
+    "UD Almería":                "Almeria",
+    "Deportivo La Coruña":       "Deportivo",
+    "Leganés":                   "Leganes",
+    # The-Odds-API La Liga (fara accente / forme scurte)
+    "Deportivo Alaves":          "Alaves",
+    "Alaves":                    "Alaves",
+    "Atletico Madrid":           "Ath Madrid",
+    "Club Atletico de Madrid":   "Ath Madrid",
+    "Athletic Bilbao":           "Ath Bilbao",
+    "Celta Vigo":                "Celta",
+    "Real Betis":                "Betis",
+    "Real Sociedad":             "Sociedad",
+    "Espanyol":                  "Espanol",
+    "Espanol":                   "Espanol",
+    "Cadiz":                     "Cadiz",
+    "Leganes":                   "Leganes",
+    "Las Palmas":                "Las Palmas",
+    # The-Odds-API Premier League
+    "Manchester City":           "Man City",
+    "Manchester United":         "Man United",
+    "Tottenham Hotspur":         "Tottenham",
+    "Nottingham Forest":         "Nott'm Forest",
+    "West Ham United":           "West Ham",
+    "Newcastle United":          "Newcastle",
+    "Brighton and Hove Albion":  "Brighton",
+    "Brighton & Hove Albion":    "Brighton",
+    "Wolverhampton Wanderers":   "Wolverhampton",
+    "Sheffield United":          "Sheffield Utd",
+    "Leicester City":            "Leicester",
+    "Luton Town":                "Luton",
+    "Ipswich Town":              "Ipswich",
+    "Leeds United":              "Leeds",
+    # The-Odds-API Bundesliga
+    "Borussia Dortmund":         "Dortmund",
+    "Bayer Leverkusen":          "Leverkusen",
+    "Eintracht Frankfurt":       "Ein Frankfurt",
+    "Mainz 05":                  "Mainz",
+    "Cologne":                   "FC Koln",
+    "VfL Bochum":                "Bochum",
+    "Monchengladbach":           "M'gladbach",
+    "Borussia Monchengladbach":  "M'gladbach",
+    # The-Odds-API Serie A
+    "AC Milan":                  "Milan",
+    "Inter Milan":               "Inter",
+    "Internazionale":            "Inter",
+    "AS Roma":                   "Roma",
+    "SS Lazio":                  "Lazio",
+    "Hellas Verona":             "Verona",
+    # The-Odds-API Ligue 1
+    "Paris Saint Germain":       "Paris SG",
+    "PSG":                       "Paris SG",
+    "Olympique Marseille":       "Marseille",
+    "Olympique Lyonnais":        "Lyon",
+    "Stade Brestois":            "Brest",
+    "Lens":                      "Lens",
+    "Le Havre":                  "Le Havre",
+    # The-Odds-API Primeira Liga
+    "Sporting CP":               "Sporting CP",
+    "SL Benfica":                "Benfica",
+    "Benfica":                   "Benfica",
+    "Sporting Braga":            "Sp Braga",
+    "SC Braga":                  "Sp Braga",
+    "Vitoria Guimaraes":         "Vitoria Guimaraes",
+    "Vitoria SC":                "Vitoria SC",
+    "Gil Vicente":               "Gil Vicente",
+    # Champions League / Europa
+    "Real Madrid":               "Real Madrid",
+    "FC Barcelona":              "Barcelona",
+    "Barcelona":                 "Barcelona",
+    # Ligue 1
+    "Paris Saint-Germain FC":    "Paris SG",
+    "Olympique de Marseille":    "Marseille",
+    "Olympique Lyonnais":        "Lyon",
+    "AS Monaco FC":              "Monaco",
+    "LOSC Lille":                "Lille",
+    "Stade Rennais FC 1901":     "Rennes",
+    "OGC Nice":                  "Nice",
+    "RC Lens":                   "Lens",
+    "RC Strasbourg Alsace":      "Strasbourg",
+    "Montpellier HSC":           "Montpellier",
+    "Stade de Reims":            "Reims",
+    "FC Nantes":                 "Nantes",
+    "Toulouse FC":               "Toulouse",
+    "Angers SCO":                "Angers",
+    "FC Metz":                   "Metz",
+    "Stade Brestois 29":         "Brest",
+    "Le Havre AC":               "Le Havre",
+    "AJ Auxerre":                "Auxerre",
+    "AS Saint-Étienne":          "St Etienne",
+    "Girondins de Bordeaux":     "Bordeaux",
+    # Championship (E1)
+    "Sheffield Wednesday FC":    "Sheffield Weds",
+    "Millwall FC":               "Millwall",
+    "Bristol City FC":           "Bristol City",
+    "Hull City AFC":             "Hull",
+    "Preston North End FC":      "Preston",
+    "Rotherham United FC":       "Rotherham",
+    "Wigan Athletic FC":         "Wigan",
+    "Derby County FC":           "Derby",
+    "Bolton Wanderers FC":       "Bolton",
+    "Reading FC":                "Reading",
+    "Birmingham City FC":        "Birmingham",
+    "Blackburn Rovers FC":       "Blackburn",
+    "Blackpool FC":              "Blackpool",
+    "Coventry City FC":          "Coventry",
+    "Oxford United FC":          "Oxford",
+    "Portsmouth FC":             "Portsmouth",
+    "Plymouth Argyle FC":        "Plymouth",
+    "Middlesbrough FC":          "Middlesbrough",
+    "Cardiff City FC":           "Cardiff",
+    "Swansea City AFC":          "Swansea",
+    "Bristol Rovers FC":         "Bristol Rovers",
+    "Charlton Athletic FC":      "Charlton",
+    "Barnsley FC":               "Barnsley",
+    "Peterborough United FC":    "Peterborough",
+    "Exeter City FC":            "Exeter",
+    "Shrewsbury Town FC":        "Shrewsbury",
+    # 2. Bundesliga (D2)
+    "Hamburger SV":              "Hamburg",
+    "FC Schalke 04":             "Schalke 04",
+    "1. FC Nürnberg":            "Nurnberg",
+    "SpVgg Greuther Fürth":      "Greuther Furth",
+    "SSV Jahn Regensburg":       "Regensburg",
+    "1. FC Magdeburg":           "Magdeburg",
+    "SC Paderborn 07":           "Paderborn",
+    "SV Sandhausen":             "Sandhausen",
+    "FC Ingolstadt 04":          "Ingolstadt",
+    "Dynamo Dresden":            "Dresden",
+    "Erzgebirge Aue":            "Erzgebirge Aue",
+    "MSV Duisburg":              "Duisburg",
+    "Karlsruher SC":             "Karlsruhe",
+    "SV Waldhof Mannheim":       "Mannheim",
+    "Preußen Münster":           "Munster",
+    "Eintracht Braunschweig":    "Braunschweig",
+    "Hertha BSC":                "Hertha",
+    # Serie B (I2)
+    "Palermo FC":                "Palermo",
+    "Brescia Calcio":            "Brescia",
+    "US Ascoli":                 "Ascoli",
+    "Benevento Calcio":          "Benevento",
+    "US Cremonese":              "Cremonese",
+    "AC Perugia Calcio":         "Perugia",
+    "Pisa SC":                   "Pisa",
+    "Pisa Sporting Club":        "Pisa",
+    "Reggiana":                  "Reggiana",
+    "Modena FC":                 "Modena",
+    "Cittadella":                "Cittadella",
+    "FC Südtirol":               "Sudtirol",
+    "Cosenza Calcio":            "Cosenza",
+    "Carrarese Calcio":          "Carrarese",
+    "Mantova 1911":              "Mantova",
+    "SS Juve Stabia":            "Juve Stabia",
+    "Cesena FC":                 "Cesena",
+    "SSC Bari":                  "Bari",
+    "Catanzaro":                 "Catanzaro",
+    "Frosinone Calcio":          "Frosinone",
+    "Sampdoria":                 "Sampdoria",
+    # Ligue 2 (F2)
+    "FC Lorient":                "Lorient",
+    "FC Troyes AC":              "Troyes",
+    "ES Troyes AC":              "Troyes",
+    "Paris FC":                  "Paris FC",
+    "Valenciennes FC":           "Valenciennes",
+    "Grenoble Foot 38":          "Grenoble",
+    "Clermont Foot 63":          "Clermont",
+    "SO Cholet":                 "Cholet",
+    "USL Dunkerque":             "Dunkerque",
+    "SM Caen":                   "Caen",
+    "Amiens SC":                 "Amiens",
+    "FC Sochaux-Montbéliard":    "Sochaux",
+    "Dijon FCO":                 "Dijon",
+    "Laval":                     "Laval",
+    "Niort":                     "Niort",
+    "Red Star FC":               "Red Star",
+    "AS Nancy-Lorraine":         "Nancy",
+    "US Concarneau":             "Concarneau",
+    "Pau FC":                    "Pau",
+    "Rodez AF":                  "Rodez",
+    "Quevilly-Rouen Métropole":  "Quevilly Rouen",
+    "Saint-Brieuc":              "Saint-Brieuc",
+    "AC Ajaccio":                "Ajaccio",
+    "Gazelec Ajaccio":           "Ajaccio GFCO",
+    "Stade Lavallois":           "Laval",
+    "Bastia":                    "Bastia",
+    # La Liga 2 / Segunda División (SP2)
+    "Real Zaragoza":             "Zaragoza",
+    "Levante UD":                "Levante",
+    "Real Oviedo":               "Oviedo",
+    "Elche CF":                  "Elche",
+    "Málaga CF":                 "Malaga",
+    "Sporting de Gijón":         "Sp Gijon",
+    "CD Tenerife":               "Tenerife",
+    "FC Cartagena":              "Cartagena",
+    "SD Huesca":                 "Huesca",
+    "RC Deportivo de La Coruña": "La Coruna",
+    "Deportivo de La Coruña":    "La Coruna",
+    "CD Castellón":              "Castellon",
+    "SD Eibar":                  "Eibar",
+    "AD Alcorcón":               "Alcorcon",
+    "CD Eldense":                "Eldense",
+    "Racing de Santander":       "Santander",
+    "CD Mirandés":               "Mirandes",
+    "UD Ibiza":                  "Ibiza",
+    "Albacete Balompié":         "Albacete",
+    "Gimnàstic de Tarragona":    "Gimnastic",
+    "CF Extremadura":            "Extremadura UD",
+    "Burgos CF":                 "Burgos",
+    "Real Murcia CF":            "Murcia",
+    "CD Lugo":                   "Lugo",
+    "UD Almería":                "Almeria",
+    "Cádiz CF":                  "Cadiz",
+}
+# Understat -> nume CSV (football-data.co.uk), lowercase — folosit la join-ul xG din features.load_xg_data
+UNDERSTAT_TO_CSV = {
+    # Premier League
+    "manchester city":         "man city",
+    "manchester united":       "man united",
+    "newcastle united":        "newcastle",
+    "queens park rangers":     "qpr",
+    "west bromwich albion":    "west brom",
+    "wolverhampton wanderers": "wolves",
+    "sheffield united":        "sheffield utd",
+    "nottingham forest":       "nott'm forest",
+    "tottenham":               "tottenham",
+    # La Liga
+    "atletico madrid":         "ath madrid",
+    "athletic club":           "ath bilbao",
+    "real betis":              "betis",
+    "real sociedad":           "sociedad",
+    "deportivo alavés":        "alaves",
+    "deportivo la coruna":     "deportivo",
+    "rcd espanyol":            "espanol",
+    "rcd mallorca":            "mallorca",
+    "celta vigo":              "celta",
+    "leganés":                 "leganes",
+    "getafe":                  "getafe",
+    "sd huesca":               "huesca",
+    "elche":                   "elche",
+    "granada":                 "granada",
+    "cadiz":                   "cadiz",
+    "girona":                  "girona",
+    "almeria":                 "almeria",
+    "las palmas":              "las palmas",
+    # Serie A
+    "inter":                   "inter",
+    "ac milan":                "milan",
+    "hellas verona":           "verona",
+    "spal":                    "spal",
+    "chievo":                  "chievo",
+    "us sassuolo":             "sassuolo",
+    "frosinone":               "frosinone",
+    "lecce":                   "lecce",
+    "us lecce":                "lecce",
+    "brescia":                 "brescia",
+    "crotone":                 "crotone",
+    "benevento":               "benevento",
+    "venezia":                 "venezia",
+    "salernitana":             "salernitana",
+    "us cremonese":            "cremonese",
+    "frosinone calcio":        "frosinone",
+    # Bundesliga
+    "fc augsburg":             "augsburg",
+    "bayer leverkusen":        "leverkusen",
+    "borussia dortmund":       "dortmund",
+    "borussia mönchengladbach":"m'gladbach",
+    "eintracht frankfurt":     "ein frankfurt",
+    "fc köln":                 "fc koln",
+    "hamburger sv":            "hamburger sv",
+    "hannover 96":             "hannover",
+    "hertha bsc":              "hertha",
+    "hoffenheim":              "hoffenheim",
+    "mainz 05":                "mainz",
+    "rb leipzig":              "rb leipzig",
+    "sc freiburg":             "freiburg",
+    "schalke 04":              "schalke 04",
+    "vfb stuttgart":           "stuttgart",
+    "vfl wolfsburg":           "wolfsburg",
+    "werder bremen":           "werder bremen",
+    "1. fsv mainz 05":         "mainz",
+    "tsg 1899 hoffenheim":     "hoffenheim",
+    "fortuna düsseldorf":      "dusseldorf",
+    "paderborn 07":            "paderborn",
+    "arminia bielefeld":       "bielefeld",
+    "greuther fürth":          "greuther furth",
+    "vfl bochum":              "bochum",
+    "darmstadt 98":            "darmstadt",
+    "holstein kiel":           "holstein kiel",
+    "sv darmstadt 98":         "darmstadt",
+    # Ligue 1
+    "paris saint-germain":     "paris sg",
+    "olympique marseille":     "marseille",
+    "olympique lyonnais":      "lyon",
+    "as saint-etienne":        "st etienne",
+    "stade rennais fc":        "rennes",
+    "girondins de bordeaux":   "bordeaux",
+    "montpellier hsc":         "montpellier",
+    "toulouse fc":             "toulouse",
+    "rc strasbourg alsace":    "strasbourg",
+    "dijon fco":               "dijon",
+    "stade de reims":          "reims",
+    "fc nantes":               "nantes",
+    "ogc nice":                "nice",
+    "rc lens":                 "lens",
+    "clermont foot":           "clermont",
+    "angers sco":              "angers",
+    "es troyes ac":            "troyes",
+    "losc lille":              "lille",
+    "stade brestois 29":       "brest",
+    "aj auxerre":              "auxerre",
+    "havre ac":                "le havre",
+}
+
+
+def _key(name: str) -> str:
+    """Cheia de potrivire: fara diacritice, lowercase, doar litere/cifre separate de un spatiu."""
+    s = unicodedata.normalize("NFKD", str(name))
+    s = "".join(c for c in s if not unicodedata.combining(c)).lower()
+    return " ".join(re.findall(r"[a-z0-9]+", s))
+
+
+def _strip_affixes(key: str) -> str:
+    words = key.split()
+    core = [w for w in words if w not in _AFFIXES]
+    return " ".join(core) if core else key
+
+
+def _trigrams(key: str) -> set:
+    s = f"  {key} "
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+class TeamResolver:
+    """Index pentru un set de echipe cunoscute. Thread-safe; memo local + Redis."""
+
+    def __init__(self, known_teams):
+        self.known = sorted(set(known_teams))
+        self.fingerprint = hashlib.sha1("\n".join(self.known).encode()).hexdigest()[:12]
+
+        self._exact: dict = {}
+        for team in self.known:
+            self._exact.setdefault(_key(team), team)
+        self._stripped: dict = {}
+        for team in self.known:
+            self._stripped.setdefault(_strip_affixes(_key(team)), team)
+        self._aliases = {_key(a): t for m in (FDORG_TO_MODEL, CLUBELO_TO_MODEL) for a, t in m.items()}
+        # Understat -> CSV e lowercase: valoarea se leaga de echipa cunoscuta cu aceeasi cheie
+        for a, v in UNDERSTAT_TO_CSV.items():
+            team = self._exact.get(_key(v))
+            if team is not None:
+                self._aliases.setdefault(_key(a), team)
+
+        self._keys = [_key(t) for t in self.known]
+        self._grams = defaultdict(list)
+        for i, k in enumerate(self._keys):
+            for g in _trigrams(k):
+                self._grams[g].append(i)
+
+        self._memo: dict = {}
+        self._lock = threading.Lock()
+        self._redis_loaded = False
+
+    # ── Redis ───────────────────────────────────────────────────────────────
+    @property
+    def _redis_key(self) -> str:
+        return f"flopi:names:{self.fingerprint}"
+
+    def _load_redis(self):
+        import cache as redis_cache
+        self._redis_loaded = True
+        flat = redis_cache._redis(["HGETALL", self._redis_key])
+        if isinstance(flat, list):
+            with self._lock:
+                for raw, team in zip(flat[::2], flat[1::2]):
+                    self._memo.setdefault(raw, team)
+
+    def _store_redis(self, raw: str, team: str):
+        import cache as redis_cache
+        redis_cache._pipeline([
+            ["HSET", self._redis_key, raw, team],
+            ["EXPIRE", self._redis_key, REDIS_TTL],
+        ])
+
+    # ── Rezolvare ───────────────────────────────────────────────────────────
+    def _fuzzy(self, key: str, cutoff: float):
+        """Cel mai bun candidat cu ratio >= cutoff, doar dintre echipele cu trigrame comune."""
+        if not key:
+            return None
+        counts = defaultdict(int)
+        for g in _trigrams(key):
+            for i in self._grams.get(g, ()):
+                counts[i] += 1
+        if not counts:
+            return None
+        top = sorted(counts, key=counts.__getitem__, reverse=True)[:MAX_CANDIDATES]
+        sm = SequenceMatcher()
+        sm.set_seq2(key)
+        best, best_score = None, cutoff
+        for i in top:
+            sm.set_seq1(self._keys[i])
+            if sm.real_quick_ratio() < best_score or sm.quick_ratio() < best_score:
+                continue
+            score = sm.ratio()
+            if score > best_score or (score == best_score and best is None):
+                best, best_score = self.known[i], score
+        return best
+
+    def _resolve(self, raw: str) -> str:
+        key = _key(raw)
+        if key in self._aliases:
+            return self._aliases[key]
+        if key in self._exact:
+            return self._exact[key]
+        stripped = _strip_affixes(key)
+        if stripped in self._stripped:
+            return self._stripped[stripped]
+        return self._fuzzy(stripped, CUTOFF_CLEANED) or self._fuzzy(key, CUTOFF_RAW) or raw
+
+    def resolve(self, raw: str, persist: bool = True) -> str:
+        if not raw:
+            return raw
+        hit = self._memo.get(raw)
+        if hit is not None:
+            return hit
+        if persist and not self._redis_loaded:
+            self._load_redis()
+            hit = self._memo.get(raw)
+            if hit is not None:
+                return hit
+        team = self._resolve(raw)
+        with self._lock:
+            self._memo[raw] = team
+        # Doar rezolvarile fuzzy merita persistate — aliasurile/exactele sunt dict hit
+        if persist and team != raw and _key(raw) not in self._aliases and _key(raw) not in self._exact:
+            self._store_redis(raw, team)
+        return team
+
+
+_resolvers: dict = {}
+_resolvers_lock = threading.Lock()
+
+
+def resolver(known_teams) -> TeamResolver:
+    """Resolver-ul (cache-uit) pentru lista curenta de echipe cunoscute."""
+    sig = (len(known_teams), hash(tuple(known_teams)))
+    r = _resolvers.get(sig)
+    if r is None:
+        with _resolvers_lock:
+            r = _resolvers.get(sig)
+            if r is None:
+                if len(_resolvers) >= 8:
+                    _resolvers.clear()
+                r = _resolvers[sig] = TeamResolver(known_teams)
+    return r
+
+
+def resolve(raw: str, known_teams) -> str:
+    """Numele din model pentru `raw`; fara echipe cunoscute se aplica doar maparile explicite."""
+    if not known_teams:
+        return FDORG_TO_MODEL.get(raw) or CLUBELO_TO_MODEL.get(raw) or raw
+    return resolver(known_teams).resolve(raw)
+
+
+# ─── Benchmark ──────────────────────────────────────────────────────────────
+
+def _difflib_resolve(raw: str, known_teams: list) -> str:
+    """Implementarea veche (fixtures._normalize_name) — referinta pentru benchmark."""
+    from difflib import get_close_matches
+    if raw in FDORG_TO_MODEL:
+        return FDORG_TO_MODEL[raw]
+    cleaned = raw
+    for suffix in [" FC", " AFC", " CF", " SC", " AC", " United", " City"]:
+        if cleaned.endswith(suffix):
+            cleaned = cleaned[: -len(suffix)].strip()
+            break
+    if cleaned in known_teams:
+        return cleaned
+    matches = get_close_matches(cleaned, known_teams, n=1, cutoff=0.70)
+    if matches:
+        return matches[0]
+    matches2 = get_close_matches(raw, known_teams, n=1, cutoff=0.65)
+    if matches2:
+        return matches2[0]
+    return raw
+
+
+def _odds_payload(known: list, n_events: int = 300) -> list:
+    """Nume in stilul The-Odds-API: aliasuri, diacritice, sufixe, echipe necunoscute."""
+    import random
+    rng = random.Random(7)
+    pool = list(FDORG_TO_MODEL) + [f"{t} FC" for t in known] + [t.upper() for t in known] + \
+           ["Atlético Madrid", "Bayern München", "Paris Saint Germain", "Inter Milan",
+            "Borussia Mönchengladbach", "Olympique Lyonnais", "Sporting Lisbon",
+            "Club Brugge KV", "Red Star Belgrade", "Shakhtar Donetsk"]
+    return [(rng.choice(pool), rng.choice(pool)) for _ in range(n_events)]
+
+
+if __name__ == "__main__":
+    import time
+    import corpus_cache
+
+    if corpus_cache.available():
+        d = corpus_cache.load(["HomeTeam", "AwayTeam"])
+        known = sorted(set(d["HomeTeam"]) | set(d["AwayTeam"]))
+    else:
+        known = sorted(set(FDORG_TO_MODEL.values()))
+    events = _odds_payload(known)
+    names = [n for ev in events for n in ev]
+
+    t = time.perf_counter()
+    old = [_difflib_resolve(n, known) for n in names]
+    t_old = time.perf_counter() - t
+
+    t = time.perf_counter()
+    r = TeamResolver(known)
+    t_build = time.perf_counter() - t
+    t = time.perf_counter()
+    new = [r.resolve(n, persist=False) for n in names]
+    t_cold = time.perf_counter() - t
+    t = time.perf_counter()
+    [r.resolve(n, persist=False) for n in names]
+    t_warm = time.perf_counter() - t
+
+    same = sum(a == b for a, b in zip(old, new))
+    diff = sorted({(n, a, b) for a, b, n in zip(old, new, names) if a.lower() != b.lower()})
+    print(f"[team_names] {len(known)} echipe cunoscute, {len(events)} evenimente ({len(names)} nume)")
+    print(f"  difflib (vechi):        {t_old * 1e3:8.1f} ms")
+    print(f"  index build:            {t_build * 1e3:8.1f} ms")
+    print(f"  resolver rece:          {t_cold * 1e3:8.1f} ms")
+    print(f"  resolver memo (cald):   {t_warm * 1e3:8.1f} ms")
+    print(f"  acord cu difflib:       {same}/{len(names)} (restul: difflib e case-sensitive)")
+    for n, a, b in diff:
+        print(f"    {n!r}: difflib={a!r} resolver={b!r}")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modulele backend-ului se importa ca top-level (import cache, import predictor, ...)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,175 @@
+"""
+Round trip-uri cache.py contra unui Upstash REST local (/ si /pipeline).
+
+Serverul implementeaza doar comenzile folosite de cache.py (GET, SET EX, TTL, MGET,
+DEL, INCR) si numara POST-urile primite — fiecare POST e un round trip.
+"""
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import cache
+
+
+class FakeUpstash:
+    def __init__(self):
+        self.data  = {}      # cheie -> (valoare, expirare sau None)
+        self.posts = []      # path-ul fiecarui POST
+        self.lock  = threading.Lock()
+
+    def _live(self, key):
+        entry = self.data.get(key)
+        if entry and entry[1] is not None and entry[1] <= time.time():
+            del self.data[key]
+            return None
+        return entry
+
+    def run(self, cmd: list):
+        op, args = cmd[0].upper(), cmd[1:]
+        if op == "GET":
+            entry = self._live(args[0])
+            return entry[0] if entry else None
+        if op == "SET":
+            exp = time.time() + int(args[3]) if len(args) >= 4 and args[2].upper() == "EX" else None
+            self.data[args[0]] = (args[1], exp)
+            return "OK"
+        if op == "TTL":
+            entry = self._live(args[0])
+            if entry is None:
+                return -2
+            return -1 if entry[1] is None else int(entry[1] - time.time())
+        if op == "MGET":
+            return [(self._live(k) or (None,))[0] for k in args]
+        if op == "DEL":
+            return sum(self.data.pop(k, None) is not None for k in args)
+        if op == "INCR":
+            entry = self._live(args[0])
+            n = int(entry[0]) + 1 if entry else 1
+            self.data[args[0]] = (str(n), entry[1] if entry else None)
+            return n
+        raise ValueError(f"comanda neimplementata: {op}")
+
+
+def _handler(fake: FakeUpstash):
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            with fake.lock:
+                fake.posts.append(self.path)
+                if self.path == "/pipeline":
+                    out = [{"result": fake.run(cmd)} for cmd in body]
+                else:
+                    out = {"result": fake.run(body)}
+            raw = json.dumps(out).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+@pytest.fixture
+def upstash(monkeypatch):
+    fake = FakeUpstash()
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _handler(fake))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("UPSTASH_REDIS_REST_URL", f"http://127.0.0.1:{server.server_port}")
+    monkeypatch.setenv("UPSTASH_REDIS_REST_TOKEN", "test")
+    cache._init()
+    _reset_process()
+    yield fake
+    server.shutdown()
+    monkeypatch.delenv("UPSTASH_REDIS_REST_URL")
+    monkeypatch.delenv("UPSTASH_REDIS_REST_TOKEN")
+    cache._init()
+    _reset_process()
+
+
+def _reset_process():
+    """Un worker proaspat: L1 gol, nicio versiune de namespace cunoscuta."""
+    cache._l1 = cache._LRU(cache.L1_MAX_ENTRIES, cache.L1_MAX_BYTES)
+    cache._ns_versions.clear()
+
+
+def _posts_during(fake, fn):
+    before = len(fake.posts)
+    result = fn()
+    return result, len(fake.posts) - before
+
+
+def test_get_with_ttl_miss_is_one_round_trip(upstash):
+    (value, ttl), posts = _posts_during(upstash, lambda: cache.get_with_ttl("daily", "2026-05-01"))
+    assert (value, ttl) == (None, -2)
+    assert posts == 1
+
+
+def test_get_with_ttl_hit_is_one_round_trip_then_l1(upstash):
+    cache.set("daily", "2026-05-01", {"picks": [1, 2]}, ttl=900)
+    _reset_process()
+
+    (value, ttl), posts = _posts_during(upstash, lambda: cache.get_with_ttl("daily", "2026-05-01"))
+    assert value == {"picks": [1, 2]}
+    assert 0 < ttl <= 900
+    assert posts == 1
+    assert upstash.posts[-1] == "/pipeline"
+
+    (value, _), posts = _posts_during(upstash, lambda: cache.get_with_ttl("daily", "2026-05-01"))
+    assert value == {"picks": [1, 2]}
+    assert posts == 0
+
+
+def test_set_many_is_one_round_trip(upstash):
+    items = {f"k{i}": {"i": i} for i in range(10)}
+    _, posts = _posts_during(upstash, lambda: cache.set_many("odds_events", items, ttl=60))
+    assert posts == 1
+    # versiunea namespace-ului incrementata in acelasi pipeline
+    assert upstash.data["flopi:ver:odds_events"][0] == "1"
+
+
+def test_get_many_is_one_round_trip(upstash):
+    cache.set_many("odds_events", {f"k{i}": i for i in range(8)}, ttl=60)
+    _reset_process()
+
+    found, posts = _posts_during(upstash, lambda: cache.get_many("odds_events", [f"k{i}" for i in range(10)]))
+    assert found == {f"k{i}": i for i in range(8)}
+    assert posts == 1
+
+
+def test_delete_many_is_one_round_trip(upstash):
+    keys = [f"k{i}" for i in range(10)]
+    cache.set_many("daily", {k: k for k in keys}, ttl=60)
+
+    _, posts = _posts_during(upstash, lambda: cache.delete_many("daily", keys))
+    assert posts == 1
+    assert not any(k.startswith("flopi:daily:") for k in upstash.data)
+    assert cache.get_many("daily", keys) == {}
+
+
+def test_delete_invalidates_other_workers_l1(upstash):
+    cache.set("daily", "d", {"v": 1}, ttl=60)
+    assert cache.get("daily", "d") == {"v": 1}      # in L1-ul acestui "worker"
+
+    # Alt worker sterge cheia: INCR pe versiune direct in Redis
+    upstash.run(["DEL", cache._make_key("daily", "d")])
+    upstash.run(["INCR", cache._ver_key("daily")])
+    cache._ns_versions.clear()                       # fereastra L1_VERSION_CHECK expirata
+
+    assert cache.get("daily", "d") is None
+
+
+def test_l1_hits_are_independent_copies(upstash):
+    cache.set("pick_state", "2026-05-01", {"payload": {"picks": []}}, ttl=60)
+
+    state = cache.get("pick_state", "2026-05-01")
+    state["payload"] = {"picks": ["modificat"]}
+
+    assert cache.get("pick_state", "2026-05-01") == {"payload": {"picks": []}}
+    assert cache.get("pick_state", "2026-05-01") is not cache.get("pick_state", "2026-05-01")
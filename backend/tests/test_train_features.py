@@ -0,0 +1,90 @@
+"""
+Paritate exacta intre buclele de referinta (bench_train_features._ref_*) si
+feature engineering-ul vectorizat din features.py, pe un corpus sintetic mic:
+mai multe ligi, echipe care apar in mai multe ligi (promovare/retrogradare),
+meciuri in aceeasi data si echipe noi care intra tarziu (cold start).
+Benchmark-ul pe corpusul real ramane in bench_train_features.py.
+"""
+import random
+import datetime
+
+import pandas as pd
+import pytest
+
+import features
+from bench_train_features import _ref_elo_features, _ref_team_features, _ref_h2h_features
+
+LEAGUES = {
+    "E0": [f"E0_{i}" for i in range(8)] + ["Shared A", "Shared B"],
+    "E1": [f"E1_{i}" for i in range(8)] + ["Shared A", "Shared B"],
+    "D1": [f"D1_{i}" for i in range(6)] + ["Shared A"],
+}
+LATE_TEAMS = {"E0": "Nou E0", "D1": "Nou D1"}      # intra dupa jumatatea sezonului
+
+
+def _corpus(seed: int = 7, rounds: int = 40) -> pd.DataFrame:
+    rng = random.Random(seed)
+    start = datetime.date(2022, 8, 6)
+    rows = []
+    for r in range(rounds):
+        day = start + datetime.timedelta(days=7 * r)
+        for div, teams in LEAGUES.items():
+            pool = teams + ([LATE_TEAMS[div]] if div in LATE_TEAMS and r >= rounds // 2 else [])
+            pool = rng.sample(pool, len(pool) - len(pool) % 2)
+            for i in range(0, len(pool), 2):
+                hg, ag = rng.randint(0, 4), rng.randint(0, 3)
+                rows.append({
+                    "Div":      div,
+                    # mai multe meciuri in aceeasi data, plus cateva mutate cu o zi
+                    "Date":     (day + datetime.timedelta(days=rng.random() < 0.2)).strftime("%d/%m/%Y"),
+                    "HomeTeam": pool[i],
+                    "AwayTeam": pool[i + 1],
+                    "FTHG":     hg,
+                    "FTAG":     ag,
+                    "FTR":      "H" if hg > ag else "A" if ag > hg else "D",
+                })
+    return features.preprocess(pd.DataFrame(rows))
+
+
+def _xg_lookup(data: pd.DataFrame, seed: int = 11) -> dict:
+    """xG real pentru ~60% din meciuri — restul cad pe proxy-ul din goluri."""
+    rng = random.Random(seed)
+    out = {}
+    for row in data.itertuples():
+        if rng.random() < 0.6:
+            out[(row.Div, str(row.Date.date()), row.HomeTeam.strip().lower(), row.AwayTeam.strip().lower())] = \
+                (round(rng.uniform(0.2, 3.0), 2), round(rng.uniform(0.2, 3.0), 2))
+    return out
+
+
+@pytest.fixture(scope="module")
+def data():
+    return _corpus()
+
+
+def _assert_same(new, ref):
+    (new_df, new_extra), (ref_df, ref_extra) = new, ref
+    pd.testing.assert_frame_equal(new_df, ref_df, check_exact=True)
+    assert list(new_extra) == list(ref_extra)
+    assert new_extra == ref_extra
+
+
+def test_corpus_shape(data):
+    assert data["Date"].duplicated().any()
+    shared = data[data["HomeTeam"] == "Shared A"]["Div"].unique()
+    assert len(shared) == 3
+    assert {"Nou E0", "Nou D1"} <= set(data["HomeTeam"]) | set(data["AwayTeam"])
+
+
+def test_elo_parity(data):
+    _assert_same(features.build_elo_features(data), _ref_elo_features(data))
+
+
+@pytest.mark.parametrize("with_xg", [False, True])
+def test_team_parity(data, with_xg):
+    xg = _xg_lookup(data) if with_xg else None
+    _assert_same(features.build_team_features(data, xg_lookup=xg), _ref_team_features(data, xg_lookup=xg))
+
+
+def test_h2h_parity(data):
+    _assert_same(features.build_h2h_features(data), _ref_h2h_features(data))
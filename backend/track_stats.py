@@ -0,0 +1,593 @@
+"""
+Agregate track-record mentinute incremental — fara scan complet pe pick_results.
+
+Inainte /api/track-record citea tot pick_results la fiecare request, recalcula
+toate pragurile de confidence in Python si facea cate un query daily_picks per
+data distincta (N+1) pentru breakdown-ul pe liga; /vip si /api/bet-signals/stats
+scanau si ele tot. Latenta crestea liniar cu istoricul.
+
+Acum contoarele se actualizeaza la scriere (auto_mark_results, admin/picks/result,
+bet_signal.update_results), iar endpoint-urile citesc doar agregatele:
+
+  flopi:track:rows          hash  "data|gazda|oaspete" -> "liga|bucket|rezultat"
+                            (starea fiecarui rand — o remarcare muta contorul,
+                            nu il dubleaza)
+  flopi:track:totals        hash  "liga|bucket|rezultat" -> n, plus _since (prima data)
+  flopi:track:m:<YYYY-MM>   hash  "bucket|rezultat" -> n (luna curenta pentru /vip)
+  flopi:track:signals       hash  W, L, profit, odds_sum, odds_n (bet_signals)
+
+bucket = pragul inferior al confidence-ului (0, 55, 60, 65, 70, 75) — orice prag
+cerut de endpoint-uri e o suma de bucket-uri. Granularitatea e lunara, nu zilnica:
+singura interogare pe interval e "luna asta", iar numarul de campuri citite ramane
+constant (ligi x bucket-uri) indiferent de istoric.
+
+Actualizarea unui rand e un singur EVAL (scade vechea stare, creste noua), atomic
+intre procese. Daca agregatele lipsesc (prima rulare, Redis golit) se reconstruiesc
+o data din DB — un scan pe pick_results, paginat pe (pick_date, id) cate READ_PAGE
+randuri (PostgREST taie raspunsurile la max-rows, implicit 1000).
+Fara Redis: aceleasi contoare in proces, reconstruite din DB la LOCAL_TTL (worker-ul
+care marcheaza rezultatele e alt proces decat API-ul).
+
+pick_results are coloanele denormalizate ale pick-ului (liga, competitia, versiunea
+modelului, cota pronosticului) — breakdown-ul pe liga nu mai descarca JSON-ul
+daily_picks. Schema (Supabase SQL editor, o singura data):
+
+    alter table pick_results
+      add column if not exists league text,
+      add column if not exists competition_code text,
+      add column if not exists model_version text,
+      add column if not exists odds numeric;
+    create index if not exists pick_results_league_date_idx on pick_results (league, pick_date);
+
+    create or replace function pick_results_by_league(p_since date default null,
+                                                      p_min_conf numeric default 0)
+    returns table (league text, total bigint, wins bigint, total65 bigint, wins65 bigint)
+    language sql stable as $$
+      select league, count(*), count(*) filter (where result = 'win'),
+             count(*) filter (where confidence >= 0.65),
+             count(*) filter (where confidence >= 0.65 and result = 'win')
+      from pick_results
+      where result in ('win', 'loss') and league is not null
+        and (p_since is null or pick_date >= p_since) and confidence >= p_min_conf
+      group by league
+    $$;
+
+Randurile vechi se completeaza o data: python track_stats.py backfill
+
+Pana la migratie, upsert_results scrie fara coloanele noi (PostgREST respinge
+coloanele necunoscute) si rebuild pune toate randurile la liga "Unknown".
+"""
+import json
+import time
+import logging
+import datetime
+import threading
+
+import cache as redis_cache
+
+logger = logging.getLogger(__name__)
+
+ROWS_KEY    = "flopi:track:rows"
+TOTALS_KEY  = "flopi:track:totals"
+SIGNALS_KEY = "flopi:track:signals"
+BUCKETS     = (75, 70, 65, 60, 55)     # praguri inferioare, descrescator; sub 55 -> "0"
+CACHE_NS    = "track_record"
+CACHE_TTL   = 60
+LOCAL_TTL   = 600
+LOCK_TTL    = 120
+BACKFILL_BATCH = 30     # zile daily_picks per lot
+READ_PAGE      = 1000   # randuri per pagina la reconstructie (<= max-rows din PostgREST)
+
+SINCE_DEFAULT = "Aprilie 2026"
+
+# KEYS: rows, totals, luna. ARGV: cheia randului, starea noua ('' = necontorizat), data
+_MARK_LUA = """
+local old = redis.call('HGET', KEYS[1], ARGV[1])
+if (old or '') == ARGV[2] then return 0 end
+if old then
+  redis.call('HINCRBY', KEYS[2], old, -1)
+  redis.call('HINCRBY', KEYS[3], string.match(old, '([^|]*|[^|]*)$'), -1)
+end
+if ARGV[2] == '' then
+  redis.call('HDEL', KEYS[1], ARGV[1])
+  return 1
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('HINCRBY', KEYS[2], ARGV[2], 1)
+redis.call('HINCRBY', KEYS[3], string.match(ARGV[2], '([^|]*|[^|]*)$'), 1)
+local s = redis.call('HGET', KEYS[2], '_since')
+if not s or ARGV[3] < s then redis.call('HSET', KEYS[2], '_since', ARGV[3]) end
+return 1
+"""
+
+# Fallback in proces (fara Redis)
+_local = {"rows": {}, "totals": {}, "months": {}, "since": None, "built": 0.0}
+_local_signals = {"data": None, "built": 0.0}
+_lock = threading.Lock()
+
+
+def bucket(confidence) -> str:
+    """Confidence (fractie 0-1) -> bucket-ul lui ("75", "70", ..., "0")."""
+    pct = round((confidence or 0) * 100, 2)
+    for b in BUCKETS:
+        if pct >= b:
+            return str(b)
+    return "0"
+
+
+def _month_key(month: str) -> str:
+    return f"flopi:track:m:{month}"
+
+
+def _row_key(date: str, home: str, away: str) -> str:
+    return f"{date}|{home.lower()}|{away.lower()}"
+
+
+def _hash(flat) -> dict:
+    # HGETALL prin REST: lista plata [camp, valoare, ...]
+    if isinstance(flat, dict):
+        return flat
+    return dict(zip(flat[::2], flat[1::2])) if isinstance(flat, list) else {}
+
+
+def invalidate():
+    redis_cache.delete_many(CACHE_NS, ["main", "vip", "signals"])
+
+
+# ─── Scriere ────────────────────────────────────────────────────────────────
+
+def _apply_local(row_key: str, state: str, date: str):
+    old = _local["rows"].get(row_key, "")
+    if old == state:
+        return
+    totals, months = _local["totals"], _local["months"].setdefault(date[:7], {})
+    if old:
+        totals[old] = totals.get(old, 0) - 1
+        months[old.split("|", 1)[1]] = months.get(old.split("|", 1)[1], 0) - 1
+        _local["rows"].pop(row_key, None)
+    if state:
+        _local["rows"][row_key] = state
+        totals[state] = totals.get(state, 0) + 1
+        months[state.split("|", 1)[1]] = months.get(state.split("|", 1)[1], 0) + 1
+        if not _local["since"] or date < _local["since"]:
+            _local["since"] = date
+
+
+def _state(result: str, confidence, league: str) -> str:
+    if result not in ("win", "loss"):
+        return ""
+    return f"{(league or 'Unknown').replace('|', '/')}|{bucket(confidence)}|{result}"
+
+
+def mark_many(rows: list):
+    """
+    Actualizeaza contoarele dupa scrierea unor randuri pick_results — un singur
+    pipeline de EVAL-uri. rows: (date, home, away, result, confidence, league).
+    Doar win/loss se contorizeaza; void (sau orice altceva) scoate randul din agregate.
+    """
+    if not rows:
+        return
+    if redis_cache._REDIS_URL:
+        redis_cache._pipeline([["EVAL", _MARK_LUA, 3, ROWS_KEY, TOTALS_KEY, _month_key(date[:7]),
+                                _row_key(date, home, away), _state(result, conf, league), date]
+                               for date, home, away, result, conf, league in rows])
+    else:
+        with _lock:
+            for date, home, away, result, conf, league in rows:
+                _apply_local(_row_key(date, home, away), _state(result, conf, league), date)
+    invalidate()
+
+
+def mark(date: str, home: str, away: str, result: str, confidence, league: str = None):
+    """Ca mark_many(), pentru un singur rand (marcare manuala)."""
+    mark_many([(date, home, away, result, confidence, league)])
+
+
+def row_fields(pick: dict) -> dict:
+    """Coloanele denormalizate din pick_results pentru un pick din daily_picks."""
+    odds_col = {"H": "odds_home", "D": "odds_draw", "A": "odds_away"}.get(pick.get("prediction"))
+    return {
+        "league":           pick.get("league") or "Unknown",
+        "competition_code": pick.get("competition_code") or None,
+        "model_version":    pick.get("model_version"),
+        "odds":             pick.get(odds_col) if odds_col else None,
+    }
+
+
+ROW_FIELDS = ("league", "competition_code", "model_version", "odds")
+
+# False dupa primul upsert respins pentru coloane lipsa (migratia din docstring nerulata)
+_schema = {"row_fields": True}
+
+
+def _missing_column(e: Exception) -> bool:
+    # PostgREST: PGRST204 "Could not find the 'league' column of 'pick_results' in the schema cache"
+    msg = str(e)
+    return "PGRST204" in msg or ("column" in msg and any(f"'{c}'" in msg for c in ROW_FIELDS))
+
+
+def upsert_results(client, rows: list):
+    """
+    Upsert pick_results pe (pick_date, home, away). Daca tabela nu are inca coloanele
+    denormalizate, reincearca fara ele — rezultatele se marcheaza oricum, iar
+    breakdown-ul pe liga le completeaza dupa migratie + backfill.
+    """
+    if _schema["row_fields"]:
+        try:
+            client.table("pick_results").upsert(rows, on_conflict="pick_date,home,away").execute()
+            return
+        except Exception as e:
+            if not _missing_column(e):
+                raise
+            _schema["row_fields"] = False
+            logger.warning("[track_stats] pick_results fara coloanele denormalizate (%s) — "
+                           "scriu fara ele; ruleaza migratia din track_stats.py", e)
+    bare = [{k: v for k, v in r.items() if k not in ROW_FIELDS} for r in rows]
+    client.table("pick_results").upsert(bare, on_conflict="pick_date,home,away").execute()
+
+
+def pick_fields(client, date: str, home: str, away: str) -> dict:
+    """row_fields() pentru un singur meci (marcare manuala) — {} daca pick-ul nu exista."""
+    rows = client.table("daily_picks").select("picks").eq("pick_date", date).execute().data or []
+    picks = (rows[0].get("picks") or []) if rows else []
+    if isinstance(picks, str):
+        picks = json.loads(picks)
+    for p in picks:
+        if p["home"].lower() == home.lower() and p["away"].lower() == away.lower():
+            return row_fields(p)
+    return {}
+
+
+def mark_signal(result: str, profit, odds):
+    """Contoarele bet_signals — un semnal trece o singura data din NULL in W/L."""
+    if result not in ("W", "L"):
+        return
+    if redis_cache._REDIS_URL:
+        cmds = [["HINCRBY", SIGNALS_KEY, result, 1],
+                ["HINCRBYFLOAT", SIGNALS_KEY, "profit", profit or 0]]
+        if odds:
+            cmds += [["HINCRBYFLOAT", SIGNALS_KEY, "odds_sum", odds],
+                     ["HINCRBY", SIGNALS_KEY, "odds_n", 1]]
+        redis_cache._pipeline(cmds)
+    else:
+        with _lock:
+            s = _local_signals["data"]
+            if s is not None:
+                s[result] += 1
+                s["profit"] += profit or 0
+                if odds:
+                    s["odds_sum"] += odds
+                    s["odds_n"] += 1
+    redis_cache.delete(CACHE_NS, "signals")
+
+
+# ─── Reconstructie din DB ───────────────────────────────────────────────────
+
+def _scan(query, key: tuple):
+    """Toate randurile unui query, pagina cu pagina pe cheia `key` (keyset, nu offset)."""
+    import streaming
+    return streaming.KeysetPager(query, key, desc=False, page=READ_PAGE)
+
+
+def _claim_rebuild(name: str) -> bool:
+    return redis_cache._redis(["SET", f"flopi:track:rebuild:{name}", "1", "NX", "EX", LOCK_TTL]) == "OK"
+
+
+def rebuild(client) -> dict:
+    """Agregatele din pick_results (un singur scan, fara daily_picks), publicate in Redis sau in proces."""
+    def scan(cols):
+        return list(_scan(lambda: client.table("pick_results").select(cols)
+                          .in_("result", ["win", "loss"]).not_.is_("pick_date", "null"), ("pick_date", "id")))
+
+    cols = "id,pick_date,home,away,result,confidence"
+    try:
+        rows = scan(cols + ",league")
+    except Exception as e:
+        if not _missing_column(e):
+            raise
+        # Inainte de migratie: contoarele merg, toate ligile sunt "Unknown"
+        rows = scan(cols)
+
+    states, totals, months = {}, {}, {}
+    since = None
+    for r in rows:
+        date = r.get("pick_date")
+        if not date:
+            continue
+        league = (r.get("league") or "Unknown").replace("|", "/")
+        state = f"{league}|{bucket(r.get('confidence'))}|{r['result']}"
+        states[_row_key(date, r["home"], r["away"])] = state
+        totals[state] = totals.get(state, 0) + 1
+        month = months.setdefault(date[:7], {})
+        month[state.split("|", 1)[1]] = month.get(state.split("|", 1)[1], 0) + 1
+        since = min(since or date, date)
+
+    if redis_cache._REDIS_URL:
+        if _claim_rebuild("picks"):
+            cmds = [["DEL", ROWS_KEY, TOTALS_KEY, *(_month_key(m) for m in months)]]
+            items = list(states.items())
+            for i in range(0, len(items), 500):
+                cmds.append(["HSET", ROWS_KEY, *(x for kv in items[i:i + 500] for x in kv)])
+            for m, counts in months.items():
+                cmds.append(["HSET", _month_key(m), *(x for kv in counts.items() for x in kv)])
+            fields = [x for kv in totals.items() for x in kv] + (["_since", since] if since else [])
+            cmds.append(["HSET", TOTALS_KEY, *fields, "_ready", 1])
+            redis_cache._pipeline(cmds)
+    else:
+        with _lock:
+            _local.update(rows=states, totals=totals, months=months, since=since, built=time.time())
+    logger.info("[track_stats] agregate reconstruite din %d randuri pick_results", len(rows))
+    return {"totals": totals, "month": months.get(datetime.date.today().isoformat()[:7], {}), "since": since}
+
+
+def reset():
+    """Forteaza reconstructia agregatelor la urmatoarea citire (ex. dupa backfill)."""
+    if redis_cache._REDIS_URL:
+        redis_cache._redis(["HDEL", TOTALS_KEY, "_ready"])
+    else:
+        with _lock:
+            _local["built"] = 0.0
+    invalidate()
+
+
+def backfill(client, batch: int = BACKFILL_BATCH) -> dict:
+    """
+    Completeaza coloanele denormalizate pe randurile pick_results vechi.
+    Parcurge daily_picks in ordinea datei, cate `batch` zile (paginare pe pick_date,
+    nu offset); per lot: un select pe randurile fara liga + un upsert.
+    """
+    last, days, filled = "", 0, 0
+    while True:
+        q = client.table("daily_picks").select("pick_date,picks").order("pick_date")
+        if last:
+            q = q.gt("pick_date", last)
+        chunk = q.limit(batch).execute().data or []
+        if not chunk:
+            break
+        last = chunk[-1]["pick_date"]
+        days += len(chunk)
+
+        fields = {}
+        for row in chunk:
+            picks = row.get("picks") or []
+            if isinstance(picks, str):
+                picks = json.loads(picks)
+            for p in picks:
+                fields[(row["pick_date"], p["home"].lower(), p["away"].lower())] = row_fields(p)
+
+        todo = client.table("pick_results").select("*")\
+            .in_("pick_date", [r["pick_date"] for r in chunk]).is_("league", "null").execute().data or []
+        upd = []
+        for r in todo:
+            f = fields.get((r["pick_date"], r["home"].lower(), r["away"].lower()))
+            if f:
+                upd.append({k: v for k, v in r.items() if k not in ("id", "created_at")} | f)
+        if upd:
+            client.table("pick_results").upsert(upd, on_conflict="pick_date,home,away").execute()
+            filled += len(upd)
+        logger.info("[track_stats] backfill pana la %s: %d randuri completate", last, filled)
+        if len(chunk) < batch:
+            break
+
+    reset()
+    return {"days": days, "filled": filled}
+
+
+def league_breakdown(client, since: str = None, min_conf: float = 0.0) -> list:
+    """
+    Acuratete per liga, grupata in DB (functia pick_results_by_league); daca functia
+    nu exista inca, agregare din coloanele league/result/confidence filtrate in DB.
+    """
+    try:
+        rows = client.rpc("pick_results_by_league", {"p_since": since, "p_min_conf": min_conf}).execute().data or []
+    except Exception as e:
+        logger.info("[track_stats] pick_results_by_league indisponibil (%s) — agregare locala", e)
+        def query():
+            q = client.table("pick_results").select("id,pick_date,league,result,confidence")\
+                .in_("result", ["win", "loss"]).not_.is_("league", "null").gte("confidence", min_conf)
+            return q.gte("pick_date", since) if since else q.not_.is_("pick_date", "null")
+        groups = {}
+        for r in _scan(query, ("pick_date", "id")):
+            g = groups.setdefault(r["league"], {"league": r["league"], "total": 0, "wins": 0, "total65": 0, "wins65": 0})
+            win = r["result"] == "win"
+            g["total"] += 1
+            g["wins"]  += win
+            if (r.get("confidence") or 0) >= 0.65:
+                g["total65"] += 1
+                g["wins65"]  += win
+        rows = list(groups.values())
+
+    out = [{
+        "league":   r["league"],
+        "total":    r["total"],
+        "total65":  r["total65"],
+        "accuracy": _acc(r["wins"], r["total"]),
+        "acc65":    _acc(r["wins65"], r["total65"]),
+    } for r in rows if r["league"] != "Unknown"]
+    out.sort(key=lambda x: x["acc65"], reverse=True)
+    return out
+
+
+def rebuild_signals(client) -> dict:
+    rows = _scan(lambda: client.table("bet_signals").select("id,created_at,result,profit_loss,odds_at_signal")
+                 .in_("result", ["W", "L"]), ("created_at", "id"))
+    s = {"W": 0, "L": 0, "profit": 0.0, "odds_sum": 0.0, "odds_n": 0}
+    for r in rows:
+        s[r["result"]] += 1
+        s["profit"] += r.get("profit_loss") or 0
+        if r.get("odds_at_signal"):
+            s["odds_sum"] += r["odds_at_signal"]
+            s["odds_n"] += 1
+    if redis_cache._REDIS_URL:
+        if _claim_rebuild("signals"):
+            redis_cache._pipeline([["DEL", SIGNALS_KEY],
+                                   ["HSET", SIGNALS_KEY, *(x for kv in s.items() for x in kv), "_ready", 1]])
+    else:
+        with _lock:
+            _local_signals.update(data=s, built=time.time())
+    return s
+
+
+# ─── Citire ─────────────────────────────────────────────────────────────────
+
+def _load(client) -> dict:
+    """{"totals": {"liga|bucket|rezultat": n}, "month": {"bucket|rezultat": n}, "since": data}"""
+    month = datetime.date.today().isoformat()[:7]
+    if redis_cache._REDIS_URL:
+        totals, cur = (_hash(x) for x in redis_cache._pipeline([["HGETALL", TOTALS_KEY],
+                                                                 ["HGETALL", _month_key(month)]]))
+        if totals.get("_ready"):
+            since = totals.pop("_since", None)
+            totals.pop("_ready", None)
+            return {"totals": {k: int(v) for k, v in totals.items()},
+                    "month":  {k: int(v) for k, v in cur.items()}, "since": since}
+    else:
+        with _lock:
+            if time.time() - _local["built"] < LOCAL_TTL:
+                return {"totals": dict(_local["totals"]), "month": dict(_local["months"].get(month, {})),
+                        "since": _local["since"]}
+    return rebuild(client)
+
+
+def _load_signals(client) -> dict:
+    if redis_cache._REDIS_URL:
+        s = _hash(redis_cache._redis(["HGETALL", SIGNALS_KEY]))
+        if s.get("_ready"):
+            return {"W": int(s.get("W", 0)), "L": int(s.get("L", 0)), "profit": float(s.get("profit", 0)),
+                    "odds_sum": float(s.get("odds_sum", 0)), "odds_n": int(s.get("odds_n", 0))}
+    else:
+        with _lock:
+            if _local_signals["data"] is not None and time.time() - _local_signals["built"] < LOCAL_TTL:
+                return dict(_local_signals["data"])
+    return rebuild_signals(client)
+
+
+def _count(counts: dict, buckets, result: str = None, league: str = None) -> int:
+    n = 0
+    for field, v in counts.items():
+        parts = field.rsplit("|", 2)
+        lg, b, res = parts if len(parts) == 3 else (None, *parts)
+        if b in buckets and (result is None or res == result) and (league is None or lg == league):
+            n += v
+    return n
+
+
+def _acc(wins: int, total: int) -> float:
+    return round(wins / total * 100, 1) if total else 0
+
+
+_ALL = ("0", "55", "60", "65", "70", "75")
+_GE  = {t: tuple(str(b) for b in BUCKETS if b >= t) for t in BUCKETS}
+
+
+def track_record(client) -> dict:
+    """Payload-ul /api/track-record din agregate."""
+    agg    = _load(client)
+    totals = agg["totals"]
+
+    def band(buckets, label, **extra):
+        total, wins = _count(totals, buckets), _count(totals, buckets, "win")
+        return {"label": label, **extra, "total": total, "wins": wins, "accuracy": _acc(wins, total)}
+
+    breakdown = [
+        band(_GE[70], "Confidence >70%"),
+        band(_GE[65], "Confidence ≥65%"),
+        band(_GE[60], "Confidence ≥60%"),
+        band(_ALL, "Toate predicțiile", label_en="All predictions"),
+    ]
+    high, everything = breakdown[1], breakdown[3]
+    med_total, med_wins = _count(totals, ("55", "60")), _count(totals, ("55", "60"), "win")
+
+    since, days = agg["since"] or SINCE_DEFAULT, 0
+    if agg["since"]:
+        try:
+            days = (datetime.date.today() - datetime.date.fromisoformat(since)).days
+        except ValueError:
+            pass
+
+    return {
+        "total":               everything["total"],
+        "high_conf_total":     high["total"],
+        "high_conf_wins":      high["wins"],
+        "high_conf_accuracy":  high["accuracy"],
+        "med_conf_total":      med_total,
+        "med_conf_wins":       med_wins,
+        "med_conf_accuracy":   _acc(med_wins, med_total),
+        "tracking_since":      since,
+        "days_tracked":        days,
+        "final_equity":        round(everything["wins"] - (everything["total"] - everything["wins"]), 2),
+        "confidence_breakdown": breakdown,
+        "league_stats":        league_stats(totals),
+    }
+
+
+def league_stats(totals: dict) -> list:
+    """Acuratete per liga (ligile cu < 3 pick-uri rezolvate se ignora), sortat dupa acc65."""
+    leagues = {f.rsplit("|", 2)[0] for f in totals} - {"Unknown"}
+    out = []
+    for league in leagues:
+        total   = _count(totals, _ALL, league=league)
+        total65 = _count(totals, _GE[65], league=league)
+        if total < 3:
+            continue
+        out.append({
+            "league":   league,
+            "total":    total,
+            "total65":  total65,
+            "accuracy": _acc(_count(totals, _ALL, "win", league), total),
+            "acc65":    _acc(_count(totals, _GE[65], "win", league), total65),
+        })
+    out.sort(key=lambda x: x["acc65"], reverse=True)
+    return out
+
+
+def vip(client) -> dict:
+    """Payload-ul /api/track-record/vip (confidence >= 75%): total + luna curenta."""
+    agg = _load(client)
+    total, wins = _count(agg["totals"], _GE[75]), _count(agg["totals"], _GE[75], "win")
+    m_total, m_wins = _count(agg["month"], _GE[75]), _count(agg["month"], _GE[75], "win")
+    return {
+        "total":                total,
+        "wins":                 wins,
+        "accuracy":             _acc(wins, total),
+        "this_month_total":     m_total,
+        "this_month_wins":      m_wins,
+        "this_month_accuracy":  _acc(m_wins, m_total),
+    }
+
+
+def signals_stats(client) -> dict:
+    """Payload-ul /api/bet-signals/stats: contoare + ultimele 10 semnale (query limitat)."""
+    s = _load_signals(client)
+    completed = s["W"] + s["L"]
+    recent = client.table("bet_signals").select("*").in_("result", ["W", "L"])\
+        .order("match_date", desc=True).limit(10).execute().data or []
+    return {
+        "total":     completed,
+        "wins":      s["W"],
+        "losses":    s["L"],
+        "win_rate":  round(s["W"] / completed * 100, 1) if completed else 0,
+        "roi_total": round(s["profit"], 2),
+        "avg_odds":  round(s["odds_sum"] / s["odds_n"], 2) if s["odds_n"] else 0,
+        "recent":    recent,
+    }
+
+
+def cached(name: str, build, client) -> dict:
+    """Payload-ul unui endpoint, tinut CACHE_TTL secunde in namespace track_record."""
+    hit = redis_cache.get(CACHE_NS, name)
+    if hit is not None:
+        return hit
+    data = build(client)
+    redis_cache.set(CACHE_NS, name, data, ttl=CACHE_TTL)
+    return data
+
+
+if __name__ == "__main__":
+    import sys
+    from db import get_client
+    logging.basicConfig(level=logging.INFO)
+    if sys.argv[1:] == ["backfill"]:
+        print(backfill(get_client()))
+    else:
+        print("usage: python track_stats.py backfill")
@@ -0,0 +1,44 @@
+"""
+Antrenare combinata: model.pkl si model_no_odds.pkl dintr-o singura trecere prin date.
+
+`python train.py && python train_no_odds.py` facea de doua ori incarcarea corpusului,
+Elo, forma per echipa si H2H. Aici partea comuna (features.build_base) se calculeaza
+o data; modelul fara cote foloseste direct matricea de baza, iar modelul cu cote
+adauga peste ea doar coloanele de piata. Fiecare model isi pastreaza protocolul
+de antrenare (split, calibrare) din scriptul lui.
+"""
+import time
+
+import train
+import train_no_odds
+from features import (
+    load_data, load_xg_data, preprocess, build_base, build_odds_features,
+    build_market_features, with_market, filter_cold_start, save_model,
+)
+
+
+def build_matrices():
+    """(data, base, (X_odds, y_odds), (X_no_odds, y_no_odds)) — fara antrenare."""
+    data = preprocess(load_data())
+    base = build_base(data, xg_lookup=load_xg_data())
+    odds = filter_cold_start(data, with_market(
+        base["X_base"], build_odds_features(data), build_market_features(data)))
+    no_odds = filter_cold_start(data, base["X_base"])
+    return data, base, odds, no_odds
+
+
+def main():
+    t0 = time.perf_counter()
+    data, base, (X, y), (X_no, y_no) = build_matrices()
+    print(f">>> Features pentru ambele modele in {time.perf_counter() - t0:.1f}s")
+
+    model, le, feature_means = train.train_model(X, y)
+    save_model(train.MODEL_PATH, model, le, feature_means, X.columns, base, data)
+
+    model, le, feature_means = train_no_odds.train_model(X_no, y_no)
+    save_model(train_no_odds.MODEL_PATH, model, le, feature_means, X_no.columns, base, data)
+    print(f">>> train_all complet in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
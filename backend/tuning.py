@@ -0,0 +1,149 @@
+"""
+Cautare Optuna pentru hiperparametrii XGBoost — folosita de train.py si train_no_odds.py.
+
+Fata de varianta veche (50 de XGBClassifier.fit secventiale pe DataFrame-uri):
+  - QuantileDMatrix pentru train/val si sample weights construite O SINGURA data,
+    partajate de toate trial-urile (xgb.train direct, fara wrapper-ul sklearn);
+  - trial-urile slabe se opresc devreme: XGBoostPruningCallback (optuna-integration,
+    daca e instalat; altfel un callback echivalent) + MedianPruner pe validation-merror;
+  - trial-urile ruleaza in paralel (thread-uri — xgboost elibereaza GIL-ul), iar
+    nucleele se impart intre trial-uri si thread-urile fiecarui booster;
+  - studiul e persistent (journal file sau OPTUNA_STORAGE=sqlite:///...) si se reia
+    dupa o intrerupere: numele contine amprenta datelor, deci acelasi set de date
+    continua de unde a ramas, iar un set nou porneste un studiu nou.
+
+Obiectivul e eroarea pe validare (1 - acuratete), minimizata — aceeasi metrica
+pe care o raporteaza pruning-ul la fiecare iteratie.
+
+Variabile de mediu: OPTUNA_STORAGE, OPTUNA_JOBS (trial-uri in paralel).
+"""
+import os
+import hashlib
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+BASE_DIR     = os.path.dirname(os.path.abspath(__file__))
+JOURNAL_PATH = os.path.join(BASE_DIR, "optuna_journal.log")
+EARLY_STOP   = 50
+PRUNE_METRIC = "validation-merror"
+
+try:
+    from optuna.integration import XGBoostPruningCallback
+except ImportError:
+    XGBoostPruningCallback = None
+
+
+class _PruningCallback(xgb.callback.TrainingCallback):
+    """Fallback fara optuna-integration — aceeasi logica ca XGBoostPruningCallback."""
+
+    def __init__(self, trial, observation_key: str):
+        self.trial = trial
+        self.data, self.metric = observation_key.split("-", 1)
+
+    def after_iteration(self, model, epoch, evals_log):
+        import optuna
+
+        self.trial.report(float(evals_log[self.data][self.metric][-1]), step=epoch)
+        if self.trial.should_prune():
+            raise optuna.TrialPruned(f"Trial was pruned at iteration {epoch}.")
+        return False
+
+
+def _pruning_callback(trial):
+    if XGBoostPruningCallback is not None:
+        return XGBoostPruningCallback(trial, PRUNE_METRIC)
+    return _PruningCallback(trial, PRUNE_METRIC)
+
+
+def _storage():
+    import optuna
+
+    url = os.environ.get("OPTUNA_STORAGE")
+    if url:
+        return url
+    # Journal file: sigur la scrieri concurente, fara dependinte in plus
+    return optuna.storages.JournalStorage(optuna.storages.JournalFileStorage(JOURNAL_PATH))
+
+
+def _fingerprint(X_train, y_train, X_val, y_val) -> str:
+    h = hashlib.sha1()
+    for X, y in ((X_train, y_train), (X_val, y_val)):
+        h.update(pd.util.hash_pandas_object(X, index=False).to_numpy().tobytes())
+        h.update(np.ascontiguousarray(y).tobytes())
+    h.update("|".join(X_train.columns).encode())
+    return h.hexdigest()[:12]
+
+
+def _partition(n_trials: int) -> tuple:
+    """(trial-uri in paralel, thread-uri per booster) — produsul ~ nucleele disponibile."""
+    cores  = os.cpu_count() or 1
+    n_jobs = int(os.environ.get("OPTUNA_JOBS", 0)) or max(1, cores // 2)
+    n_jobs = max(1, min(n_jobs, n_trials, cores))
+    return n_jobs, max(1, cores // n_jobs)
+
+
+def tune_xgb(X_train, y_train, X_val, y_val, n_classes: int, n_trials: int = 50,
+             study_name: str = "xgb"):
+    """
+    Cauta hiperparametrii XGBClassifier pe (train, val). Returneaza (best_params, val_accuracy);
+    best_params are aceleasi chei ca inainte (n_estimators, learning_rate, ...) si se dau
+    direct lui XGBClassifier.
+    """
+    import optuna
+    from sklearn.utils.class_weight import compute_sample_weight
+
+    sw     = compute_sample_weight("balanced", y_train)
+    dtrain = xgb.QuantileDMatrix(X_train, label=y_train, weight=sw)
+    dval   = xgb.QuantileDMatrix(X_val, label=y_val, ref=dtrain)
+    n_jobs, nthread = _partition(n_trials)
+
+    def objective(trial):
+        n_estimators = trial.suggest_int("n_estimators", 300, 1500)
+        params = {
+            "max_depth":        trial.suggest_int("max_depth", 3, 8),
+            "learning_rate":    trial.suggest_float("learning_rate", 0.01, 0.3, log=True),
+            "subsample":        trial.suggest_float("subsample", 0.6, 1.0),
+            "colsample_bytree": trial.suggest_float("colsample_bytree", 0.5, 1.0),
+            "min_child_weight": trial.suggest_int("min_child_weight", 1, 10),
+            "gamma":            trial.suggest_float("gamma", 0.0, 5.0),
+            "objective":        "multi:softprob",
+            "num_class":        n_classes,
+            # Early stopping pe ultima metrica (mlogloss, ca inainte); pruning pe merror
+            "eval_metric":      ["merror", "mlogloss"],
+            "tree_method":      "hist",
+            "seed":             42,
+            "nthread":          nthread,
+        }
+        booster = xgb.train(
+            params, dtrain,
+            num_boost_round=n_estimators,
+            evals=[(dval, "validation")],
+            early_stopping_rounds=EARLY_STOP,
+            callbacks=[_pruning_callback(trial)],
+            verbose_eval=False,
+        )
+        proba = booster.predict(dval, iteration_range=(0, booster.best_iteration + 1))
+        return float((proba.argmax(axis=1) != y_val).mean())
+
+    name  = f"{study_name}-{_fingerprint(X_train, y_train, X_val, y_val)}"
+    study = optuna.create_study(
+        study_name=name,
+        storage=_storage(),
+        direction="minimize",
+        pruner=optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=EARLY_STOP),
+        load_if_exists=True,
+    )
+    done = sum(t.state in (optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED)
+               for t in study.trials)
+    remaining = max(0, n_trials - done)
+    if done:
+        print(f"    Studiu reluat '{name}': {done} trial-uri gata, raman {remaining}")
+    print(f"    {n_jobs} trial-uri in paralel x {nthread} thread-uri")
+    if remaining:
+        study.optimize(objective, n_trials=remaining, n_jobs=n_jobs, show_progress_bar=True)
+
+    pruned = sum(t.state == optuna.trial.TrialState.PRUNED for t in study.trials)
+    print(f"    Trial-uri oprise devreme (pruned): {pruned}/{len(study.trials)}")
+    return study.best_params, 1.0 - study.best_value
@@ -20,9 +20,10 @@ logger = logging.getLogger(__name__)
 
 def _load():
     """Incarca modelul si refresheaza Elo la pornire."""
-    from predictor import load_model, refresh_clubelo
+    from predictor import load_model, refresh_clubelo, start_model_watcher
     import cache as _cache
     load_model()
+    start_model_watcher()
     logger.info("Model incarcat.")
     try:
         refresh_clubelo(_cache)
@@ -40,6 +41,7 @@ def _compute_today():
         logger.info("Picks %s: %d total", target, result.get("total_picks", 0))
     except Exception as e:
         logger.error("Compute %s esuat: %s", target, e)
+    _schedule_finals()
 
 
 def _compute_tomorrow():
@@ -64,6 +66,31 @@ def _compute_day_after():
         logger.error("Compute %s esuat: %s", target, e)
 
 
+def _refresh_picks():
+    """Recalcul incremental (azi + maine) — doar meciurile cu cote / absente schimbate."""
+    import pick_scheduler
+    today = datetime.date.today()
+    for target in (today, today + datetime.timedelta(days=1)):
+        try:
+            res = pick_scheduler.refresh(target.isoformat())
+            if res.get("changed"):
+                logger.info("Refresh picks %s: %d/%d recalculate", target, res["changed"], res["checked"])
+        except Exception as e:
+            logger.error("Refresh picks %s esuat: %s", target, e)
+    _schedule_finals()
+
+
+def _schedule_finals():
+    """Refresh-ul final al fiecarui meci de azi, cu FINAL_LEAD_MIN inainte de kickoff."""
+    import pick_scheduler
+    try:
+        n = pick_scheduler.schedule_finals(scheduler, datetime.date.today().isoformat())
+        if n:
+            logger.info("Refresh final programat pentru %d meciuri", n)
+    except Exception as e:
+        logger.warning("Programare refresh final esuata: %s", e)
+
+
 def _auto_mark():
     from ingestion import auto_mark_results
     logger.info("Auto-mark results ...")
@@ -104,7 +131,12 @@ def _update_bet_results():
         logger.error("Bet signal update results esuat: %s", e)
 
 
+scheduler = BlockingScheduler(timezone="Europe/Bucharest")
+
+
 if __name__ == "__main__":
+    import pick_scheduler
+
     logger.info("=== OXIANO WORKER PORNIT ===")
 
     # Incarca modelul si Elo la startup
@@ -115,11 +147,11 @@ if __name__ == "__main__":
     _compute_tomorrow()
     _compute_day_after()
 
-    scheduler = BlockingScheduler(timezone="Europe/Bucharest")
-
-    # Picks: azi la 07:00 si 13:00
+    # Picks: calcul complet azi la 07:00 (descopera meciurile zilei); intre rulari,
+    # refresh incremental la TICK_MIN minute + refresh final inainte de fiecare kickoff
     scheduler.add_job(_compute_today, CronTrigger(hour=7,  minute=0),  id="picks_07")
-    scheduler.add_job(_compute_today, CronTrigger(hour=13, minute=0),  id="picks_13")
+    scheduler.add_job(_refresh_picks, CronTrigger(hour="8-23", minute=f"*/{pick_scheduler.TICK_MIN}"),
+                      id="picks_refresh")
     # Picks: maine la 07:30
     scheduler.add_job(_compute_tomorrow,   CronTrigger(hour=7, minute=30), id="picks_tomorrow")
     # Picks: poimaine la 08:00
@@ -132,5 +164,7 @@ if __name__ == "__main__":
     scheduler.add_job(_run_bet_pipeline,   CronTrigger(hour=9,  minute=0),  id="bet_pipeline")
     scheduler.add_job(_update_bet_results, CronTrigger(hour=23, minute=45), id="bet_results")
 
+    _schedule_finals()
+
     logger.info("Scheduler pornit. Jobs active: %s", [j.id for j in scheduler.get_jobs()])
     scheduler.start()